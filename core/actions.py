@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+NeuraBoardEco - Registro de acciones
+Versión: 2025-10-23
+Autor: vlugoc
+Descripción:
+  Tabla de despacho de acciones del orquestador.
+  - Handlers registrados con @register_action("nombre")
+  - Carga perezosa desde módulos ("paquete.modulo:funcion") al primer uso
+  - Cada ejecución mide tiempo de pared, CPU (hilo + subprocesos) y bytes
+    escritos (/proc/self/io), y acumula el coste por acción
+  - Los bytes son una aproximación: wchar cuenta todo write() del proceso
+    (cualquier hilo, también stdout y pipes). Se descuenta lo escrito dentro
+    de untracked_io() (el log del propio orquestador) y, con measure_io=False
+    (etapas concurrentes del motor async), el término de E/S no se mide
+  - heuristic() convierte recompensa/coste en η para PheromoneTable
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from core.memlock import MEMORY_LOCK
+
+ROOT = Path.home() / "NeuraBoardEco"
+MEM_PATH = ROOT / "memory.json"
+
+# Un MB escrito pesa en el coste lo mismo que este número de segundos
+BYTES_COST_PER_MB = 0.1
+
+
+@dataclass
+class ActionResult:
+    """Recompensa de una acción junto con su coste medido."""
+    reward: float
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    bytes_written: int = 0
+    io_measured: bool = True
+
+    @property
+    def cost(self) -> float:
+        return self.wall_time + self.cpu_time + BYTES_COST_PER_MB * self.bytes_written / (1024 * 1024)
+
+
+def _bytes_written() -> int:
+    """Bytes pasados a write() por todo el proceso (wchar de /proc/self/io; 0 si no está disponible)."""
+    try:
+        with open("/proc/self/io", "rb") as f:
+            for line in f:
+                if line.startswith(b"wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _children_cpu() -> float:
+    t = os.times()
+    return t.children_user + t.children_system
+
+
+class ActionRegistry:
+    """Despacho de acciones por nombre con contabilidad de coste."""
+
+    def __init__(self):
+        self._handlers: Dict[str, Callable[[], object]] = {}
+        self._lazy: Dict[str, str] = {}
+        # nombre → {"count", "reward", "wall", "cpu", "bytes", "io_count"} (sumas)
+        self.costs: Dict[str, Dict[str, float]] = {}
+        # False mientras otras etapas escriben en paralelo: wchar no sería atribuible
+        self.measure_io = True
+        self._untracked = 0
+        self._untracked_lock = threading.Lock()
+
+    # ---------- Registro ----------
+    def register(self, name: Optional[str] = None):
+        """Decorador: @registry.register("backup")."""
+        def deco(fn):
+            self._handlers[name or fn.__name__] = fn
+            self._lazy.pop(name or fn.__name__, None)
+            return fn
+        return deco
+
+    def register_lazy(self, name: str, target: str):
+        """Registra 'paquete.modulo:funcion'; el módulo se importa en el primer uso."""
+        if name not in self._handlers:
+            self._lazy[name] = target
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._handlers or name in self._lazy
+
+    def names(self) -> list:
+        return sorted(set(self._handlers) | set(self._lazy))
+
+    def get(self, name: str) -> Callable[[], object]:
+        fn = self._handlers.get(name)
+        if fn is None:
+            target = self._lazy.pop(name, None)
+            if target is None:
+                raise KeyError(f"Acción desconocida: {name}")
+            module, _, attr = target.partition(":")
+            fn = getattr(importlib.import_module(module), attr)
+            self._handlers[name] = fn
+        return fn
+
+    # ---------- Ejecución ----------
+    @contextlib.contextmanager
+    def untracked_io(self):
+        """Escrituras que no son coste de la acción en curso (log del orquestador, memory.json)."""
+        b0 = _bytes_written()
+        try:
+            yield
+        finally:
+            with self._untracked_lock:
+                self._untracked += max(0, _bytes_written() - b0)
+
+    def run(self, name: str) -> ActionResult:
+        """Ejecuta la acción midiendo tiempo de pared, CPU y (si es atribuible) bytes escritos."""
+        fn = self.get(name)
+        measure_io = self.measure_io
+        w0, c0, k0, b0 = time.perf_counter(), time.thread_time(), _children_cpu(), _bytes_written()
+        u0 = self._untracked
+        out = fn()
+        result = out if isinstance(out, ActionResult) else ActionResult(float(out))
+        result.wall_time = time.perf_counter() - w0
+        result.cpu_time = (time.thread_time() - c0) + (_children_cpu() - k0)
+        if measure_io:
+            result.bytes_written += max(0, _bytes_written() - b0 - (self._untracked - u0))
+        else:
+            # Solo cuentan los bytes que la propia acción declaró
+            result.io_measured = result.bytes_written > 0
+        self.record(name, result)
+        return result
+
+    def record(self, name: str, result: ActionResult):
+        """Acumula el coste de una ejecución (también para rutas async externas)."""
+        c = self.costs.setdefault(name, {"count": 0, "reward": 0.0, "wall": 0.0, "cpu": 0.0, "bytes": 0.0,
+                                         "io_count": 0})
+        c["count"] += 1
+        c["reward"] += result.reward
+        c["wall"] += result.wall_time
+        c["cpu"] += result.cpu_time
+        if result.io_measured:
+            c["bytes"] += result.bytes_written
+            c["io_count"] += 1
+
+    def avg_cost(self, name: str) -> Optional[float]:
+        c = self.costs.get(name)
+        if not c or not c["count"]:
+            return None
+        n = c["count"]
+        io_n = c.get("io_count", n)
+        io_cost = BYTES_COST_PER_MB * c["bytes"] / io_n / (1024 * 1024) if io_n else 0.0
+        return (c["wall"] + c["cpu"]) / n + io_cost
+
+    def heuristic(self, base: Optional[Dict[str, float]] = None, cost_weight: float = 1.0) -> Dict[str, float]:
+        """
+        η(a) = base(a) · (1 + max(r̄,0)/10) / (1 + w · coste(a)).
+        Las acciones aún sin medir conservan su η base.
+        """
+        base = base or {}
+        eta = {}
+        for name in set(base) | set(self.costs):
+            b = float(base.get(name, 1.0))
+            c = self.costs.get(name)
+            if not c or not c["count"]:
+                eta[name] = b
+                continue
+            avg_reward = c["reward"] / c["count"]
+            eta[name] = max(1e-6, b * (1.0 + max(avg_reward, 0.0) / 10.0) / (1.0 + cost_weight * self.avg_cost(name)))
+        return eta
+
+    # ---------- Persistencia ----------
+    def load_costs(self):
+        """Carga costes acumulados desde memory.json (ant_rl.action_costs)."""
+        try:
+            data = json.loads(MEM_PATH.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        for name, c in ((data.get("ant_rl") or {}).get("action_costs") or {}).items():
+            self.costs[name] = {k: float(c.get(k, 0.0)) for k in ("count", "reward", "wall", "cpu", "bytes")}
+            # Costes guardados antes de io_count: todas sus ejecuciones midieron E/S
+            self.costs[name]["io_count"] = float(c.get("io_count", c.get("count", 0.0)))
+
+    def save_costs(self):
+        with MEMORY_LOCK:
+            try:
+                data = json.loads(MEM_PATH.read_text(encoding="utf-8"))
+            except Exception:
+                data = {}
+            data.setdefault("ant_rl", {})["action_costs"] = self.costs
+            MEM_PATH.parent.mkdir(parents=True, exist_ok=True)
+            MEM_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+ACTIONS = ActionRegistry()
+register_action = ACTIONS.register
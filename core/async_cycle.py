@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+NeuraBoardEco - Motor de ciclos asyncio
+Versión: 2025-10-23
+Autor: vlugoc
+Descripción:
+  Ejecuta el ciclo del orquestador como etapas (coroutines) que se
+  solapan: la E/S lenta (subproceso de backup, conectores HTTP, escrituras
+  de memory.json, sandbox con esperas) corre en paralelo con el trabajo
+  de CPU (selección de acción), con concurrencia acotada y timeout por
+  etapa. La latencia del ciclo tiende a la de la etapa más larga.
+  Los timeouts son orientativos para el trabajo en hilos: el ciclo deja de
+  esperar la etapa, pero el hilo no se puede interrumpir y conserva su plaza
+  de concurrencia hasta terminar de verdad.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from rich import print
+
+from core import clock, orchestrator
+from core.actions import ACTIONS, ActionResult
+from core.metrics import LearningMetrics
+from eco_ant.pheromones import PheromoneTable
+from sandbox.virtual_env import VirtualEnv
+
+DEFAULT_STAGE_TIMEOUTS = {
+    "boot": 10.0,
+    "action": 300.0,
+    "sandbox": 60.0,
+    "connector": 30.0,
+    "flush": 15.0,
+}
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Hilos lanzados por la etapa en curso (ver AsyncCycleEngine.to_thread)
+_STAGE_THREADS: contextvars.ContextVar[Optional[List[Future]]] = contextvars.ContextVar(
+    "stage_threads", default=None)
+
+
+class AsyncCycleEngine:
+    """Ciclo de aprendizaje con etapas concurrentes."""
+
+    def __init__(self, ant: PheromoneTable, metrics: LearningMetrics, env: VirtualEnv, cfg: dict):
+        self.ant = ant
+        self.metrics = metrics
+        self.env = env
+        self.cfg = cfg
+        self.timeouts = {**DEFAULT_STAGE_TIMEOUTS, **(cfg.get("stage_timeouts") or {})}
+        concurrency = int(cfg.get("max_concurrency", DEFAULT_MAX_CONCURRENCY))
+        self.sem = asyncio.Semaphore(concurrency)
+        # Cada hilo vivo ocupa una plaza del semáforo, así que el pool nunca se satura
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="stage")
+        self.lingering: Set[asyncio.Task] = set()
+        self.stage_times: Dict[str, float] = {}
+
+    # ---------- Infraestructura ----------
+    async def to_thread(self, fn: Callable, *args) -> Any:
+        """Como asyncio.to_thread, pero en el pool acotado y asociado a la etapa en curso."""
+        cf = self.executor.submit(contextvars.copy_context().run, fn, *args)
+        threads = _STAGE_THREADS.get()
+        if threads is not None:
+            threads.append(cf)
+        return await asyncio.wrap_future(cf)
+
+    async def stage(self, name: str, aw: Awaitable, kind: Optional[str] = None) -> Any:
+        """
+        Ejecuta una etapa con semáforo y timeout; registra su duración.
+        Si vence el timeout con hilos de la etapa aún corriendo, la etapa
+        devuelve None pero la plaza del semáforo se libera cuando esos
+        hilos terminan, no antes.
+        """
+        timeout = self.timeouts.get(kind or name, 60.0)
+        started = time.perf_counter()
+        threads: List[Future] = []
+        await self.sem.acquire()
+        token = _STAGE_THREADS.set(threads)
+        try:
+            return await asyncio.wait_for(aw, timeout)
+        except asyncio.TimeoutError:
+            running = sum(not cf.done() for cf in threads)
+            note = f"; {running} hilo(s) siguen ocupando su plaza" if running else ""
+            await asyncio.to_thread(orchestrator.log, f"⏱️ Etapa '{name}' excedió {timeout:.0f}s{note}")
+            return None
+        except Exception as e:
+            await asyncio.to_thread(orchestrator.log, f"⚠️ Etapa '{name}' falló: {e}")
+            return None
+        finally:
+            _STAGE_THREADS.reset(token)
+            self.stage_times[name] = time.perf_counter() - started
+            self._release_after(threads)
+
+    def _release_after(self, threads: List[Future]):
+        running = [cf for cf in threads if not cf.done()]
+        if not running:
+            self.sem.release()
+            return
+
+        async def wait_threads():
+            await asyncio.wait([asyncio.wrap_future(cf) for cf in running])
+            self.sem.release()
+
+        task = asyncio.create_task(wait_threads())
+        self.lingering.add(task)
+        task.add_done_callback(self.lingering.discard)
+
+    # ---------- Etapas ----------
+    async def boot(self):
+        orchestrator.init_memory()
+        await asyncio.to_thread(orchestrator.log, "🧠 Iniciando núcleo NeuraBoardEco (async)...")
+        await clock.get_clock().asleep(0.3)
+        await asyncio.to_thread(orchestrator.log, "⚙️ Cargando módulos principales...")
+        await clock.get_clock().asleep(0.3)
+        await asyncio.to_thread(orchestrator.log, "✅ Sistema operativo y estable.")
+
+    async def execute_action(self, choice: str) -> float:
+        """El backup completo con tar usa un subproceso asíncrono; el resto corre en un hilo."""
+        if choice == "backup_full" and (self.cfg.get("backup_full") or {}).get("mode") == "tar":
+            started, children = time.perf_counter(), os.times()
+            await asyncio.to_thread(orchestrator.log, "💾 Realizando respaldo completo de memoria...")
+            cmd, backup_file = orchestrator.backup_command()
+            proc = await asyncio.create_subprocess_shell(cmd)
+            try:
+                rc = await proc.wait()
+            except asyncio.CancelledError:
+                proc.kill()
+                raise
+            reward = await self.to_thread(orchestrator.backup_reward, rc, backup_file)
+            after = os.times()
+            ACTIONS.record(choice, ActionResult(
+                reward,
+                wall_time=time.perf_counter() - started,
+                cpu_time=(after.children_user - children.children_user)
+                + (after.children_system - children.children_system),
+                bytes_written=backup_file.stat().st_size if backup_file.exists() else 0,
+            ))
+            return reward
+        return await self.to_thread(orchestrator.do_action, choice)
+
+    async def fetch_sources(self, sources: List[str]) -> List[Any]:
+        from core.integrations import universal_connector
+
+        connector_cfg = self.cfg.get("connector_config") or {}
+        tasks = [
+            self.stage(f"connector:{src}",
+                       self.to_thread(universal_connector.fetch_all, [src], connector_cfg, False),
+                       kind="connector")
+            for src in sources
+        ]
+        return await asyncio.gather(*tasks)
+
+    async def flush(self):
+        await self.to_thread(self.ant.flush)
+        await self.to_thread(self.metrics.flush)
+        await self.to_thread(ACTIONS.save_costs)
+
+    # ---------- Ciclo ----------
+    async def run_cycle(self) -> float:
+        """Un ciclo: acción, sandbox y conectores en paralelo; depósito y flush al final."""
+        self.stage_times = {}
+        started = time.perf_counter()
+        state = "boot_cycle"
+
+        # CPU: selección (inmediata) mientras arrancan las etapas de E/S
+        heuristic = ACTIONS.heuristic(self.cfg["heuristic"], float(self.cfg.get("cost_weight", 1.0)))
+        choice = self.ant.choose_action(state, self.cfg["actions"], heuristic)
+        action_task = asyncio.create_task(self.stage("action", self.execute_action(choice)))
+        side_tasks = [asyncio.create_task(self.stage("sandbox", self.to_thread(self.env.run)))]
+        sources = self.cfg.get("connector_sources") or []
+        if sources:
+            side_tasks.append(asyncio.create_task(self.fetch_sources(sources)))
+
+        reward = await action_task
+        reward = 0.0 if reward is None else reward
+        self.ant.deposit([(state, choice)], reward)
+        self.metrics.register_cycle(reward, action=choice)
+        self.metrics.adaptive_adjustment(self.ant)
+        side_tasks.append(asyncio.create_task(self.stage("flush", self.flush())))
+        await asyncio.to_thread(orchestrator.log, f"🐜 Ant-Colony RL ejecutó acción: {choice} con recompensa {reward}")
+
+        await asyncio.gather(*side_tasks)
+        total = time.perf_counter() - started
+        stages = " ".join(f"{k}={v:.2f}s" for k, v in self.stage_times.items())
+        await asyncio.to_thread(
+            orchestrator.log,
+            f"⏱️ Ciclo async: {total:.2f}s (suma de etapas {sum(self.stage_times.values()):.2f}s) | {stages}",
+        )
+        return reward
+
+    async def run(self, cycles: int = 1):
+        # La persistencia se hace en la etapa flush, no en cada depósito
+        self.ant.autosave = False
+        self.metrics.autosave = False
+        # Con etapas solapadas wchar mezcla la E/S de todas: no se imputa a la acción
+        ACTIONS.measure_io = False
+        boot_task = asyncio.create_task(self.stage("boot", self.boot()))
+        try:
+            for _ in range(max(1, cycles)):
+                await self.run_cycle()
+        finally:
+            await boot_task
+            # Hilos que excedieron su timeout: se esperan antes de cerrar el pool
+            if self.lingering:
+                await asyncio.gather(*self.lingering)
+            self.executor.shutdown(wait=False)
+            self.ant.autosave = True
+            self.metrics.autosave = True
+            ACTIONS.measure_io = True
+        print(self.metrics.summary())
+
+
+def run_async(ant: PheromoneTable, metrics: LearningMetrics, env: VirtualEnv,
+              cfg: dict, cycles: int = 1):
+    """Punto de entrada síncrono para el orquestador."""
+    asyncio.run(AsyncCycleEngine(ant, metrics, env, cfg).run(cycles))
@@ -176,4 +176,7 @@ def main(argv: list[str]) -> int:
     return 0 if failed == 0 else 1
 
 if __name__ == "__main__":
+    if os.getenv("NEURABOARD_PROFILE"):
+        from core import profiler
+        profiler.maybe_start("autorefiner")
     sys.exit(main(sys.argv[1:]))
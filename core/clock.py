@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+NeuraBoardEco - Reloj inyectable
+Versión: 2025-10-25
+Autor: vlugoc
+Descripción:
+  Abstracción del tiempo para orquestador, sandbox, logs y métricas.
+  - RealClock: time.time / time.sleep
+  - SimulatedClock: tiempo virtual; sleep() avanza el reloj sin esperar
+    (o espera s/speedup en modo fast-forward), así los entrenamientos y
+    benchmarks corren miles de ciclos por segundo con timestamps coherentes
+  - Activación global: set_clock(...) o NEURABOARD_CLOCK=sim[:speedup]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+
+class RealClock:
+    """Reloj de pared real."""
+
+    simulated = False
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    async def asleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    def strftime(self, fmt: str) -> str:
+        return time.strftime(fmt, time.localtime(self.time()))
+
+
+class SimulatedClock(RealClock):
+    """
+    Reloj virtual. `speedup=0` (por defecto) hace que sleep() sea instantáneo;
+    con speedup>0 espera realmente seconds/speedup (fast-forward).
+    """
+
+    simulated = True
+
+    def __init__(self, start: Optional[float] = None, speedup: float = 0.0):
+        self._now = time.time() if start is None else float(start)
+        self._mono = 0.0
+        self.speedup = speedup
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._mono
+
+    def advance(self, seconds: float):
+        with self._lock:
+            self._now += seconds
+            self._mono += seconds
+
+    def sleep(self, seconds: float):
+        if self.speedup > 0:
+            time.sleep(seconds / self.speedup)
+        self.advance(seconds)
+
+    async def asleep(self, seconds: float):
+        await asyncio.sleep(seconds / self.speedup if self.speedup > 0 else 0)
+        self.advance(seconds)
+
+
+def _from_env() -> RealClock:
+    spec = os.getenv("NEURABOARD_CLOCK", "real")
+    if spec.startswith("sim"):
+        _, _, speed = spec.partition(":")
+        return SimulatedClock(speedup=float(speed or 0.0))
+    return RealClock()
+
+
+_clock: RealClock = _from_env()
+
+
+def get_clock() -> RealClock:
+    return _clock
+
+
+def set_clock(clock: RealClock) -> RealClock:
+    """Instala el reloj global del proceso y lo devuelve."""
+    global _clock
+    _clock = clock
+    return clock
+
+
+# Atajos que siempre delegan en el reloj instalado en ese momento
+def now() -> float:
+    return _clock.time()
+
+
+def simulated() -> bool:
+    return _clock.simulated
+
+
+def sleep(seconds: float):
+    _clock.sleep(seconds)
+
+
+def strftime(fmt: str) -> str:
+    return _clock.strftime(fmt)
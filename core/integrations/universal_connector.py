@@ -15,6 +15,9 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 import requests
 
+from core import profiler, telemetry
+from core.memlock import MEMORY_LOCK
+
 ROOT = Path.home() / "NeuraBoardEco"
 MEM_PATH = ROOT / "memory.json"
 LOGS_PATH = ROOT / "logs"
@@ -38,25 +41,32 @@ def _domain_ok(url: str) -> bool:
     except Exception:
         return False
 
-def _http_get_json(url: str, params: Optional[Dict[str, Any]] = None,
+def _http_get_json(source: str, url: str, params: Optional[Dict[str, Any]] = None,
                    headers: Optional[Dict[str, str]] = None,
                    timeout: int = 12, retries: int = 2) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    # `source` es el nombre de la fuente en REGISTRY: etiqueta de telemetría
     if not _domain_ok(url):
+        telemetry.CONNECTOR_ERRORS.inc(source=source)
         return None, f"Blocked domain: {url}"
     session = requests.Session()
     last_err = None
     for _ in range(retries + 1):
+        t0 = time.perf_counter()
         try:
             r = session.get(url, params=params, headers=headers, timeout=timeout)
+            telemetry.CONNECTOR_LATENCY.observe(time.perf_counter() - t0, source=source)
             if r.status_code == 200:
                 try:
                     return r.json(), None
                 except Exception as e:
+                    telemetry.CONNECTOR_ERRORS.inc(source=source)
                     return None, f"JSON parse error: {e}"
             else:
                 last_err = f"{r.status_code} - {r.text[:160]}"
         except Exception as e:
+            telemetry.CONNECTOR_LATENCY.observe(time.perf_counter() - t0, source=source)
             last_err = str(e)
+        telemetry.CONNECTOR_ERRORS.inc(source=source)
         time.sleep(0.6)
     return None, last_err
 
@@ -73,29 +83,33 @@ def _load_memory() -> Dict[str, Any]:
         return {"feeds": {}}
 
 def _save_memory(data: Dict[str, Any]) -> None:
+    t0 = time.perf_counter()
     MEM_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    telemetry.MEMORY_WRITE.observe(time.perf_counter() - t0, writer="connector")
 
 def _append_feed(source: str, payload: Dict[str, Any]) -> None:
-    data = _load_memory()
-    feeds = data.get("feeds", {})
-    if source not in feeds:
-        feeds[source] = []
-    feeds[source].append({"ts": time.time(), "data": payload})
-    feeds[source] = feeds[source][-50:]  # limitar tamaño
-    data["feeds"] = feeds
-    _save_memory(data)
+    with MEMORY_LOCK:
+        data = _load_memory()
+        feeds = data.get("feeds", {})
+        if source not in feeds:
+            feeds[source] = []
+        feeds[source].append({"ts": time.time(), "data": payload})
+        feeds[source] = feeds[source][-50:]  # limitar tamaño
+        data["feeds"] = feeds
+        _save_memory(data)
 
 def _log(msg: str):
     print(f"[Connector] {msg}")
-    data = _load_memory()
-    data.setdefault("logs", [])
-    data["logs"].append({"msg": f"[Connector] {msg}", "time": time.strftime("%Y-%m-%d %H:%M:%S")})
-    _save_memory(data)
+    with MEMORY_LOCK:
+        data = _load_memory()
+        data.setdefault("logs", [])
+        data["logs"].append({"msg": f"[Connector] {msg}", "time": time.strftime("%Y-%m-%d %H:%M:%S")})
+        _save_memory(data)
 
 # ---------- Conectores ----------
 def wikipedia_summary(topic: str = "Artificial intelligence") -> None:
     url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{topic}"
-    j, err = _http_get_json(url)
+    j, err = _http_get_json("wikipedia", url)
     if j:
         payload = {
             "title": j.get("title"),
@@ -112,7 +126,7 @@ def wikipedia_summary(topic: str = "Artificial intelligence") -> None:
 def nasa_apod() -> None:
     api_key = os.getenv("NASA_API_KEY", "DEMO_KEY")
     url = "https://api.nasa.gov/planetary/apod"
-    j, err = _http_get_json(url, params={"api_key": api_key})
+    j, err = _http_get_json("nasa_apod", url, params={"api_key": api_key})
     if j:
         payload = {
             "title": j.get("title"),
@@ -130,7 +144,7 @@ def nasa_apod() -> None:
 
 def spacex_latest() -> None:
     url = "https://api.spacexdata.com/v5/launches/latest"
-    j, err = _http_get_json(url)
+    j, err = _http_get_json("spacex_latest", url)
     if j:
         payload = {
             "name": j.get("name"),
@@ -152,7 +166,7 @@ def openweather_city(city: str = "Bogota") -> None:
         _log("OpenWeather SKIP: missing key")
         return
     url = "https://api.openweathermap.org/data/2.5/weather"
-    j, err = _http_get_json(url, params={"q": city, "appid": key, "units": "metric", "lang": "es"})
+    j, err = _http_get_json("openweather", url, params={"q": city, "appid": key, "units": "metric", "lang": "es"})
     if j:
         payload = {
             "city": city,
@@ -168,7 +182,7 @@ def openweather_city(city: str = "Bogota") -> None:
 
 def worldbank_indicator(country: str = "COL", indicator: str = "SP.POP.TOTL") -> None:
     url = f"https://api.worldbank.org/v2/country/{country}/indicator/{indicator}"
-    j, err = _http_get_json(url, params={"format": "json"})
+    j, err = _http_get_json("worldbank", url, params={"format": "json"})
     if j and isinstance(j, list) and len(j) > 1:
         series = j[1] or []
         latest = next((row for row in series if row.get("value") is not None), None)
@@ -187,7 +201,7 @@ def worldbank_indicator(country: str = "COL", indicator: str = "SP.POP.TOTL") ->
 
 def openaq_city(city: str = "Bogota") -> None:
     url = "https://api.openaq.org/v2/latest"
-    j, err = _http_get_json(url, params={"city": city, "limit": 1})
+    j, err = _http_get_json("openaq", url, params={"city": city, "limit": 1})
     if j and j.get("results"):
         r = j["results"][0]
         payload = {
@@ -206,7 +220,7 @@ def openaq_city(city: str = "Bogota") -> None:
 def yahoo_quote(symbols: List[str] = ["AAPL", "MSFT"]) -> None:
     syms = ",".join(symbols[:20])
     url = "https://query1.finance.yahoo.com/v7/finance/quote"
-    j, err = _http_get_json(url, params={"symbols": syms})
+    j, err = _http_get_json("yahoo_finance", url, params={"symbols": syms})
     if j and j.get("quoteResponse", {}).get("result"):
         rows = j["quoteResponse"]["result"]
         payload = [{"symbol": r.get("symbol"), "price": r.get("regularMarketPrice"), "chg": r.get("regularMarketChangePercent")} for r in rows]
@@ -218,7 +232,7 @@ def yahoo_quote(symbols: List[str] = ["AAPL", "MSFT"]) -> None:
 
 def github_repo(repo: str = "VLUGOC/NeuraBoardEcho") -> None:
     url = f"https://api.github.com/repos/{repo}"
-    j, err = _http_get_json(url)
+    j, err = _http_get_json("github_repo", url)
     if j and j.get("full_name"):
         payload = {
             "full_name": j.get("full_name"),
@@ -267,6 +281,8 @@ def fetch_all(enabled_sources: Optional[List[str]] = None, config: Optional[Dict
     return results
 
 if __name__ == "__main__":
+    profiler.maybe_start("universal_connector")
+    telemetry.maybe_start_exporter()
     fetch_all(
         enabled_sources=DEFAULT_SOURCES,
         config={
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+NeuraBoardEco - Mantenimiento y análisis medidos
+Versión: 2025-10-25
+Autor: vlugoc
+Descripción:
+  Trabajo real detrás de las acciones optimize_cpu y analyze.
+  - optimize(): recorta logs de memory.json y de logs/ (en el sitio, sin
+    tocar los que tienen un escritor activo), poda feromonas
+    sin información (τ == tau0) y libera memoria; mide bytes recuperados, tiempo ahorrado
+    por ciclo de lectura/escritura de memory.json y RSS (/proc/self/status)
+  - analyze(): estadísticas de memoria, feromonas, recompensas y feeds;
+    cuenta hallazgos accionables
+  Las recompensas salen solo de mejoras medidas (acotadas a [0, MAX_REWARD]):
+  bytes recuperados, RSS liberada y ms ahorrados por encima del ruido en
+  optimize; hallazgos resueltos, bytes recuperados y subida de la recompensa
+  media respecto del análisis anterior en analyze. Esa mejora bruta se
+  normaliza contra una línea base móvil por acción (RewardBaseline): rendir
+  lo habitual vale NEUTRAL_REWARD, así que en régimen estacionario (nada que
+  recuperar) las acciones siguen compitiendo con backup en vez de caer a 0.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import gc
+import json
+import math
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core import clock
+from core.memlock import MEMORY_LOCK
+
+ROOT = Path.home() / "NeuraBoardEco"
+MEM_PATH = ROOT / "memory.json"
+LOGS_PATH = ROOT / "logs"
+
+MAX_MEMORY_LOGS = 500                  # entradas de "logs" que se conservan en memory.json
+MEMORY_BUDGET = 1024 * 1024            # tamaño de memory.json considerado sano
+LOG_MAX_BYTES = 4 * 1024 * 1024        # archivos de logs/ por encima de esto se recortan...
+LOG_KEEP_BYTES = 1024 * 1024           # ...conservando la cola
+# metrics.log rota por su cuenta y tiene lectores por offset: no se recorta aquí
+TRIM_LOGS = ("sandbox.log", "autorefiner.log", "trace.jsonl")
+
+MAX_REWARD = 10.0
+REWARD_PER_100KB = 1.0                 # disco recuperado
+REWARD_PER_MS = 1.0                    # ms ahorrados por ida y vuelta de memory.json
+REWARD_PER_MB_RSS = 1.0                # RSS liberada
+REWARD_PER_FINDING = 0.5              # por hallazgo resuelto desde el análisis anterior
+ROUNDTRIP_REPEAT = 7                   # muestras de la ida y vuelta de memory.json
+NOISE_K = 2.0                          # ms ahorrados cuentan solo si superan K·ruido
+NEUTRAL_REWARD = 1.0                   # recompensa cuando la mejora iguala la línea base
+BASELINE_ALPHA = 0.1                   # peso de la última medida en la línea base (EMA)
+BASELINE_SMOOTHING = 1.0               # evita dividir por una línea base ~0
+
+
+def rss_bytes() -> int:
+    """RSS actual del proceso (VmRSS de /proc/self/status; 0 si no está disponible)."""
+    try:
+        with open("/proc/self/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _roundtrip_ms(data: dict, repeat: int = ROUNDTRIP_REPEAT) -> List[float]:
+    """Muestras (ms) del coste de serializar memory.json como lo hacen los escritores (indent=2)."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        json.loads(json.dumps(data, indent=2, ensure_ascii=False))
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return samples
+
+
+def _ms_saved(before: List[float], after: List[float]) -> tuple:
+    """
+    (ms ahorrados, ruido): diferencia de medianas, o 0 si no supera NOISE_K
+    veces la desviación estándar más alta de las dos series de muestras.
+    """
+    noise = max(statistics.pstdev(before), statistics.pstdev(after))
+    saved = statistics.median(before) - statistics.median(after)
+    return (saved if saved > NOISE_K * noise else 0.0), noise
+
+
+def _load_memory() -> dict:
+    try:
+        return json.loads(MEM_PATH.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def trim_log_file(path: Path, max_bytes: int = LOG_MAX_BYTES, keep_bytes: int = LOG_KEEP_BYTES) -> int:
+    """
+    Si path supera max_bytes conserva solo la cola (desde un salto de línea);
+    devuelve bytes liberados. Recorta en el sitio (mismo inodo) bajo flock
+    exclusivo: los escritores abren en modo append y toman flock compartido
+    mientras tienen el archivo abierto (VirtualEnv.run), así que si hay uno
+    activo el recorte se omite en lugar de dejarle escribiendo en un archivo
+    reemplazado.
+    """
+    try:
+        if path.stat().st_size <= max_bytes:
+            return 0
+        f = open(path, "r+b")
+    except OSError:
+        return 0
+    with f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0
+        size = os.fstat(f.fileno()).st_size
+        if size <= max_bytes:
+            return 0
+        f.seek(size - keep_bytes)
+        tail = f.read()
+        nl = tail.find(b"\n")
+        tail = tail[nl + 1:] if nl >= 0 else tail
+        f.seek(0)
+        f.write(tail)
+        f.truncate()
+    return size - len(tail)
+
+
+def optimize(ant=None) -> dict:
+    """
+    Compacta memory.json (logs + feromonas), recorta logs/ y libera memoria.
+    Si se pasa la PheromoneTable viva se poda esa (si no, su próximo guardado
+    reescribiría las entradas eliminadas).
+    """
+    rss_before = rss_bytes()
+    stats = {"memory_bytes": 0, "log_bytes": 0, "logs_dropped": 0, "pheromones_pruned": 0,
+             "ms_saved": 0.0, "ms_noise": 0.0, "rss_freed": 0}
+
+    with MEMORY_LOCK:
+        try:
+            raw = MEM_PATH.read_text(encoding="utf-8")
+            data = json.loads(raw)
+        except Exception:
+            raw, data = "", {}
+        if data:
+            ms_before = _roundtrip_ms(data)
+            logs = data.get("logs") or []
+            if len(logs) > MAX_MEMORY_LOGS:
+                stats["logs_dropped"] = len(logs) - MAX_MEMORY_LOGS
+                data["logs"] = logs[-MAX_MEMORY_LOGS:]
+            if ant is not None:
+                stats["pheromones_pruned"] = ant.prune()
+                if ant.persist_in_memory:
+                    data.setdefault("ant_rl", {})["pheromones"] = ant.table
+            else:
+                from eco_ant.pheromones import PheromoneTable
+                table = PheromoneTable(persist_in_memory=False)
+                table.table = (data.get("ant_rl") or {}).get("pheromones") or {}
+                stats["pheromones_pruned"] = table.prune()
+            text = json.dumps(data, indent=2, ensure_ascii=False)
+            if text != raw:
+                MEM_PATH.write_text(text, encoding="utf-8")
+            stats["memory_bytes"] = max(0, len(raw.encode("utf-8")) - len(text.encode("utf-8")))
+            stats["ms_saved"], stats["ms_noise"] = _ms_saved(ms_before, _roundtrip_ms(data))
+            del raw, text, data
+
+    for name in TRIM_LOGS:
+        stats["log_bytes"] += trim_log_file(LOGS_PATH / name)
+
+    gc.collect()
+    stats["rss_freed"] = max(0, rss_before - rss_bytes())
+    stats["rss"] = rss_bytes()
+    return stats
+
+
+def optimize_reward(stats: dict) -> float:
+    """Bytes recuperados + RSS liberada + ms ahorrados (ya filtrados por el ruido medido)."""
+    reclaimed = stats["memory_bytes"] + stats["log_bytes"]
+    reward = (REWARD_PER_100KB * reclaimed / (100 * 1024)
+              + REWARD_PER_MS * stats["ms_saved"]
+              + REWARD_PER_MB_RSS * stats["rss_freed"] / (1024 * 1024))
+    return round(min(MAX_REWARD, reward), 4)
+
+
+def _mean_std(values: List[float]) -> tuple:
+    if not values:
+        return 0.0, 0.0
+    mean = sum(values) / len(values)
+    return mean, math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+
+
+def _entropy(weights: List[float]) -> float:
+    total = sum(weights)
+    if total <= 0 or len(weights) < 2:
+        return 0.0
+    h = -sum(w / total * math.log(w / total) for w in weights if w > 0)
+    return h / math.log(len(weights))
+
+
+def analyze(ant=None, previous: Optional[dict] = None) -> dict:
+    """
+    Estadísticas reales de memory.json, feromonas, recompensas, feeds y logs/,
+    y la mejora respecto de `previous` (por defecto el último análisis guardado).
+    """
+    with MEMORY_LOCK:
+        try:
+            size = MEM_PATH.stat().st_size
+        except OSError:
+            size = 0
+        data = _load_memory()
+    if previous is None:
+        previous = data.get("analysis")
+
+    sections = {k: len(json.dumps(v, ensure_ascii=False)) for k, v in data.items()}
+    table = ant.table if ant is not None else (data.get("ant_rl") or {}).get("pheromones") or {}
+    entropies = [_entropy(list(actions.values())) for actions in table.values() if actions]
+    min_tau = getattr(ant, "min_tau", 1e-6)
+    evaporated = sum(1 for actions in table.values()
+                     if actions and all(v <= min_tau + 1e-9 for v in actions.values()))
+
+    history = [float(r) for r in (data.get("metrics") or {}).get("history") or []]
+    half = len(history) // 2
+    recent_mean, recent_std = _mean_std(history[half:])
+    older_mean, _ = _mean_std(history[:half])
+
+    feeds: Dict[str, dict] = {}
+    for source, items in (data.get("feeds") or {}).items():
+        base = source[:-7] if source.endswith("_errors") else source
+        f = feeds.setdefault(base, {"ok": 0, "errors": 0})
+        f["errors" if source.endswith("_errors") else "ok"] += len(items or [])
+
+    log_sizes = {}
+    if LOGS_PATH.exists():
+        for p in LOGS_PATH.iterdir():
+            if p.is_file():
+                log_sizes[p.name] = p.stat().st_size
+
+    findings: List[str] = []
+    if size > MEMORY_BUDGET:
+        findings.append(f"memory.json {size} B > {MEMORY_BUDGET} B")
+    if len(data.get("logs") or []) > MAX_MEMORY_LOGS:
+        findings.append(f"{len(data['logs'])} logs en memory.json")
+    findings += [f"{name} {n} B" for name, n in log_sizes.items() if name in TRIM_LOGS and n > LOG_MAX_BYTES]
+    findings += [f"feed {src} falla {f['errors']}/{f['ok'] + f['errors']}"
+                 for src, f in feeds.items() if f["errors"] > f["ok"]]
+    if evaporated:
+        findings.append(f"{evaporated} estados de feromonas evaporados")
+
+    log_bytes = sum(log_sizes.values())
+    improvement = {"findings_resolved": 0, "bytes_reclaimed": 0, "reward_gain": 0.0}
+    if previous:
+        improvement["findings_resolved"] = max(0, len(previous.get("findings") or []) - len(findings))
+        improvement["bytes_reclaimed"] = max(0, previous.get("memory_bytes", 0) + previous.get("log_bytes", 0)
+                                             - size - log_bytes)
+        if history and previous.get("reward_n"):
+            improvement["reward_gain"] = round(recent_mean - previous.get("reward_mean", 0.0), 4)
+
+    return {
+        "time": clock.now(),
+        "memory_bytes": size,
+        "sections": sections,
+        "pheromone_states": len(table),
+        "pheromone_entries": sum(len(a) for a in table.values()),
+        "pheromone_entropy": round(sum(entropies) / len(entropies), 4) if entropies else None,
+        "reward_n": len(history),
+        "reward_mean": round(recent_mean, 4),
+        "reward_std": round(recent_std, 4),
+        "reward_trend": round(recent_mean - older_mean, 4) if half else 0.0,
+        "feeds": feeds,
+        "log_bytes": log_bytes,
+        "rss": rss_bytes(),
+        "findings": findings,
+        "improvement": improvement,
+    }
+
+
+def analyze_reward(report: dict) -> float:
+    """Mejoras medidas desde el análisis anterior: hallazgos resueltos, bytes y recompensa media."""
+    imp = report["improvement"]
+    reward = (REWARD_PER_FINDING * imp["findings_resolved"]
+              + REWARD_PER_100KB * imp["bytes_reclaimed"] / (100 * 1024)
+              + max(0.0, imp["reward_gain"]))
+    return round(min(MAX_REWARD, reward), 4)
+
+
+class RewardBaseline:
+    """
+    Línea base móvil (EMA) de la mejora bruta de una acción. normalize()
+    devuelve NEUTRAL_REWARD·(bruta + s)/(base + s): superar la base paga
+    más, quedarse por debajo menos, y repetir 0 converge a NEUTRAL_REWARD.
+    """
+
+    def __init__(self, alpha: float = BASELINE_ALPHA):
+        self.alpha = alpha
+        self.mean = 0.0
+
+    def normalize(self, raw: float) -> float:
+        reward = NEUTRAL_REWARD * (raw + BASELINE_SMOOTHING) / (self.mean + BASELINE_SMOOTHING)
+        self.mean += self.alpha * (raw - self.mean)
+        return round(min(MAX_REWARD, max(0.0, reward)), 4)
+
+
+# Una línea base por acción, viva mientras dure el proceso
+BASELINES: Dict[str, RewardBaseline] = {"optimize_cpu": RewardBaseline(), "analyze": RewardBaseline()}
+
+
+def save_report(report: dict):
+    """Guarda el último análisis en memory.json (solo el más reciente)."""
+    with MEMORY_LOCK:
+        data = _load_memory()
+        data["analysis"] = report
+        MEM_PATH.parent.mkdir(parents=True, exist_ok=True)
+        MEM_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
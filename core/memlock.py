@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+NeuraBoardEco - Lock de memoria global
+Serializa dentro del proceso las secuencias leer-modificar-escribir de
+memory.json cuando varias etapas corren en hilos (motor asyncio, daemon).
+"""
+
+import threading
+
+MEMORY_LOCK = threading.RLock()
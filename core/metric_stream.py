@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+NeuraBoardEco - Metric Event Stream
+Versión: 2025-10-22
+Autor: vlugoc
+Descripción:
+  Flujo de eventos de métricas en JSONL (una línea por evento) sobre
+  logs/metrics.log con rotación por tamaño, y lector incremental por
+  offsets de bytes que sobrevive a la rotación.
+  - Escritura: MetricEventStream.emit({...})
+  - Lectura:   StreamFollower(path).poll() → lista de eventos nuevos
+  Varios procesos pueden escribir a la vez (orquestador, granja, sandbox):
+  cada línea es un único write() en modo append, cada escritor compara su
+  inodo con el de metrics.log antes de escribir y reabre si otro rotó, y la
+  rotación se serializa con flock sobre metrics.log.lock.
+  Los eventos con reloj simulado van marcados ("sim": true) a su propio
+  stream, metrics.sim.log, para que replay y seguidores no mezclen
+  timestamps virtuales con los reales.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path.home() / "NeuraBoardEco"
+STREAM_PATH = ROOT / "logs" / "metrics.log"
+SIM_STREAM_PATH = ROOT / "logs" / "metrics.sim.log"
+MAX_BYTES = 8 * 1024 * 1024
+BACKUP_COUNT = 3
+
+LEGACY_MARKER = "Última recompensa"
+
+
+class MetricEventStream:
+    """Escritor JSONL con rotación metrics.log → metrics.log.1 … .N."""
+
+    def __init__(self, path: Path = STREAM_PATH, max_bytes: int = MAX_BYTES,
+                 backup_count: int = BACKUP_COUNT):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._fh = None
+        self._inode: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Sin búfer: cada línea sale en un solo write() y en O_APPEND no se intercala
+        self._fh = open(self.path, "ab", buffering=0)
+        self._inode = os.fstat(self._fh.fileno()).st_ino
+
+    def _is_current(self) -> bool:
+        """¿Sigue self.path apuntando al archivo que tenemos abierto?"""
+        try:
+            return os.stat(self.path).st_ino == self._inode
+        except FileNotFoundError:
+            return False
+
+    def _drop(self):
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = None
+        self._inode = None
+
+    def emit(self, event: dict):
+        """Escribe un evento (una línea) y rota si se supera max_bytes."""
+        line = (json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            try:
+                if self._fh is not None and not self._is_current():
+                    self._drop()            # otro proceso rotó el archivo
+                if self._fh is None:
+                    self._open()
+                self._fh.write(line)
+                # En append, tell() es el tamaño real (incluye lo escrito por otros procesos)
+                if self._fh.tell() >= self.max_bytes:
+                    self._rotate()
+            except OSError:
+                self._drop()
+
+    def _rotate(self):
+        """
+        Rota bajo flock exclusivo. Si al obtenerlo otro escritor ya rotó, solo
+        se reabre; una línea que otro proceso escriba justo durante la rotación
+        acaba en .1, donde StreamFollower la recoge por inodo.
+        """
+        lock_path = self.path.with_name(f"{self.path.name}.lock")
+        with open(lock_path, "ab") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                still_due = self._is_current() and os.stat(self.path).st_size >= self.max_bytes
+            except FileNotFoundError:
+                still_due = False
+            if still_due:
+                for i in range(self.backup_count - 1, 0, -1):
+                    src = self.path.with_name(f"{self.path.name}.{i}")
+                    if src.exists():
+                        os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+                if self.backup_count > 0:
+                    os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+                else:
+                    self.path.unlink(missing_ok=True)
+        self._drop()
+
+    def close(self):
+        with self._lock:
+            self._drop()
+
+
+_streams: Dict[bool, MetricEventStream] = {}
+
+
+def get_stream(simulated: bool = False) -> MetricEventStream:
+    """Stream compartido del proceso (un solo descriptor abierto); aparte el de reloj simulado."""
+    if simulated not in _streams:
+        _streams[simulated] = MetricEventStream(SIM_STREAM_PATH if simulated else STREAM_PATH)
+    return _streams[simulated]
+
+
+def parse_line(raw: bytes) -> Optional[dict]:
+    """Convierte una línea en evento; acepta también el formato de texto legado."""
+    raw = raw.strip()
+    if not raw:
+        return None
+    if raw[:1] == b"{":
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+    text = raw.decode("utf-8", errors="replace")
+    if LEGACY_MARKER in text:
+        try:
+            return {"type": "cycle", "reward": float(text.split(":")[-1]), "legacy": text}
+        except ValueError:
+            return None
+    return None
+
+
+class StreamFollower:
+    """
+    Lector incremental tipo tail -f basado en offsets.
+    Cada poll() hace un stat() y lee solo los bytes nuevos; si detecta
+    rotación (inode distinto o archivo truncado) termina de leer el
+    archivo rotado (.1) desde el offset previo y reinicia en 0.
+    """
+
+    def __init__(self, path: Path = STREAM_PATH, from_start: bool = False):
+        self.path = Path(path)
+        self.offset = 0
+        self.inode: Optional[int] = None
+        self._buf = b""
+        if not from_start:
+            try:
+                st = os.stat(self.path)
+                self.offset, self.inode = st.st_size, st.st_ino
+            except FileNotFoundError:
+                pass
+
+    def _read_from(self, path: Path, offset: int) -> bytes:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return f.read()
+
+    def _split(self, chunk: bytes) -> List[dict]:
+        lines = (self._buf + chunk).split(b"\n")
+        self._buf = lines.pop()
+        events = []
+        for raw in lines:
+            ev = parse_line(raw)
+            if ev is not None:
+                events.append(ev)
+        return events
+
+    def poll(self) -> List[dict]:
+        """Devuelve los eventos completos escritos desde la última llamada."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        events: List[dict] = []
+        if self.inode is not None and (st.st_ino != self.inode or st.st_size < self.offset):
+            rotated = self.path.with_name(f"{self.path.name}.1")
+            try:
+                if os.stat(rotated).st_ino == self.inode:
+                    events.extend(self._split(self._read_from(rotated, self.offset)))
+            except FileNotFoundError:
+                pass
+            if self._buf:
+                events.extend(self._split(b"\n"))
+            self.offset = 0
+        self.inode = st.st_ino
+        if st.st_size > self.offset:
+            chunk = self._read_from(self.path, self.offset)
+            self.offset += len(chunk)
+            events.extend(self._split(chunk))
+        return events
@@ -6,57 +6,547 @@ Autor: vlugoc
 Descripción:
   Sistema de métricas adaptativas para el aprendizaje por refuerzo
   dentro del ecosistema NeuraBoardEco.
+  - Sketches de cuantiles (histograma logarítmico) por acción y por fuente
+  - Rollups multi-resolución (minuto/hora/día) con retención de puntos crudos
+  - Eventos estructurados JSONL en logs/metrics.log (core.metric_stream);
+    con reloj simulado van marcados "sim" a logs/metrics.sim.log y no
+    entran en los rollups (sus timestamps no son tiempo real)
 """
 
 import json
+import math
 import time
+from collections import Counter
 from pathlib import Path
-from statistics import mean
+from typing import Dict, Iterable, Optional
+
+from core import clock, telemetry
+from core.memlock import MEMORY_LOCK
+from core.metric_stream import get_stream
+from core.tracing import traced
 
 ROOT = Path.home() / "NeuraBoardEco"
 MEM_PATH = ROOT / "memory.json"
 
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# Resoluciones de rollup: nombre → (segundos por bucket, buckets retenidos)
+DEFAULT_RESOLUTIONS = {
+    "1m": (60, 24 * 60),       # 24 h a nivel de minuto
+    "1h": (3600, 24 * 90),     # 90 días a nivel de hora
+    "1d": (86400, 365 * 5),    # 5 años a nivel de día
+}
+# Puntos crudos de recompensa que se conservan en memoria/memory.json
+RAW_RETENTION = 1000
+
+
+class RewardSketch:
+    """
+    Histograma logarítmico de buckets fijos (estilo DDSketch) para recompensas.
+    - Error relativo acotado por `relative_accuracy`
+    - Memoria acotada por `max_buckets` (colapsa los buckets de menor magnitud)
+    - Fusionable: sketches con la misma precisión se combinan sumando buckets
+    """
+
+    ZERO_THRESHOLD = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 512):
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError("relative_accuracy debe estar en (0, 1).")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    # ---------- Buckets ----------
+    def _key(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2.0 * self.gamma ** key / (self.gamma + 1.0)
+
+    def _collapse(self):
+        """Mantiene el total de buckets bajo `max_buckets` fusionando los de menor magnitud."""
+        while len(self.positive) + len(self.negative) > self.max_buckets:
+            store = self.positive if len(self.positive) >= len(self.negative) else self.negative
+            keys = sorted(store)
+            if len(keys) < 2:
+                break
+            low, nxt = keys[0], keys[1]
+            store[nxt] += store.pop(low)
+
+    # ---------- API ----------
+    def add(self, value: float, n: int = 1):
+        """Añade `n` observaciones del valor dado."""
+        value = float(value)
+        if value > self.ZERO_THRESHOLD:
+            k = self._key(value)
+            self.positive[k] = self.positive.get(k, 0) + n
+        elif value < -self.ZERO_THRESHOLD:
+            k = self._key(-value)
+            self.negative[k] = self.negative.get(k, 0) + n
+        else:
+            self.zero += n
+        self.count += n
+        self.total += value * n
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._collapse()
+
+    def add_many(self, values: Iterable[float]):
+        """Añade un lote de observaciones con un solo colapso al final."""
+        values = [float(v) for v in values]
+        if not values:
+            return
+        log, ceil, log_gamma, zt = math.log, math.ceil, self._log_gamma, self.ZERO_THRESHOLD
+        pos = [v for v in values if v > zt]
+        neg = [-v for v in values if v < -zt]
+        for store, mags in ((self.positive, pos), (self.negative, neg)):
+            for k, c in Counter([ceil(log(m) / log_gamma) for m in mags]).items():
+                store[k] = store.get(k, 0) + c
+        self.zero += len(values) - len(pos) - len(neg)
+        self.count += len(values)
+        self.total += sum(values)
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+        self._collapse()
+
+    def merge(self, other: "RewardSketch"):
+        """Fusiona otro sketch (misma precisión relativa) dentro de este."""
+        if abs(other.gamma - self.gamma) > 1e-12:
+            raise ValueError("No se pueden fusionar sketches con distinta precisión.")
+        for k, c in other.positive.items():
+            self.positive[k] = self.positive.get(k, 0) + c
+        for k, c in other.negative.items():
+            self.negative[k] = self.negative.get(k, 0) + c
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Devuelve el cuantil q ∈ [0, 1], o None si no hay observaciones."""
+        if self.count == 0:
+            return None
+        q = min(1.0, max(0.0, q))
+        rank = q * (self.count - 1)
+        acc = 0
+        # Orden ascendente: negativos de mayor magnitud → cero → positivos
+        for k in sorted(self.negative, reverse=True):
+            acc += self.negative[k]
+            if acc > rank:
+                return max(self.min, -self._value(k))
+        acc += self.zero
+        if acc > rank:
+            return 0.0
+        for k in sorted(self.positive):
+            acc += self.positive[k]
+            if acc > rank:
+                return min(self.max, self._value(k))
+        return self.max
+
+    def quantiles(self, qs: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Optional[float]]:
+        return {f"p{round(q * 100):g}": self.quantile(q) for q in qs}
+
+    # ---------- Serialización ----------
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "positive": {str(k): c for k, c in self.positive.items()},
+            "negative": {str(k): c for k, c in self.negative.items()},
+            "zero": self.zero,
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RewardSketch":
+        sk = cls(data.get("relative_accuracy", 0.01), data.get("max_buckets", 512))
+        sk.positive = {int(k): int(c) for k, c in (data.get("positive") or {}).items()}
+        sk.negative = {int(k): int(c) for k, c in (data.get("negative") or {}).items()}
+        sk.zero = int(data.get("zero", 0))
+        sk.count = int(data.get("count", 0))
+        sk.total = float(data.get("sum", 0.0))
+        if sk.count:
+            sk.min = float(data["min"])
+            sk.max = float(data["max"])
+        return sk
+
+
+class MetricRollup:
+    """
+    Agregados incrementales count/sum/min/max/last por resolución temporal.
+    Cada bucket es [count, sum, min, max, last]; el coste de ingestión es
+    O(nº de resoluciones) y el de consulta depende solo del rango pedido.
+    """
+
+    def __init__(self, resolutions: Optional[Dict[str, tuple]] = None):
+        self.resolutions = dict(resolutions or DEFAULT_RESOLUTIONS)
+        self.series: Dict[str, Dict[int, list]] = {name: {} for name in self.resolutions}
+
+    def ingest(self, value: float, ts: Optional[float] = None):
+        """Incorpora un punto en todas las resoluciones."""
+        ts = clock.now() if ts is None else ts
+        value = float(value)
+        for name, (step, keep) in self.resolutions.items():
+            buckets = self.series[name]
+            start = int(ts // step) * step
+            b = buckets.get(start)
+            if b is None:
+                buckets[start] = [1, value, value, value, value]
+                self._expire(name, keep)
+            else:
+                b[0] += 1
+                b[1] += value
+                b[2] = min(b[2], value)
+                b[3] = max(b[3], value)
+                b[4] = value
+
+    def ingest_many(self, values: Iterable[float], ts: Optional[float] = None):
+        """Incorpora un lote de puntos con el mismo timestamp (un bucket por resolución)."""
+        values = [float(v) for v in values]
+        if not values:
+            return
+        ts = clock.now() if ts is None else ts
+        n, total, lo, hi, last = len(values), sum(values), min(values), max(values), values[-1]
+        for name, (step, keep) in self.resolutions.items():
+            buckets = self.series[name]
+            start = int(ts // step) * step
+            b = buckets.get(start)
+            if b is None:
+                buckets[start] = [n, total, lo, hi, last]
+                self._expire(name, keep)
+            else:
+                b[0] += n
+                b[1] += total
+                b[2] = min(b[2], lo)
+                b[3] = max(b[3], hi)
+                b[4] = last
+
+    def _expire(self, name: str, keep: int):
+        buckets = self.series[name]
+        excess = len(buckets) - keep
+        if excess > 0:
+            for start in sorted(buckets)[:excess]:
+                del buckets[start]
+
+    def merge(self, other: "MetricRollup"):
+        """Fusiona otro rollup (se asume que `other` contiene los datos más recientes)."""
+        for name, buckets in other.series.items():
+            if name not in self.series:
+                continue
+            dst = self.series[name]
+            for start, (c, sm, lo, hi, last) in buckets.items():
+                b = dst.get(start)
+                if b is None:
+                    dst[start] = [c, sm, lo, hi, last]
+                else:
+                    b[0] += c
+                    b[1] += sm
+                    b[2] = min(b[2], lo)
+                    b[3] = max(b[3], hi)
+                    b[4] = last
+            self._expire(name, self.resolutions[name][1])
+
+    def best_resolution(self, span: float, max_points: int = 120) -> str:
+        """Resolución más fina que cubre `span` segundos con ≤ max_points buckets."""
+        ordered = sorted(self.resolutions.items(), key=lambda kv: kv[1][0])
+        for name, (step, _) in ordered:
+            if span / step <= max_points:
+                return name
+        return ordered[-1][0]
+
+    def query(self, resolution: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> list:
+        """Devuelve los buckets de `resolution` dentro de [start, end], ordenados."""
+        buckets = self.series.get(resolution)
+        if buckets is None:
+            raise ValueError(f"Resolución desconocida: {resolution}")
+        rows = []
+        for ts in sorted(buckets):
+            if (start is not None and ts < start) or (end is not None and ts > end):
+                continue
+            c, sm, lo, hi, last = buckets[ts]
+            rows.append({"ts": ts, "count": c, "sum": sm, "min": lo, "max": hi,
+                         "last": last, "avg": sm / c if c else 0.0})
+        return rows
+
+    def to_dict(self) -> dict:
+        return {name: {str(ts): b for ts, b in buckets.items()} for name, buckets in self.series.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict, resolutions: Optional[Dict[str, tuple]] = None) -> "MetricRollup":
+        r = cls(resolutions)
+        for name, buckets in (data or {}).items():
+            if name in r.series:
+                r.series[name] = {int(ts): list(b) for ts, b in sorted(buckets.items(), key=lambda kv: int(kv[0]))}
+        return r
+
+
+def _merge_sketch_groups(dst: Dict[str, Dict[str, RewardSketch]], src: dict):
+    """Fusiona un export {"overall": {...}, "by_action": {...}, "by_source": {...}} en dst."""
+    for group in ("by_action", "by_source"):
+        for label, raw in (src.get(group) or {}).items():
+            sk = RewardSketch.from_dict(raw)
+            if label in dst[group]:
+                dst[group][label].merge(sk)
+            else:
+                dst[group][label] = sk
+    if src.get("overall"):
+        dst["overall"]["all"].merge(RewardSketch.from_dict(src["overall"]))
+
+
+def _export_sketch_groups(groups: Dict[str, Dict[str, RewardSketch]]) -> dict:
+    return {
+        "overall": groups["overall"]["all"].to_dict(),
+        "by_action": {k: v.to_dict() for k, v in groups["by_action"].items()},
+        "by_source": {k: v.to_dict() for k, v in groups["by_source"].items()},
+    }
+
+
+def _new_sketch_groups() -> Dict[str, Dict[str, RewardSketch]]:
+    return {"overall": {"all": RewardSketch()}, "by_action": {}, "by_source": {}}
+
 
 class LearningMetrics:
     """Clase de métricas de aprendizaje para NeuraBoardEco."""
 
-    def __init__(self):
+    def __init__(self, source: str = "orchestrator", raw_retention: int = RAW_RETENTION,
+                 emit_events: bool = True, autosave: bool = True):
         self.cycles = 0
         self.rewards = []
         self.last_avg = None
+        self.source = source
+        self.raw_retention = raw_retention
+        # Agregados exactos aunque los puntos crudos expiren
+        self.reward_sum = 0.0
+        self.best = None
+        self.worst = None
+        self.rollup = MetricRollup()
+        self._pending_rollup = MetricRollup()
+        self.stream = get_stream() if emit_events else None
+        self.sim_stream = get_stream(simulated=True) if emit_events else None
+        # autosave=False difiere la escritura de memory.json hasta flush() (modo lote)
+        self.autosave = autosave
+        # Sketches locales (esta instancia) y delta pendiente de fusionar en memory.json
+        self.sketches = _new_sketch_groups()
+        self._pending = _new_sketch_groups()
+
+    def _emit(self, event: dict):
+        """Al stream real, o marcado "sim" al stream simulado si el reloj es virtual."""
+        if self.stream is None:
+            return
+        if clock.simulated():
+            event["sim"] = True
+            self.sim_stream.emit(event)
+        else:
+            self.stream.emit(event)
 
-    def register_cycle(self, reward: float):
+    @traced("register_cycle")
+    def register_cycle(self, reward: float, action: Optional[str] = None,
+                       source: Optional[str] = None):
         """Registra una nueva recompensa de aprendizaje."""
         self.cycles += 1
         self.rewards.append(reward)
+        if len(self.rewards) > self.raw_retention:
+            del self.rewards[: len(self.rewards) - self.raw_retention]
+        self.reward_sum += reward
+        self.best = reward if self.best is None else max(self.best, reward)
+        self.worst = reward if self.worst is None else min(self.worst, reward)
+        ts = clock.now()
+        if not clock.simulated():
+            self.rollup.ingest(reward, ts)
+            self._pending_rollup.ingest(reward, ts)
+        src = source or self.source
+        telemetry.CYCLES.inc(source=src)
+        telemetry.REWARD.observe(reward, source=src)
+        self._emit({"ts": ts, "type": "cycle", "source": src, "action": action,
+                    "reward": reward, "cycle": self.cycles, "avg": self.avg_reward})
+        for groups in (self.sketches, self._pending):
+            groups["overall"]["all"].add(reward)
+            groups["by_source"].setdefault(src, RewardSketch()).add(reward)
+            if action:
+                groups["by_action"].setdefault(action, RewardSketch()).add(reward)
+        if self.autosave:
+            self.save_to_memory()
+
+    @traced("register_batch")
+    def register_batch(self, rewards: Iterable[float], actions: Optional[Iterable[str]] = None,
+                       source: Optional[str] = None):
+        """
+        Registra un lote de recompensas (p. ej. un paso de N entornos) con
+        una sola actualización de agregados, un evento "batch" en el stream y,
+        con autosave, una sola escritura de memory.json.
+        - actions: etiquetas paralelas a rewards (opcional)
+        """
+        rewards = [float(r) for r in rewards]
+        if not rewards:
+            return
+        n = len(rewards)
+        self.cycles += n
+        self.rewards.extend(rewards[-self.raw_retention:])
+        if len(self.rewards) > self.raw_retention:
+            del self.rewards[: len(self.rewards) - self.raw_retention]
+        total, lo, hi = sum(rewards), min(rewards), max(rewards)
+        self.reward_sum += total
+        self.best = hi if self.best is None else max(self.best, hi)
+        self.worst = lo if self.worst is None else min(self.worst, lo)
+        ts = clock.now()
+        if not clock.simulated():
+            self.rollup.ingest_many(rewards, ts)
+            self._pending_rollup.ingest_many(rewards, ts)
+        src = source or self.source
+        telemetry.CYCLES.inc(n, source=src)
+        telemetry.REWARD.observe_many(rewards, source=src)
+        self._emit({"ts": ts, "type": "batch", "source": src, "n": n, "mean": total / n,
+                    "min": lo, "max": hi, "cycle": self.cycles, "avg": self.avg_reward})
+        # Cada valor se indexa una sola vez; los grupos reciben fusiones O(buckets)
+        by_action: Dict[str, RewardSketch] = {}
+        if actions is not None:
+            values: Dict[str, list] = {}
+            for a, r in zip(actions, rewards):
+                values.setdefault(a, []).append(r)
+            for a, vals in values.items():
+                by_action[a] = RewardSketch()
+                by_action[a].add_many(vals)
+        overall = RewardSketch()
+        if by_action:
+            for sk in by_action.values():
+                overall.merge(sk)
+        else:
+            overall.add_many(rewards)
+        for groups in (self.sketches, self._pending):
+            groups["overall"]["all"].merge(overall)
+            groups["by_source"].setdefault(src, RewardSketch()).merge(overall)
+            for a, sk in by_action.items():
+                groups["by_action"].setdefault(a, RewardSketch()).merge(sk)
+        if self.autosave:
+            self.save_to_memory()
+
+    def flush(self):
+        """Persiste las métricas pendientes en memory.json."""
         self.save_to_memory()
 
+    def quantiles(self, action: Optional[str] = None, source: Optional[str] = None,
+                  qs: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Optional[float]]:
+        """Cuantiles de recompensa globales, por acción o por fuente."""
+        if action is not None:
+            sk = self.sketches["by_action"].get(action)
+        elif source is not None:
+            sk = self.sketches["by_source"].get(source)
+        else:
+            sk = self.sketches["overall"]["all"]
+        return sk.quantiles(qs) if sk else {}
+
     def summary(self) -> str:
         """Devuelve un resumen de rendimiento actual."""
-        if not self.rewards:
+        if not self.cycles:
             return "[📊] Sin métricas registradas."
-        avg_reward = mean(self.rewards)
-        best = max(self.rewards)
-        worst = min(self.rewards)
-        return (
+        lines = [
             f"[📊] Ciclos: {self.cycles} | "
-            f"Promedio: {avg_reward:.2f} | "
-            f"Mejor: {best:.2f} | "
-            f"Peor: {worst:.2f}"
-        )
+            f"Promedio: {self.avg_reward:.2f} | "
+            f"Mejor: {self.best:.2f} | "
+            f"Peor: {self.worst:.2f} | "
+            f"{self._format_quantiles(self.quantiles())}"
+        ]
+        for action in sorted(self.sketches["by_action"]):
+            lines.append(f"     ↳ {action}: {self._format_quantiles(self.quantiles(action=action))}")
+        return "\n".join(lines)
+
+    @property
+    def avg_reward(self) -> float:
+        return self.reward_sum / self.cycles if self.cycles else 0.0
+
+    def query_rollup(self, start: float, end: Optional[float] = None,
+                     max_points: int = 120, resolution: Optional[str] = None) -> list:
+        """Consulta el rollup persistido eligiendo la resolución según el rango pedido."""
+        end = clock.now() if end is None else end
+        rollup = self.load_global_rollup()
+        rollup.merge(self._pending_rollup)
+        res = resolution or rollup.best_resolution(end - start, max_points)
+        return rollup.query(res, start, end)
+
+    @staticmethod
+    def _format_quantiles(qs: Dict[str, Optional[float]]) -> str:
+        return " ".join(f"{k}={v:.2f}" for k, v in qs.items() if v is not None)
+
+    # ---------- Export / fusión ----------
+    def export_sketches(self) -> dict:
+        """Exporta los sketches locales en formato JSON serializable."""
+        return _export_sketch_groups(self.sketches)
+
+    def export_quantiles(self, qs: Iterable[float] = DEFAULT_QUANTILES) -> dict:
+        """Tabla plana de cuantiles: global, por acción y por fuente."""
+        qs = tuple(qs)
+        return {
+            "overall": self.quantiles(qs=qs),
+            "by_action": {a: self.quantiles(action=a, qs=qs) for a in self.sketches["by_action"]},
+            "by_source": {s: self.quantiles(source=s, qs=qs) for s in self.sketches["by_source"]},
+        }
+
+    def merge_sketches(self, exported: dict):
+        """Fusiona sketches exportados por otra instancia o proceso."""
+        _merge_sketch_groups(self.sketches, exported)
+
+    @staticmethod
+    def load_global_sketches() -> dict:
+        """Sketches acumulados de todos los procesos (persistidos en memory.json)."""
+        if not MEM_PATH.exists():
+            return {}
+        try:
+            data = json.loads(MEM_PATH.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+        return (data.get("metrics") or {}).get("sketches") or {}
+
+    @staticmethod
+    def load_global_rollup() -> MetricRollup:
+        """Rollup acumulado de todos los procesos (persistido en memory.json)."""
+        if not MEM_PATH.exists():
+            return MetricRollup()
+        try:
+            data = json.loads(MEM_PATH.read_text(encoding="utf-8"))
+        except Exception:
+            return MetricRollup()
+        return MetricRollup.from_dict((data.get("metrics") or {}).get("rollups") or {})
 
     def save_to_memory(self):
         """Guarda las métricas en memory.json."""
-        if MEM_PATH.exists():
-            data = json.loads(MEM_PATH.read_text(encoding="utf-8"))
-        else:
-            data = {}
-        data["metrics"] = {
-            "cycles": self.cycles,
-            "avg_reward": mean(self.rewards) if self.rewards else 0,
-            "history": self.rewards,
-        }
-        MEM_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        with MEMORY_LOCK:
+            if MEM_PATH.exists():
+                data = json.loads(MEM_PATH.read_text(encoding="utf-8"))
+            else:
+                data = {}
+            # Fusiona solo el delta pendiente para acumular entre procesos sin duplicar
+            merged = _new_sketch_groups()
+            _merge_sketch_groups(merged, (data.get("metrics") or {}).get("sketches") or {})
+            _merge_sketch_groups(merged, _export_sketch_groups(self._pending))
+            self._pending = _new_sketch_groups()
+            rollup = MetricRollup.from_dict((data.get("metrics") or {}).get("rollups") or {})
+            rollup.merge(self._pending_rollup)
+            self._pending_rollup = MetricRollup()
+            data["metrics"] = {
+                "cycles": self.cycles,
+                "avg_reward": self.avg_reward,
+                "history": self.rewards,
+                "sketches": _export_sketch_groups(merged),
+                "rollups": rollup.to_dict(),
+            }
+            t0 = time.perf_counter()
+            MEM_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+            telemetry.MEMORY_WRITE.observe(time.perf_counter() - t0, writer="metrics")
 
     def adaptive_adjustment(self, ant):
         """
@@ -65,10 +555,10 @@ class LearningMetrics:
         - Si el promedio sube → baja exploración (ε) y evaporación (ρ)
         - Si el promedio baja → aumenta exploración
         """
-        if not self.rewards:
+        if not self.cycles:
             return
 
-        avg = sum(self.rewards) / len(self.rewards)
+        avg = self.avg_reward
         trend = avg - (self.last_avg if self.last_avg is not None else avg)
         self.last_avg = avg
 
@@ -81,4 +571,8 @@ class LearningMetrics:
             ant.rho = min(0.2, ant.rho * 1.05)
             msg = f"📉 Rendimiento ↓ | Ajuste: epsilon={ant.epsilon:.3f}, rho={ant.rho:.3f}"
 
+        telemetry.EPSILON.set(ant.epsilon)
+        telemetry.RHO.set(ant.rho)
+        self._emit({"ts": clock.now(), "type": "adjust", "source": self.source,
+                    "epsilon": ant.epsilon, "rho": ant.rho, "avg": avg})
         print(f"[Metrics] {msg}")
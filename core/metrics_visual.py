@@ -2,13 +2,39 @@
 """
 metrics_visual.py — Visualizador en tiempo real del aprendizaje
 Muestra una barra de progreso y tendencia basada en el archivo metrics.log
+Uso:
+  python core/metrics_visual.py                 → monitor en tiempo real
+  python core/metrics_visual.py --refresh 0.1   → monitor con refresco de 100 ms
+  python core/metrics_visual.py --rollup 24     → promedios de las últimas 24 h (rollups)
+  python core/metrics_visual.py --replay [ruta] → análisis offline (mmap) de logs históricos
 """
 
+import argparse
+import math
+import mmap
+import re
+import shutil
+import sys
 import time
-import os
+from collections import Counter
 from pathlib import Path
 
-LOG_PATH = Path.home() / "NeuraBoardEco" / "logs" / "metrics.log"
+from core.metrics import LearningMetrics
+from core.metric_stream import STREAM_PATH, StreamFollower
+from core import profiler
+
+LOG_PATH = STREAM_PATH
+DEFAULT_REFRESH = 0.25
+
+# Modo replay: se escanea el log mapeado en memoria por bloques grandes
+REPLAY_CHUNK = 64 * 1024 * 1024
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+# Eventos con recompensa: "cycle" (una) y "batch" (n, media, min, max de un lote)
+CYCLE_RE = re.compile(rb'"ts":([-0-9.eE+]+),"type":"(?:cycle|batch)"')
+# Solo los eventos de ciclo llevan "reward"; el patrón corto evita backtracking
+REWARD_RE = re.compile(rb'"reward":([-0-9.eE+]+)')
+BATCH_RE = re.compile(rb'"type":"batch",[^\n]*?"n":(\d+),"mean":([-0-9.eE+]+),"min":([-0-9.eE+]+),"max":([-0-9.eE+]+)')
+LEGACY_RE = re.compile("Última recompensa[^\n:]*:\\s*([-0-9.eE+]+)".encode("utf-8"))
 
 
 def draw_bar(value: float, max_width: int = 40) -> str:
@@ -18,38 +44,304 @@ def draw_bar(value: float, max_width: int = 40) -> str:
     return "█" * filled + "░" * empty
 
 
-def follow(file):
-    """Sigue los cambios de un archivo tipo tail -f"""
-    file.seek(0, os.SEEK_END)
+def follow(path: Path = LOG_PATH, refresh: float = DEFAULT_REFRESH):
+    """Sigue el stream de eventos por offsets de bytes (tipo tail -F, sobrevive a la rotación)."""
+    follower = StreamFollower(path)
     while True:
-        line = file.readline()
-        if not line:
-            time.sleep(1)
+        events = follower.poll()
+        if not events:
+            time.sleep(refresh)
             continue
-        yield line
+        yield events
+
 
+def render_event(event: dict):
+    """Imprime un evento del stream con su barra de recompensa."""
+    kind = event.get("type")
+    if kind == "cycle":
+        reward = float(event.get("reward", 0.0))
+        bar = draw_bar(min(max(reward, 0), 10))
+        stamp = time.strftime("%H:%M:%S", time.localtime(event.get("ts", time.time())))
+        label = f"{event.get('source', '?')}/{event.get('action') or '-'}"
+        avg = event.get("avg")
+        avg_txt = f" | promedio {avg:.2f}" if avg is not None else ""
+        print(f"\033[1;33m[{stamp}] {label} ciclo {event.get('cycle', '?')}{avg_txt}\033[0m")
+        print(f"[{bar}]  {reward:.2f}/10.00\n")
+    elif kind == "batch":
+        stamp = time.strftime("%H:%M:%S", time.localtime(event.get("ts", time.time())))
+        n, mean = event.get("n", 0), float(event.get("mean", 0.0))
+        print(f"\033[1;33m[{stamp}] {event.get('source', '?')} lote de {n} pasos "
+              f"(ciclo {event.get('cycle', '?')})\033[0m")
+        print(f"[{draw_bar(min(max(mean, 0), 10))}]  media {mean:.2f} "
+              f"min {event.get('min', 0):.2f} max {event.get('max', 0):.2f}\n")
+    elif kind == "adjust":
+        print(f"\033[1;36m[Ajuste] epsilon={event.get('epsilon', 0):.3f} rho={event.get('rho', 0):.3f}\033[0m\n")
 
-def visualize_learning():
+
+def visualize_learning(refresh: float = DEFAULT_REFRESH):
     print("\033[1;36m[NeuraBoardEco Monitor] 📊 Modo Visual en Tiempo Real\033[0m\n")
+    if not LOG_PATH.exists():
+        print("⚠️ No se encontró el archivo metrics.log — ejecuta primero el orquestador.")
     print("Esperando recompensas...\n")
-    time.sleep(2)
 
     try:
-        with open(LOG_PATH, "r", encoding="utf-8") as f:
-            for line in follow(f):
-                if "Última recompensa" in line:
-                    try:
-                        reward_str = line.strip().split(":")[-1]
-                        reward = float(reward_str)
-                    except ValueError:
-                        reward = 0.0
-                    bar = draw_bar(min(max(reward, 0), 10))
-                    print(f"\033[1;33m{line.strip()}\033[0m")
-                    print(f"[{bar}]  {reward:.2f}/10.00\n")
-    except FileNotFoundError:
-        print("⚠️ No se encontró el archivo metrics.log — ejecuta primero el orquestador.")
+        for events in follow(LOG_PATH, refresh):
+            # En ráfagas solo se dibujan los últimos eventos para no saturar la terminal
+            for event in events[-20:]:
+                render_event(event)
+    except KeyboardInterrupt:
+        return
+
+
+def show_rollup(hours: float = 24.0, max_points: int = 48):
+    """Muestra promedios agregados de un rango largo usando los rollups de memory.json."""
+    end = time.time()
+    rows = LearningMetrics().query_rollup(end - hours * 3600, end, max_points=max_points)
+    if not rows:
+        print("⚠️ Sin rollups registrados — ejecuta primero el orquestador.")
+        return
+    print(f"\033[1;36m[NeuraBoardEco Monitor] 📈 Últimas {hours:g} h ({len(rows)} buckets)\033[0m\n")
+    for row in rows:
+        stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["ts"]))
+        bar = draw_bar(min(max(row["avg"], 0), 10), max_width=30)
+        print(f"{stamp} [{bar}] avg={row['avg']:.2f} min={row['min']:.2f} "
+              f"max={row['max']:.2f} n={row['count']}")
+
+
+def replay_paths(path: Path = LOG_PATH) -> list:
+    """Archivos de un stream en orden cronológico: metrics.log.N … .1, metrics.log."""
+    rotated = sorted(path.parent.glob(f"{path.name}.[0-9]*"),
+                     key=lambda p: int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0, reverse=True)
+    return [p for p in rotated + [path] if p.exists() and p.stat().st_size > 0]
+
+
+def _iter_chunks(mm: mmap.mmap, start: int = 0, stop: int = None, chunk_size: int = REPLAY_CHUNK):
+    """Bloques del mmap [start, stop) alineados a fin de línea."""
+    pos, size = start, len(mm) if stop is None else stop
+    while pos < size:
+        end = min(size, pos + chunk_size)
+        if end < size:
+            nl = mm.find(b"\n", end, size)
+            end = size if nl == -1 else nl + 1
+        yield mm[pos:end]
+        pos = end
+
+
+def _ts_at(mm: mmap.mmap, offset: int) -> tuple:
+    """(timestamp, offset de línea) del primer evento de ciclo o lote en o tras `offset`."""
+    if offset > 0:
+        nl = mm.find(b"\n", offset - 1)
+        if nl == -1:
+            return None, len(mm)
+        offset = nl + 1
+    m = CYCLE_RE.search(mm, offset, min(len(mm), offset + 1024 * 1024))
+    if not m:
+        return None, len(mm)
+    return float(m.group(1)), mm.rfind(b"\n", 0, m.start()) + 1
+
+
+def _offset_for_ts(mm: mmap.mmap, ts: float) -> int:
+    """Búsqueda binaria del primer byte cuya línea tiene timestamp ≥ ts (stream ordenado)."""
+    lo, hi = 0, len(mm)
+    while hi - lo > 4096:
+        mid = (lo + hi) // 2
+        t, line = _ts_at(mm, mid)
+        if t is None or t >= ts:
+            hi = mid
+        else:
+            lo = mid
+    # Ajuste fino lineal dentro de la última ventana
+    pos = _ts_at(mm, lo)[1] if lo else 0
+    while pos < hi:
+        t, line = _ts_at(mm, pos)
+        if t is None or t >= ts:
+            return line
+        nl = mm.find(b"\n", line)
+        pos = len(mm) if nl == -1 else nl + 1
+    return _ts_at(mm, hi)[1] if hi < len(mm) else len(mm)
+
+
+def _ts_bounds(paths: list) -> tuple:
+    """Primer y último timestamp leyendo solo la cabeza del primer archivo y la cola del último."""
+    first = last = None
+    with open(paths[0], "rb") as f:
+        m = CYCLE_RE.search(f.read(1024 * 1024))
+        if m:
+            first = float(m.group(1))
+    with open(paths[-1], "rb") as f:
+        f.seek(0, 2)
+        f.seek(max(0, f.tell() - 1024 * 1024))
+        found = CYCLE_RE.findall(f.read())
+        if found:
+            last = float(found[-1])
+    return first, last
+
+
+def _accumulate(agg: dict, i: int, values: list):
+    """Suma un lote de recompensas al bucket i con operaciones en C (map/sum/min/max)."""
+    if not values:
+        return
+    agg["counts"][i] += len(values)
+    agg["sums"][i] += sum(values)
+    agg["mins"][i] = min(agg["mins"][i], min(values))
+    agg["maxs"][i] = max(agg["maxs"][i], max(values))
+    agg["hist"].update(map(math.floor, map((10.0).__mul__, values)))
+    agg["events"] += len(values)
+
+
+def _accumulate_batches(agg: dict, i: int, batches: list):
+    """
+    Suma eventos "batch" (n, media, min, max) al bucket i. Los valores
+    individuales no viajan en el stream: el histograma los aproxima con n
+    ocurrencias de la media del lote.
+    """
+    for n, mean, lo, hi in batches:
+        n, mean = int(n), float(mean)
+        if not n:
+            continue
+        agg["counts"][i] += n
+        agg["sums"][i] += n * mean
+        agg["mins"][i] = min(agg["mins"][i], float(lo))
+        agg["maxs"][i] = max(agg["maxs"][i], float(hi))
+        agg["hist"][math.floor(mean * 10.0)] += n
+        agg["events"] += n
+        agg["batches"] += 1
+
+
+def scan_log(paths: list, buckets: int) -> dict:
+    """
+    Agrega recompensas en `buckets` intervalos de tiempo de igual ancho.
+    Como el stream está ordenado por tiempo, los límites de cada bucket se
+    localizan por búsqueda binaria sobre el mmap y cada tramo se procesa por
+    bloques grandes sin bucle Python por evento. Memoria O(buckets).
+    """
+    agg = {"counts": [0] * buckets, "sums": [0.0] * buckets,
+           "mins": [float("inf")] * buckets, "maxs": [float("-inf")] * buckets,
+           "hist": Counter(), "events": 0, "batches": 0, "bytes": 0, "legacy": False}
+    t0, t1 = _ts_bounds(paths)
+    if t0 is None:
+        return _scan_legacy(paths, buckets, agg)
+    if t1 is None or t1 <= t0:
+        t1 = t0 + 1.0
+    agg["t0"], agg["t1"] = t0, t1
+    width = (t1 - t0) / buckets
+    for p in paths:
+        with open(p, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            agg["bytes"] += len(mm)
+            bounds = [0] + [_offset_for_ts(mm, t0 + i * width) for i in range(1, buckets)] + [len(mm)]
+            for i in range(buckets):
+                if bounds[i + 1] <= bounds[i]:
+                    continue
+                for chunk in _iter_chunks(mm, bounds[i], bounds[i + 1]):
+                    _accumulate(agg, i, list(map(float, REWARD_RE.findall(chunk))))
+                    _accumulate_batches(agg, i, BATCH_RE.findall(chunk))
+    return agg
+
+
+def _scan_legacy(paths: list, buckets: int, agg: dict) -> dict:
+    """Logs de texto sin timestamps: buckets por índice de evento."""
+    values = []
+    for p in paths:
+        with open(p, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            agg["bytes"] += len(mm)
+            for chunk in _iter_chunks(mm):
+                values.extend(map(float, LEGACY_RE.findall(chunk)))
+    agg["legacy"] = True
+    agg["t0"], agg["t1"] = 0.0, float(len(values))
+    per = max(1, -(-len(values) // buckets))
+    for i in range(buckets):
+        _accumulate(agg, i, values[i * per:(i + 1) * per])
+    return agg
+
+
+def sparkline(values: list) -> str:
+    """Sparkline con bloques unicode; None se dibuja como espacio."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return " " * len(values)
+    lo, hi = min(present), max(present)
+    span = (hi - lo) or 1.0
+    top = len(SPARK_CHARS) - 1
+    return "".join(" " if v is None else SPARK_CHARS[int((v - lo) / span * top)] for v in values)
+
+
+def render_histogram(hist: dict, width: int, rows: int = 12) -> list:
+    """Reagrupa los bins finos en `rows` filas y las dibuja a lo ancho de la terminal."""
+    if not hist:
+        return []
+    lo, hi = min(hist) / 10.0, (max(hist) + 1) / 10.0
+    step = (hi - lo) / rows
+    counts = [0] * rows
+    for k, c in hist.items():
+        counts[min(rows - 1, int((k / 10.0 - lo) / step))] += c
+    peak = max(counts) or 1
+    bar_width = max(10, width - 28)
+    lines = []
+    for i, c in enumerate(counts):
+        a = lo + i * step
+        lines.append(f"{a:7.2f} → {a + step:7.2f} │{'█' * int(c / peak * bar_width)} {c}")
+    return lines
+
+
+def replay(path: Path = None, buckets: int = 0):
+    """Modo offline: resume un log histórico (posiblemente de varios GB) sin leerlo línea a línea."""
+    paths = [Path(path)] if path else replay_paths(LOG_PATH)
+    paths = [p for p in paths if p.exists() and p.stat().st_size > 0]
+    if not paths:
+        print("⚠️ No hay logs de métricas para analizar.")
+        return
+    width = shutil.get_terminal_size((80, 24)).columns - 2
+    buckets = buckets or max(10, width - 10)
+    started = time.perf_counter()
+    agg = scan_log(paths, buckets)
+    elapsed = time.perf_counter() - started
+    if not agg["events"]:
+        print("⚠️ Los logs no contienen recompensas.")
         return
 
+    avgs = [s / c if c else None for s, c in zip(agg["sums"], agg["counts"])]
+    mb = agg["bytes"] / (1024 * 1024)
+    print(f"\033[1;36m[NeuraBoardEco Monitor] 🎞️ Replay de {len(paths)} archivo(s), "
+          f"{mb:.1f} MB, {agg['events']} recompensas ({agg['batches']} lotes) en {elapsed:.2f}s "
+          f"({mb / max(elapsed, 1e-9):.0f} MB/s)\033[0m\n")
+    if agg["legacy"]:
+        print(f"Eventos #0 → #{agg['events']} (formato de texto sin timestamps)")
+    else:
+        fmt = "%Y-%m-%d %H:%M"
+        print(f"{time.strftime(fmt, time.localtime(agg['t0']))} → "
+              f"{time.strftime(fmt, time.localtime(agg['t1']))} ({buckets} buckets)")
+    present = [a for a in avgs if a is not None]
+    print(f"promedio  │{sparkline(avgs)}│ {min(present):.2f}…{max(present):.2f}")
+    print(f"máximo    │{sparkline([m if m != float('-inf') else None for m in agg['maxs']])}│")
+    print(f"mínimo    │{sparkline([m if m != float('inf') else None for m in agg['mins']])}│")
+    print(f"ciclos    │{sparkline([c or None for c in agg['counts']])}│ máx {max(agg['counts'])}/bucket\n")
+    print("Distribución de recompensas:")
+    for line in render_histogram(agg["hist"], width):
+        print(line)
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Monitor de aprendizaje NeuraBoardEco")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--replay", nargs="?", const="", metavar="RUTA",
+                      help="análisis offline (mmap) de logs históricos")
+    mode.add_argument("--rollup", nargs="?", const=24.0, type=float, metavar="HORAS",
+                      help="promedios de las últimas HORAS (rollups; 24 por defecto)")
+    parser.add_argument("--refresh", type=float, default=DEFAULT_REFRESH,
+                        help="segundos entre refrescos del monitor en tiempo real")
+    parser.add_argument("--buckets", type=int, default=0, help="buckets del replay (0 = según ancho)")
+    args = parser.parse_args(argv)
+    if args.refresh <= 0:
+        parser.error("--refresh debe ser mayor que 0")
+
+    if args.replay is not None:
+        replay(Path(args.replay) if args.replay else None, args.buckets)
+    elif args.rollup is not None:
+        show_rollup(args.rollup)
+    else:
+        visualize_learning(args.refresh)
+    return 0
 
 if __name__ == "__main__":
-    visualize_learning()
+    profiler.maybe_start("metrics_visual")
+    sys.exit(main(sys.argv[1:]))
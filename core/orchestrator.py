@@ -11,17 +11,31 @@ Descripción:
 """
 
 import os
+import sys
 import time
 import json
+import signal
+import argparse
+import threading
 import subprocess
 import shutil
 from pathlib import Path
+from typing import Optional
 from rich import print
 
 # --- Módulos internos ---
 from eco_ant.pheromones import PheromoneTable
 from core.metrics import LearningMetrics
 from sandbox.virtual_env import VirtualEnv
+from core import telemetry
+from core.memlock import MEMORY_LOCK
+from core import clock
+from core.actions import ACTIONS, ActionResult, register_action
+from core.backup_store import BACKGROUND_BACKUP, BackupStore
+from core.parallel_archive import ARCHIVER
+from core import maintenance
+from core import profiler, tracing
+from core.tracing import traced
 
 
 # ---------- Rutas ----------
@@ -29,10 +43,12 @@ HOME = Path.home()
 ROOT = HOME / "NeuraBoardEco"
 MEM_PATH = ROOT / "memory.json"
 LOGS_PATH = ROOT / "logs"
+CONFIG_PATH = ROOT / "config" / "orchestrator.json"
 LOGS_PATH.mkdir(parents=True, exist_ok=True)
 
 
 # ---------- Inicialización de memoria ----------
+@traced("init_memory")
 def init_memory():
     """Inicializa memoria global y carpetas."""
     ROOT.mkdir(parents=True, exist_ok=True)
@@ -45,95 +61,487 @@ def init_memory():
 
 
 # ---------- Logging ----------
+# Modo lote: los logs (y el último análisis) se acumulan en memoria y se
+# escriben en memory.json con flush_logs() en los límites de cada lote
+_DEFERRED = {"active": False, "logs": [], "analysis": None}
+
+
+def defer_memory_writes(active: bool):
+    """Activa/desactiva el búfer de escrituras de memory.json (no vacía el búfer)."""
+    _DEFERRED["active"] = active
+
+
+def flush_logs():
+    """Escribe en una sola lectura-modificación-escritura lo acumulado en el búfer."""
+    if not _DEFERRED["logs"] and _DEFERRED["analysis"] is None:
+        return
+    init_memory()
+    with MEMORY_LOCK:
+        try:
+            data = json.loads(MEM_PATH.read_text(encoding="utf-8"))
+        except Exception:
+            data = {"logs": []}
+        data.setdefault("logs", []).extend(_DEFERRED["logs"])
+        if _DEFERRED["analysis"] is not None:
+            data["analysis"] = _DEFERRED["analysis"]
+        t0 = time.perf_counter()
+        MEM_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        telemetry.MEMORY_WRITE.observe(time.perf_counter() - t0, writer="orchestrator")
+        _DEFERRED["logs"] = []
+        _DEFERRED["analysis"] = None
+
+
+@traced("log")
 def log(message: str):
-    """Registra un evento en memoria.json y lo imprime."""
+    """Registra un evento en memoria.json y lo imprime (E/S no imputada a la acción en curso)."""
+    with ACTIONS.untracked_io():
+        _log(message)
+
+
+def _log(message: str):
+    entry = {"msg": message, "time": clock.strftime("%Y-%m-%d %H:%M:%S")}
+    if _DEFERRED["active"]:
+        with MEMORY_LOCK:
+            _DEFERRED["logs"].append(entry)
+        print(f"[NeuraBoard] {message}")
+        return
     init_memory()
-    try:
-        data = json.loads(MEM_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        data = {"logs": []}
-    data.setdefault("logs", []).append({"msg": message, "time": time.strftime("%Y-%m-%d %H:%M:%S")})
-    MEM_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    with MEMORY_LOCK:
+        try:
+            data = json.loads(MEM_PATH.read_text(encoding="utf-8"))
+        except Exception:
+            data = {"logs": []}
+        data.setdefault("logs", []).append(entry)
+        t0 = time.perf_counter()
+        MEM_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        telemetry.MEMORY_WRITE.observe(time.perf_counter() - t0, writer="orchestrator")
     print(f"[NeuraBoard] {message}")
 
 
 # ---------- Acciones del sistema ----------
-def do_action(choice: str) -> float:
-    """Ejecuta una acción simbólica del sistema y devuelve una recompensa."""
-    if choice == "optimize_cpu":
-        log("🧩 Optimizando recursos del sistema...")
-        time.sleep(0.5)
-        return 5.0
-
-    elif choice == "backup":
-        # Backup robusto: rutas relativas y exclusiones seguras
-        log("💾 Realizando respaldo de memoria...")
-        dst = ROOT / "backups"
-        dst.mkdir(parents=True, exist_ok=True)
-
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        backup_file = dst / f"backup_{timestamp}.tgz"
-
-        excludes = [
-            "--exclude=backups/*",
-            "--exclude=.git",
-            "--exclude=.venv",
-            "--exclude=__pycache__",
-            "--exclude=logs/*",
-            "--exclude=nohup.out",
-        ]
-        # Empaquetar desde ROOT con rutas relativas (.) para evitar warnings y “auto-self-archive”
-        cmd = f"tar -czf '{backup_file}' {' '.join(excludes)} -C '{ROOT}' ."
+def backup_command() -> tuple:
+    """Comando tar del respaldo completo y ruta del archivo destino."""
+    dst = ROOT / "backups"
+    dst.mkdir(parents=True, exist_ok=True)
+
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    backup_file = dst / f"backup_{timestamp}.tgz"
+
+    excludes = [
+        "--exclude=backups/*",
+        "--exclude=.git",
+        "--exclude=.venv",
+        "--exclude=__pycache__",
+        "--exclude=logs/*",
+        "--exclude=nohup.out",
+    ]
+    # Empaquetar desde ROOT con rutas relativas (.) para evitar warnings y “auto-self-archive”
+    cmd = f"tar -czf '{backup_file}' {' '.join(excludes)} -C '{ROOT}' ."
+    return cmd, backup_file
+
+
+def backup_reward(rc: int, backup_file: Path) -> float:
+    """Registra el resultado del respaldo y devuelve su recompensa."""
+    if rc == 0:
+        log(f"✅ Backup creado: {backup_file.name}")
+        return 2.0
+    log("⚠️ Falló el backup (tar retornó código distinto de 0).")
+    return 0.5
+
+
+# Agente vivo del proceso: las acciones de mantenimiento podan su tabla
+CONTEXT = {"ant": None, "last_backup": None}
+FOREGROUND_BACKUP_BYTES = 8 * 1024 * 1024   # por encima, el backup incremental va a segundo plano
+
+
+@register_action("optimize_cpu")
+def action_optimize_cpu() -> float:
+    log("🧩 Optimizando recursos del sistema...")
+    s = maintenance.optimize(CONTEXT["ant"])
+    raw = maintenance.optimize_reward(s)
+    reward = maintenance.BASELINES["optimize_cpu"].normalize(raw)
+    log(f"🧩 Recuperados {s['memory_bytes'] + s['log_bytes']} B "
+        f"({s['logs_dropped']} logs, {s['pheromones_pruned']} feromonas), "
+        f"{s['ms_saved']:.2f} ms/escritura ahorrados (ruido {s['ms_noise']:.2f}), RSS {s['rss'] / 1048576:.1f} MB "
+        f"(-{s['rss_freed'] / 1048576:.1f} MB) → mejora {raw}, recompensa {reward}")
+    return reward
+
+
+# Respaldo incremental: como mucho uno cada min_interval s (reloj inyectable) y
+# poda automática a los `keep` manifiestos más recientes
+BACKUP_INCREMENTAL = {"min_interval": 300.0, "keep": 20}
+
+
+def _backup_done(manifest, error, store: BackupStore = None):
+    if error is not None:
+        log(f"⚠️ Falló el backup incremental: {error}")
+        return
+    s = manifest["stats"]
+    log(f"✅ Backup creado: {manifest['id']} ({s['reused_files']}/{s['files']} archivos sin cambios, "
+        f"{s['bytes_stored']} B nuevos)")
+    keep = int(BACKUP_INCREMENTAL.get("keep") or 0)
+    if store is not None and keep > 0 and len(store.list_manifests()) > keep:
+        removed, freed = store.prune(keep)
+        log(f"🧹 Poda de backups: {removed} manifiestos, {freed} B de chunks liberados")
+
+
+@register_action("backup")
+def action_backup() -> ActionResult:
+    now = clock.now()
+    last = CONTEXT["last_backup"]
+    min_interval = float(BACKUP_INCREMENTAL.get("min_interval") or 0.0)
+    if last is not None and now - last < min_interval:
+        log(f"⏳ Último backup incremental hace {now - last:.0f}s (mínimo {min_interval:.0f}s); se omite.")
+        return ActionResult(0.5)
+    # Respaldo incremental deduplicado: solo se leen y guardan los cambios
+    log("💾 Realizando respaldo incremental de memoria...")
+    store = BackupStore()
+    try:
+        if BACKGROUND_BACKUP.busy:
+            log("⏳ Backup incremental anterior aún en curso; se omite.")
+            return ActionResult(0.5)
+        pending = store.pending_bytes()
+        if pending > FOREGROUND_BACKUP_BYTES:
+            # CDC a ~5 MB/s (p. ej. el primer respaldo): no bloquear el ciclo
+            BACKGROUND_BACKUP.start(store, lambda m, e: _backup_done(m, e, store))
+            CONTEXT["last_backup"] = now
+            log(f"💾 {pending / 1048576:.1f} MB por trocear: backup incremental en segundo plano...")
+            return ActionResult(2.0)
+        manifest = store.backup(blocking=False)
+        CONTEXT["last_backup"] = now
+    except BlockingIOError:
+        log("⏳ Almacén de backups ocupado (backup o prune en otro proceso); se omite.")
+        return ActionResult(0.5)
+    except OSError as e:
+        _backup_done(None, e)
+        return ActionResult(0.5)
+    _backup_done(manifest, None, store)
+    return ActionResult(2.0)
+
+
+BACKUP_FULL = {"mode": "parallel", "level": 6, "workers": None}
+
+
+def _archive_done(result, error):
+    if error is not None:
+        log(f"⚠️ Falló el respaldo completo en segundo plano: {error}")
+    else:
+        log(f"✅ Backup completo creado: {Path(result['path']).name} "
+            f"({result['bytes_in'] / 1048576:.1f} MB en {result['seconds']:.2f}s, {result['workers']} hilos)")
+
+
+@register_action("backup_full")
+def action_backup_full() -> float:
+    if BACKUP_FULL.get("mode") == "tar":
+        # Backup completo con tar: rutas relativas y exclusiones seguras
+        log("💾 Realizando respaldo completo de memoria...")
+        cmd, backup_file = backup_command()
         rc = subprocess.call(cmd, shell=True)
-        if rc == 0:
-            log(f"✅ Backup creado: {backup_file.name}")
-            return 2.0
-        else:
-            log("⚠️ Falló el backup (tar retornó código distinto de 0).")
-            return 0.5
-
-    elif choice == "analyze":
-        log("🔍 Analizando entorno virtual...")
-        time.sleep(0.5)
-        return 3.0
+        return backup_reward(rc, backup_file)
+    # Archivador paralelo en segundo plano: el ciclo no espera a la compresión
+    if not ARCHIVER.start(int(BACKUP_FULL.get("level", 6)), BACKUP_FULL.get("workers"), _archive_done):
+        log("⏳ Respaldo completo anterior aún en curso; se omite.")
+        return 0.5
+    log("💾 Respaldo completo lanzado en segundo plano...")
+    return 2.0
+
+
+@register_action("analyze")
+def action_analyze() -> float:
+    log("🔍 Analizando entorno virtual...")
+    # En modo lote el último análisis aún no está en memory.json
+    report = maintenance.analyze(CONTEXT["ant"], _DEFERRED["analysis"])
+    if _DEFERRED["active"]:
+        _DEFERRED["analysis"] = report
     else:
+        maintenance.save_report(report)
+    raw = maintenance.analyze_reward(report)
+    reward = maintenance.BASELINES["analyze"].normalize(raw)
+    entropy = report["pheromone_entropy"]
+    imp = report["improvement"]
+    log(f"🔍 memory.json {report['memory_bytes']} B | τ: {report['pheromone_entries']} entradas, "
+        f"entropía {entropy if entropy is not None else '-'} | recompensa media {report['reward_mean']} "
+        f"(tendencia {report['reward_trend']:+}) | hallazgos: {'; '.join(report['findings']) or 'ninguno'} "
+        f"| mejora: {imp['findings_resolved']} resueltos, {imp['bytes_reclaimed']} B, "
+        f"r̄ {imp['reward_gain']:+} → mejora {raw}, recompensa {reward}")
+    return reward
+
+
+@traced("do_action")
+def do_action(choice: str) -> float:
+    """Ejecuta una acción registrada del sistema y devuelve una recompensa."""
+    if choice not in ACTIONS:
         log(f"⚠️ Acción desconocida: {choice}")
         return 0.2
+    return ACTIONS.run(choice).reward
+
+
+# ---------- Configuración ----------
+DEFAULT_CONFIG = {
+    "interval": 30.0,                      # segundos entre ciclos en modo daemon
+    "actions": ["optimize_cpu", "backup", "analyze"],
+    "heuristic": {"optimize_cpu": 1.1, "backup": 1.0, "analyze": 0.9},
+    "ant": {"tau0": 0.1, "rho": 0.05, "alpha": 1.0, "beta": 1.0, "epsilon": 0.1},
+    "sandbox_cycles": 3,
+    "batch_size": 50,                      # ciclos entre escrituras de memory.json en modo lote
+    "connector_sources": [],               # fuentes del conector universal por ciclo (modo --async)
+    "max_concurrency": 4,                  # etapas simultáneas en modo --async
+    "stage_timeouts": {},                  # segundos por etapa: action, sandbox, connector, flush
+    "action_modules": {},                  # acciones extra {"nombre": "paquete.modulo:funcion"} (carga perezosa)
+    "cost_weight": 1.0,                    # peso del coste medido (tiempo/CPU/bytes) en η
+    "backup_full": {"mode": "parallel", "level": 6, "workers": None},  # mode: parallel | tar
+    "backup": {"min_interval": 300.0, "keep": 20},  # backup incremental: s entre respaldos, manifiestos
+}
+
+
+def load_config(path: Path = CONFIG_PATH) -> dict:
+    """Carga config/orchestrator.json sobre los valores por defecto."""
+    cfg = json.loads(json.dumps(DEFAULT_CONFIG))
+    if path.exists():
+        try:
+            user = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[NeuraBoard] ⚠️ Config inválida ({path.name}): {e}")
+            return cfg
+        for key, value in user.items():
+            if isinstance(value, dict) and isinstance(cfg.get(key), dict):
+                cfg[key].update(value)
+            else:
+                cfg[key] = value
+    return cfg
+
+
+def apply_ant_config(ant: PheromoneTable, cfg: dict):
+    """Aplica los parámetros de la colonia definidos en la configuración."""
+    for key, value in cfg.get("ant", {}).items():
+        if hasattr(ant, key):
+            setattr(ant, key, float(value))
+
+
+def register_configured_actions(cfg: dict):
+    """Registra (de forma perezosa) las acciones declaradas en action_modules."""
+    BACKUP_FULL.update(cfg.get("backup_full") or {})
+    BACKUP_INCREMENTAL.update(cfg.get("backup") or {})
+    for name, target in (cfg.get("action_modules") or {}).items():
+        ACTIONS.register_lazy(name, target)
 
 
 # ---------- Ciclo principal ----------
-def main():
+def boot():
+    """Arranque del núcleo (una vez por proceso)."""
+    telemetry.maybe_start_exporter()
     init_memory()
     log("🧠 Iniciando núcleo NeuraBoardEco...")
-    time.sleep(0.3)
+    clock.sleep(0.3)
     log("⚙️ Cargando módulos principales...")
-    time.sleep(0.3)
+    clock.sleep(0.3)
     log("✅ Sistema operativo y estable.")
 
-    # Configuración del agente Ant-RL
-    actions = ["optimize_cpu", "backup", "analyze"]
-    heuristic = {"optimize_cpu": 1.1, "backup": 1.0, "analyze": 0.9}
 
-    ant = PheromoneTable(tau0=0.1, rho=0.05, alpha=1.0, beta=1.0, epsilon=0.1)
+def step(ant: PheromoneTable, metrics: LearningMetrics, cfg: dict) -> tuple:
+    """Selección, ejecución, depósito y registro de una acción."""
     state = "boot_cycle"
 
-    # Selección y ejecución de acción
-    choice = ant.choose_action(state, actions, heuristic)
-    reward = do_action(choice)
-    ant.deposit([(state, choice)], reward)
+    with tracing.span("cycle"):
+        # Selección (η ajustada por coste medido) y ejecución de acción
+        heuristic = ACTIONS.heuristic(cfg["heuristic"], float(cfg.get("cost_weight", 1.0)))
+        choice = ant.choose_action(state, cfg["actions"], heuristic)
+        reward = do_action(choice)
+        ant.deposit([(state, choice)], reward)
 
-    log(f"🐜 Ant-Colony RL ejecutó acción: {choice} con recompensa {reward}")
+        log(f"🐜 Ant-Colony RL ejecutó acción: {choice} con recompensa {reward}")
 
-    # Registro de métricas
-    metrics = LearningMetrics()
-    metrics.register_cycle(reward)
+        # Registro de métricas y ajuste de ε/ρ
+        metrics.register_cycle(reward, action=choice)
+        metrics.adaptive_adjustment(ant)
+    return choice, reward
+
+
+def run_cycle(ant: PheromoneTable, metrics: LearningMetrics, env: VirtualEnv, cfg: dict):
+    """Un ciclo completo: selección, acción, depósito, métricas y sandbox."""
+    step(ant, metrics, cfg)
+    ACTIONS.save_costs()
     print(metrics.summary())
 
     # Simulación de entorno virtual
-    env = VirtualEnv(cycles=3)
     env.run()
 
 
+def run_batch(ant: PheromoneTable, metrics: LearningMetrics, env: VirtualEnv, cfg: dict,
+              cycles: int = 0, duration: float = 0.0, batch_size: int = 50,
+              stop: Optional[threading.Event] = None) -> int:
+    """
+    Ejecuta muchos ciclos en un solo proceso con la misma tabla de feromonas.
+    La persistencia (memory.json: feromonas, métricas y logs) se difiere a los
+    límites de cada lote y el sandbox corre una vez al final. Si se pasa
+    `stop`, el lote se corta en cuanto el evento se activa. Devuelve el
+    número de ciclos ejecutados.
+    """
+    if not cycles and not duration:
+        cycles = 1
+    ant.autosave = False
+    metrics.autosave = False
+    defer_memory_writes(True)
+    started = time.perf_counter()
+    done = 0
+    try:
+        while ((not cycles or done < cycles)
+               and (not duration or time.perf_counter() - started < duration)):
+            if stop is not None and stop.is_set():
+                log(f"🛑 Lote interrumpido tras {done} ciclos.")
+                break
+            step(ant, metrics, cfg)
+            done += 1
+            if done % batch_size == 0:
+                flush_logs()
+                ant.flush()
+                metrics.flush()
+                ACTIONS.save_costs()
+    finally:
+        defer_memory_writes(False)
+        flush_logs()
+        ant.flush()
+        metrics.flush()
+        ACTIONS.save_costs()
+        ant.autosave = True
+        metrics.autosave = True
+
+    elapsed = time.perf_counter() - started
+    print(metrics.summary())
+    env.run()
+    rate = done / elapsed if elapsed > 0 else 0.0
+    log(f"⚡ Lote completado: {done} ciclos en {elapsed:.2f}s → {rate:.2f} ciclos/s")
+    return done
+
+
+def cli_overrides(args: argparse.Namespace) -> dict:
+    """Claves de configuración fijadas por la línea de comandos."""
+    overrides = {}
+    if args.interval is not None:
+        overrides["interval"] = args.interval
+    if args.cycles:
+        overrides["batch_cycles"] = args.cycles
+    if args.duration:
+        overrides["batch_duration"] = args.duration
+    if args.batch_size:
+        overrides["batch_size"] = args.batch_size
+    return overrides
+
+
+def run_daemon(ant: PheromoneTable, metrics: LearningMetrics, env: VirtualEnv,
+               cfg: dict, config_path: Path = CONFIG_PATH,
+               overrides: Optional[dict] = None):
+    """
+    Mantiene el proceso vivo entre ciclos.
+    - SIGTERM/SIGINT: termina el ciclo en curso, persiste el estado y sale
+    - SIGHUP: recarga la configuración (conservando `overrides` de la CLI)
+      y lanza el siguiente ciclo
+    """
+    overrides = dict(overrides or {})
+    stop = threading.Event()
+    reload_requested = threading.Event()
+    wake = threading.Event()
+
+    def _on_stop(signum, frame):
+        stop.set()
+        wake.set()
+
+    def _on_reload(signum, frame):
+        reload_requested.set()
+        wake.set()
+
+    signal.signal(signal.SIGTERM, _on_stop)
+    signal.signal(signal.SIGINT, _on_stop)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, _on_reload)
+
+    log(f"🔁 Modo daemon activo (intervalo {cfg['interval']}s, pid {os.getpid()})")
+    cycle = 0
+    while not stop.is_set():
+        if reload_requested.is_set():
+            reload_requested.clear()
+            cfg = load_config(config_path)
+            cfg.update(overrides)
+            apply_ant_config(ant, cfg)
+            register_configured_actions(cfg)
+            env.cycles = int(cfg["sandbox_cycles"])
+            log("♻️ Configuración recargada.")
+        cycle += 1
+        try:
+            if cfg.get("batch_cycles") or cfg.get("batch_duration"):
+                run_batch(ant, metrics, env, cfg, int(cfg.get("batch_cycles") or 0),
+                          float(cfg.get("batch_duration") or 0.0), int(cfg.get("batch_size", 50)),
+                          stop=stop)
+            else:
+                run_cycle(ant, metrics, env, cfg)
+        except Exception as e:
+            log(f"⚠️ Error en ciclo {cycle}: {e}")
+        # Espera interrumpible: una señal despierta el Event inmediatamente
+        wake.wait(float(cfg["interval"]))
+        wake.clear()
+
+    ant._save_to_memory()
+    metrics.save_to_memory()
+    ACTIONS.save_costs()
+    log(f"🛑 Daemon detenido tras {cycle} ciclos; estado persistido.")
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Núcleo NeuraBoardEco")
+    parser.add_argument("--daemon", action="store_true", help="mantener el proceso vivo entre ciclos")
+    parser.add_argument("--interval", type=float, help="segundos entre ciclos en modo daemon")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH, help="ruta de configuración JSON")
+    parser.add_argument("--cycles", type=int, default=0, help="ciclos por lote en un solo proceso")
+    parser.add_argument("--duration", type=float, default=0.0, help="segundos de ejecución por lote")
+    parser.add_argument("--batch-size", type=int, help="ciclos entre escrituras de memory.json")
+    parser.add_argument("--fast-forward", action="store_true",
+                        help="reloj simulado: las esperas no consumen tiempo real")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="motor asyncio con etapas de E/S solapadas")
+    parser.add_argument("--trace", action="store_true",
+                        help="registrar spans por fase en logs/trace.jsonl")
+    args = parser.parse_args(argv)
+    if args.use_async and (args.daemon or args.duration):
+        parser.error("--async ejecuta un lote de --cycles ciclos; no admite --daemon ni --duration")
+
+    if args.trace:
+        tracing.enable()
+
+    if args.fast_forward:
+        clock.set_clock(clock.SimulatedClock())
+
+    cfg = load_config(args.config)
+    overrides = cli_overrides(args)
+    cfg.update(overrides)
+
+    register_configured_actions(cfg)
+    ACTIONS.load_costs()
+
+    # Configuración del agente Ant-RL
+    ant = PheromoneTable(**cfg["ant"])
+    CONTEXT["ant"] = ant
+    metrics = LearningMetrics()
+    env = VirtualEnv(cycles=int(cfg["sandbox_cycles"]))
+
+    if args.use_async:
+        # El arranque corre como una etapa más, solapado con el primer ciclo
+        from core.async_cycle import run_async
+        telemetry.maybe_start_exporter()
+        run_async(ant, metrics, env, cfg, cycles=int(cfg.get("batch_cycles") or 1))
+        return 0
+
+    boot()
+    if args.daemon:
+        run_daemon(ant, metrics, env, cfg, args.config, overrides)
+    elif cfg.get("batch_cycles") or cfg.get("batch_duration"):
+        run_batch(ant, metrics, env, cfg, int(cfg.get("batch_cycles") or 0),
+                  float(cfg.get("batch_duration") or 0.0), int(cfg.get("batch_size", 50)))
+    else:
+        run_cycle(ant, metrics, env, cfg)
+    return 0
+
+
 # ---------- Ejecución ----------
 if __name__ == "__main__":
-    main()
+    profiler.maybe_start("orchestrator")
+    sys.exit(main())
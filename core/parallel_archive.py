@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+NeuraBoardEco - Archivador tar.gz paralelo
+Versión: 2025-10-24
+Autor: vlugoc
+Descripción:
+  Respaldo completo en proceso basado en tarfile, comprimido estilo pigz:
+  el flujo tar se corta en bloques que se comprimen como miembros gzip
+  independientes en un pool de hilos (zlib libera el GIL) y se escriben
+  en orden. La concatenación de miembros gzip es un .tgz estándar.
+  - Nivel de compresión y número de hilos configurables
+  - Ejecución en segundo plano para no bloquear el ciclo de aprendizaje
+  - memory.json entra como instantánea leída bajo MEMORY_LOCK y validada,
+    nunca a medio escribir
+Uso:
+  python core/parallel_archive.py create [--level 6] [--workers N]
+  python core/parallel_archive.py bench  [--level 6] [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from core.backup_store import SKIP_DIRS, SKIP_FILES
+from core.memlock import MEMORY_LOCK
+
+ROOT = Path.home() / "NeuraBoardEco"
+BACKUP_DIR = ROOT / "backups"
+
+DEFAULT_LEVEL = 6
+BLOCK_SIZE = 1024 * 1024
+MEMORY_FILE = "memory.json"
+SNAPSHOT_RETRIES = 5
+
+
+class ParallelGzipWriter:
+    """Objeto tipo archivo: comprime bloques en paralelo y los escribe en orden."""
+
+    def __init__(self, fileobj, level: int = DEFAULT_LEVEL, workers: Optional[int] = None,
+                 block_size: int = BLOCK_SIZE):
+        self.fileobj = fileobj
+        self.level = level
+        self.block_size = block_size
+        self.workers = workers or os.cpu_count() or 2
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="pgzip")
+        self._pending: deque = deque()
+        self._buf = bytearray()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def write(self, data) -> int:
+        self._buf += data
+        self.bytes_in += len(data)
+        while len(self._buf) >= self.block_size:
+            self._submit(bytes(self._buf[: self.block_size]))
+            del self._buf[: self.block_size]
+        return len(data)
+
+    def _submit(self, block: bytes):
+        # mtime=0: miembros reproducibles y vía rápida de zlib con wbits gzip
+        self._pending.append(self._pool.submit(gzip.compress, block, self.level, mtime=0))
+        # Limita memoria: como mucho 2 bloques en vuelo por hilo
+        self._drain(2 * self.workers)
+
+    def _drain(self, limit: int):
+        while len(self._pending) > limit:
+            out = self._pending.popleft().result()
+            self.fileobj.write(out)
+            self.bytes_out += len(out)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._buf:
+            self._submit(bytes(self._buf))
+            self._buf.clear()
+        self._drain(0)
+        self._pool.shutdown()
+
+
+def _tar_filter(info: tarfile.TarInfo) -> Optional[tarfile.TarInfo]:
+    parts = Path(info.name).parts
+    if any(p in SKIP_DIRS for p in parts) or (parts and parts[-1] in SKIP_FILES):
+        return None
+    return info
+
+
+def memory_snapshot(path: Path) -> Optional[bytes]:
+    """
+    Contenido de memory.json leído bajo MEMORY_LOCK (escritores de este
+    proceso). Si no es JSON válido, otro proceso lo está escribiendo: se
+    reintenta con espera creciente; si nunca lo es, el archivo en disco
+    está dañado de verdad y se respalda tal cual.
+    """
+    raw = None
+    for attempt in range(SNAPSHOT_RETRIES):
+        with MEMORY_LOCK:
+            try:
+                raw = path.read_bytes()
+            except FileNotFoundError:
+                return None
+        try:
+            json.loads(raw)
+            return raw
+        except ValueError:
+            time.sleep(0.05 * (attempt + 1))
+    return raw
+
+
+def create_archive(dest: Path, root: Path = ROOT, level: int = DEFAULT_LEVEL,
+                   workers: Optional[int] = None) -> dict:
+    """Crea dest (.tgz) desde root con rutas relativas; escritura atómica vía .tmp."""
+    started = time.perf_counter()
+    dest = Path(dest)
+    root = Path(root)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".tmp")
+    memory_name = f"./{MEMORY_FILE}"
+
+    def tar_filter(info: tarfile.TarInfo) -> Optional[tarfile.TarInfo]:
+        # memory.json se añade aparte desde la instantánea
+        return None if info.name == memory_name else _tar_filter(info)
+
+    try:
+        with open(tmp, "wb") as raw:
+            writer = ParallelGzipWriter(raw, level, workers)
+            try:
+                with tarfile.open(fileobj=writer, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+                    tar.add(str(root), arcname=".", filter=tar_filter)
+                    snapshot = memory_snapshot(root / MEMORY_FILE)
+                    if snapshot is not None:
+                        info = tar.gettarinfo(str(root / MEMORY_FILE), arcname=memory_name)
+                        info.size = len(snapshot)
+                        tar.addfile(info, io.BytesIO(snapshot))
+            finally:
+                writer.close()
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    elapsed = time.perf_counter() - started
+    return {"path": str(dest), "bytes_in": writer.bytes_in, "bytes_out": writer.bytes_out,
+            "seconds": elapsed, "workers": writer.workers, "level": level}
+
+
+def archive_path() -> Path:
+    return BACKUP_DIR / f"backup_{time.strftime('%Y%m%d_%H%M%S')}.tgz"
+
+
+class BackgroundArchiver:
+    """Un único respaldo completo a la vez en un hilo (no daemon: se completa al salir)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._future: Optional[Future] = None
+        self.last_result: Optional[dict] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def start(self, level: int = DEFAULT_LEVEL, workers: Optional[int] = None,
+              on_done: Optional[Callable[[Optional[dict], Optional[BaseException]], None]] = None) -> bool:
+        """Lanza el respaldo; devuelve False si ya hay uno en curso."""
+        with self._lock:
+            if self.busy:
+                return False
+            fut: Future = Future()
+            dest = archive_path()
+
+            def _run():
+                try:
+                    result = create_archive(dest, level=level, workers=workers)
+                except BaseException as e:
+                    fut.set_exception(e)
+                    if on_done:
+                        on_done(None, e)
+                    return
+                self.last_result = result
+                fut.set_result(result)
+                if on_done:
+                    on_done(result, None)
+
+            self._future = fut
+            threading.Thread(target=_run, name="neuraboard-archiver").start()
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[dict]:
+        if self._future is None:
+            return None
+        return self._future.result(timeout)
+
+
+ARCHIVER = BackgroundArchiver()
+
+
+# ---------- Benchmark ----------
+def _tar_subprocess(dest: Path, root: Path) -> float:
+    excludes = " ".join(f"--exclude={d}" for d in sorted(SKIP_DIRS | SKIP_FILES))
+    started = time.perf_counter()
+    subprocess.check_call(f"tar -czf '{dest}' {excludes} -C '{root}' .", shell=True)
+    return time.perf_counter() - started
+
+
+def benchmark(root: Path = ROOT, level: int = DEFAULT_LEVEL, workers: Optional[int] = None) -> dict:
+    """Compara MB/s del tar -czf de un solo núcleo con el archivador paralelo."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tar_dest = Path(tmpdir) / "tar.tgz"
+        par_dest = Path(tmpdir) / "parallel.tgz"
+        tar_s = _tar_subprocess(tar_dest, root)
+        res = create_archive(par_dest, root, level, workers)
+        mb = res["bytes_in"] / (1024 * 1024)
+        with tarfile.open(par_dest, "r:gz") as tar:
+            members = sum(1 for _ in tar)
+        return {
+            "input_mb": round(mb, 2),
+            "tar_seconds": round(tar_s, 3),
+            "tar_mb_s": round(mb / tar_s, 2) if tar_s else None,
+            "tar_size": tar_dest.stat().st_size,
+            "parallel_seconds": round(res["seconds"], 3),
+            "parallel_mb_s": round(mb / res["seconds"], 2) if res["seconds"] else None,
+            "parallel_size": par_dest.stat().st_size,
+            "workers": res["workers"],
+            "level": level,
+            "members_ok": members,
+        }
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Archivador tar.gz paralelo de NeuraBoardEco")
+    parser.add_argument("cmd", choices=["create", "bench"])
+    parser.add_argument("--level", type=int, default=DEFAULT_LEVEL)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--root", type=Path, default=ROOT)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "create":
+        res = create_archive(archive_path(), args.root, args.level, args.workers)
+        print(f"[Archive] {Path(res['path']).name}: {res['bytes_in'] / 1048576:.1f} MB → "
+              f"{res['bytes_out'] / 1048576:.1f} MB en {res['seconds']:.2f}s ({res['workers']} hilos)")
+    else:
+        r = benchmark(args.root, args.level, args.workers)
+        print(f"[Archive] Entrada: {r['input_mb']} MB | nivel {r['level']} | {r['workers']} hilos")
+        print(f"[Archive] tar -czf : {r['tar_seconds']}s → {r['tar_mb_s']} MB/s ({r['tar_size']} B)")
+        print(f"[Archive] paralelo : {r['parallel_seconds']}s → {r['parallel_mb_s']} MB/s ({r['parallel_size']} B)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
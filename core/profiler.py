@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+NeuraBoardEco - Perfilador por muestreo (opt-in)
+Versión: 2025-10-25
+Autor: vlugoc
+Descripción:
+  Muestreador de pilas basado en señales (setitimer) para cualquier punto
+  de entrada. Acumula pilas en memoria y al salir escribe formato "folded"
+  (frame;frame;frame N), compatible con flamegraph.pl / speedscope / inferno.
+  - Sin NEURABOARD_PROFILE no se instala nada: coste cero
+  - NEURABOARD_PROFILE=1            → activa (99 Hz, tiempo de CPU)
+  - NEURABOARD_PROFILE_HZ=499       → frecuencia de muestreo
+  - NEURABOARD_PROFILE_CLOCK=wall   → tiempo de pared (incluye esperas de E/S)
+  - NEURABOARD_PROFILE_OUT=ruta     → destino (por defecto logs/profile_<entrada>_<pid>.folded)
+Uso:
+  NEURABOARD_PROFILE=1 python3 core/orchestrator.py --cycles 500 --fast-forward
+  flamegraph.pl ~/NeuraBoardEco/logs/profile_orchestrator_*.folded > cpu.svg
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import signal
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path.home() / "NeuraBoardEco"
+LOGS = ROOT / "logs"
+DEFAULT_HZ = 99
+MAX_DEPTH = 128
+
+
+class SamplingProfiler:
+    """Muestrea las pilas de todos los hilos en cada tick del temporizador."""
+
+    def __init__(self, name: str, hz: float = DEFAULT_HZ, wall: bool = False,
+                 out: Optional[Path] = None):
+        self.name = name
+        self.interval = 1.0 / max(1.0, float(hz))
+        self.wall = wall
+        self.out = Path(out) if out else LOGS / f"profile_{name}_{os.getpid()}.folded"
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: dict = {}
+        self._main = threading.main_thread().ident
+        self._timer = signal.ITIMER_REAL if wall else signal.ITIMER_PROF
+        self._signum = signal.SIGALRM if wall else signal.SIGPROF
+        self._previous = None
+
+    def _label(self, code) -> str:
+        # Cache por objeto código: el handler no formatea cadenas en caliente
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _walk(self, frame) -> tuple:
+        codes = []
+        while frame is not None and len(codes) < MAX_DEPTH:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        return tuple(codes)
+
+    def _handler(self, signum, frame):
+        self.samples += 1
+        # El frame recibido es el interrumpido del hilo principal; el del
+        # propio handler se descarta. Sin locks aquí: solo lectura de frames.
+        for ident, f in sys._current_frames().items():
+            if ident == self._main:
+                f = frame
+            if f is None:
+                continue
+            self.stacks[(ident, self._walk(f))] += 1
+
+    def start(self):
+        self._previous = signal.signal(self._signum, self._handler)
+        signal.setitimer(self._timer, self.interval, self.interval)
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self._previous is None:
+            return
+        signal.setitimer(self._timer, 0, 0)
+        signal.signal(self._signum, self._previous)
+        self._previous = None
+        self.write()
+
+    def write(self):
+        """Escribe las pilas en formato folded: hilo;f1;f2;...;fn muestras."""
+        names = {t.ident: t.name for t in threading.enumerate()}
+        lines = []
+        for (ident, codes), count in self.stacks.most_common():
+            root = names.get(ident, f"thread-{ident}")
+            frames = ";".join(self._label(c).replace(";", ":") for c in codes)
+            lines.append(f"{root};{frames} {count}" if frames else f"{root} {count}")
+        try:
+            self.out.parent.mkdir(parents=True, exist_ok=True)
+            self.out.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            print(f"[Profiler] {self.samples} muestras → {self.out}", file=sys.stderr)
+        except OSError as e:
+            print(f"[Profiler] ⚠️ No se pudo escribir {self.out}: {e}", file=sys.stderr)
+
+
+_active: Optional[SamplingProfiler] = None
+
+
+def maybe_start(name: str) -> Optional[SamplingProfiler]:
+    """Arranca el perfilador si NEURABOARD_PROFILE está definido; si no, no hace nada."""
+    global _active
+    if os.getenv("NEURABOARD_PROFILE", "") in ("", "0") or _active is not None:
+        return _active
+    if threading.current_thread() is not threading.main_thread():
+        return None
+    _active = SamplingProfiler(
+        name,
+        hz=float(os.getenv("NEURABOARD_PROFILE_HZ", DEFAULT_HZ)),
+        wall=os.getenv("NEURABOARD_PROFILE_CLOCK", "cpu") == "wall",
+        out=os.getenv("NEURABOARD_PROFILE_OUT") or None,
+    )
+    _active.start()
+    return _active
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+NeuraBoardEco - Telemetría Prometheus/OpenMetrics
+Versión: 2025-10-22
+Autor: vlugoc
+Descripción:
+  Contadores, gauges e histogramas en celdas por hilo (sin locks en el
+  camino caliente) y un exportador HTTP opcional basado en http.server.
+  - Activación: NEURABOARD_METRICS_PORT=9464 (o start_exporter(port))
+  - Endpoint: http://127.0.0.1:<puerto>/metrics
+"""
+
+from __future__ import annotations
+
+import abc
+import math
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REWARD_BUCKETS = (-2.0, -1.0, 0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 7.5, 10.0)
+
+
+class _ThreadShards:
+    """
+    Una celda (dict) por hilo. Cada hilo solo escribe en la suya, así que el
+    GIL basta; el lock solo se toma al registrar un hilo nuevo y al recolectar.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def cell(self) -> dict:
+        d = getattr(self._local, "d", None)
+        if d is None:
+            d = {}
+            with self._lock:
+                self._shards.append(d)
+            self._local.d = d
+        return d
+
+    def shards(self) -> List[dict]:
+        with self._lock:
+            return [dict(d) for d in self._shards]
+
+
+class _Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _fmt_labels(self, key: tuple, extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    @abc.abstractmethod
+    def render(self) -> List[str]:
+        """Líneas de muestra en formato de texto 0.0.4 (sin HELP/TYPE)."""
+
+
+class Counter(_Metric):
+    """Contador monótono; por convención el nombre termina en _total."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._shards = _ThreadShards()
+
+    def inc(self, amount: float = 1.0, **labels):
+        cell = self._shards.cell()
+        key = self._key(labels)
+        cell[key] = cell.get(key, 0.0) + amount
+
+    def collect(self) -> Dict[tuple, float]:
+        totals: Dict[tuple, float] = {}
+        for shard in self._shards.shards():
+            for k, v in shard.items():
+                totals[k] = totals.get(k, 0.0) + v
+        return totals
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{self._fmt_labels(k)} {_num(v)}" for k, v in sorted(self.collect().items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        # Asignación atómica bajo el GIL: último valor gana
+        self._values: Dict[tuple, float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = float(value)
+
+    def collect(self) -> Dict[tuple, float]:
+        return dict(self._values)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{self._fmt_labels(k)} {_num(v)}" for k, v in sorted(self.collect().items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards()
+
+    def observe(self, value: float, **labels):
+        cell = self._shards.cell()
+        key = self._key(labels)
+        row = cell.get(key)
+        if row is None:
+            # [conteos por bucket..., suma, total]
+            row = cell[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                row[i] += 1
+                break
+        row[-2] += value
+        row[-1] += 1
+
+    def observe_many(self, values: List[float], **labels):
+        """Observa un lote de valores con la misma etiqueta (una sola búsqueda de celda)."""
+        cell = self._shards.cell()
+        key = self._key(labels)
+        row = cell.get(key)
+        if row is None:
+            row = cell[key] = [0] * len(self.buckets) + [0.0, 0]
+        buckets, n = self.buckets, len(self.buckets)
+        for v in values:
+            i = bisect_left(buckets, v)
+            if i < n:
+                row[i] += 1
+        row[-2] += sum(values)
+        row[-1] += len(values)
+
+    def collect(self) -> Dict[tuple, list]:
+        totals: Dict[tuple, list] = {}
+        for shard in self._shards.shards():
+            for k, row in shard.items():
+                acc = totals.setdefault(k, [0] * len(self.buckets) + [0.0, 0])
+                for i, v in enumerate(list(row)):
+                    acc[i] += v
+        return totals
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, row in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets, row):
+                cumulative += c
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{self.name}_bucket{self._fmt_labels(key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{self._fmt_labels(key, le)} {row[-1]}")
+            lines.append(f"{self.name}_sum{self._fmt_labels(key)} {_num(row[-2])}")
+            lines.append(f"{self.name}_count{self._fmt_labels(key)} {row[-1]}")
+        return lines
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(v: float) -> str:
+    v = float(v)
+    if math.isnan(v):
+        return "NaN"
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return str(int(v)) if v.is_integer() else repr(v)
+
+
+REGISTRY: List[_Metric] = []
+
+# ---------- Métricas del ecosistema ----------
+CYCLES = Counter("neuraboard_cycles_total", "Ciclos de aprendizaje registrados.", ("source",))
+REWARD = Histogram("neuraboard_reward", "Distribución de recompensas.", ("source",), REWARD_BUCKETS)
+EPSILON = Gauge("neuraboard_epsilon", "Exploración ε tras adaptive_adjustment.")
+RHO = Gauge("neuraboard_rho", "Evaporación ρ tras adaptive_adjustment.")
+PHEROMONE_ENTRIES = Gauge("neuraboard_pheromone_entries", "Entradas τ(s,a) en la tabla de feromonas.")
+MEMORY_WRITE = Histogram("neuraboard_memory_write_seconds", "Latencia de escritura de memory.json.", ("writer",))
+CONNECTOR_LATENCY = Histogram("neuraboard_connector_request_seconds", "Latencia HTTP por fuente.", ("source",))
+CONNECTOR_ERRORS = Counter("neuraboard_connector_errors_total", "Errores del conector por fuente.", ("source",))
+
+
+def render_metrics() -> str:
+    """Exposición en formato de texto Prometheus 0.0.4."""
+    out = []
+    for m in REGISTRY:
+        out.append(f"# HELP {m.name} {m.help}")
+        out.append(f"# TYPE {m.name} {m.kind}")
+        out.extend(m.render())
+    return "\n".join(out) + "\n"
+
+
+# ---------- Exportador HTTP ----------
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_exporter(port: int = 9464, addr: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Arranca (una sola vez) el exportador en un hilo daemon."""
+    global _server
+    if _server is not None:
+        return _server
+    _server = ThreadingHTTPServer((addr, port), _Handler)
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="neuraboard-exporter", daemon=True).start()
+    return _server
+
+
+def maybe_start_exporter() -> Optional[ThreadingHTTPServer]:
+    """Arranca el exportador si NEURABOARD_METRICS_PORT está definido."""
+    port = os.getenv("NEURABOARD_METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return start_exporter(int(port), os.getenv("NEURABOARD_METRICS_ADDR", "127.0.0.1"))
+    except (OSError, ValueError) as e:
+        print(f"[Telemetry] ⚠️ No se pudo iniciar el exportador: {e}")
+        return None
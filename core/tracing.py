@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+NeuraBoardEco - Trazas por ciclo
+Versión: 2025-10-25
+Autor: vlugoc
+Descripción:
+  Spans ligeros (context manager / decorador) con tiempo monotónico en
+  nanosegundos y anidamiento padre/hijo por contexto (contextvars: lo heredan
+  las tareas asyncio y los hilos lanzados con copy_context, como
+  AsyncCycleEngine.to_thread). Los spans se acumulan en
+  memoria y se vuelcan en bloque a logs/trace.jsonl.
+  - Activación: NEURABOARD_TRACE=1 o tracing.enable() (orchestrator --trace)
+  - Desactivado: span() devuelve un objeto nulo compartido
+Uso:
+  python core/tracing.py report [ruta]   → p50/p99 por fase
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path.home() / "NeuraBoardEco"
+TRACE_PATH = ROOT / "logs" / "trace.jsonl"
+FLUSH_EVERY = 4096
+
+_enabled = os.getenv("NEURABOARD_TRACE", "") not in ("", "0")
+_path = TRACE_PATH
+_buffer: List[dict] = []
+_buffer_lock = threading.Lock()
+_ids = itertools.count(1)
+_current: contextvars.ContextVar[Optional["_Span"]] = contextvars.ContextVar("trace_span", default=None)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "id", "parent", "root", "t0", "_token")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.id = next(_ids)
+        parent = _current.get()
+        self.parent = parent.id if parent else None
+        self.root = parent.root if parent else self.id
+        self._token = _current.set(self)
+        self.t0 = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        dur = time.monotonic_ns() - self.t0
+        _current.reset(self._token)
+        rec = {"name": self.name, "id": self.id, "parent": self.parent, "root": self.root,
+               "start_ns": self.t0, "dur_ns": dur, "thread": threading.get_ident()}
+        if self.attrs:
+            rec["attrs"] = self.attrs
+        if exc_type is not None:
+            rec["error"] = exc_type.__name__
+        # flush() intercambia la lista: añadir bajo el mismo lock
+        with _buffer_lock:
+            _buffer.append(rec)
+            full = len(_buffer) >= FLUSH_EVERY
+        if full:
+            flush()
+        return False
+
+
+def span(name: str, **attrs):
+    """Context manager de un span; no hace nada si las trazas están desactivadas."""
+    if not _enabled:
+        return _NULL
+    return _Span(name, attrs)
+
+
+def traced(name: Optional[str] = None):
+    """Decorador: envuelve la función en un span con su nombre."""
+    def deco(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def enable(path: Optional[Path] = None):
+    global _enabled, _path
+    _enabled = True
+    if path is not None:
+        _path = Path(path)
+
+
+def disable():
+    global _enabled
+    flush()
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def flush():
+    """Vuelca el buffer de spans a disco en una sola escritura."""
+    global _buffer
+    with _buffer_lock:
+        if not _buffer:
+            return
+        pending, _buffer = _buffer, []
+    try:
+        _path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in pending)
+        with open(_path, "a", encoding="utf-8") as f:
+            f.write(data)
+    except OSError as e:
+        print(f"[Trace] ⚠️ No se pudo escribir {_path}: {e}")
+
+
+atexit.register(flush)
+
+
+# ---------- Reporte ----------
+def _percentile(sorted_vals: List[int], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[idx]
+
+
+def report(path: Path = TRACE_PATH) -> Dict[str, dict]:
+    """Agrega duraciones por fase: n, p50, p99 y total (ms)."""
+    durations: Dict[str, List[int]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            durations.setdefault(rec["name"], []).append(rec["dur_ns"])
+    out = {}
+    for name, vals in durations.items():
+        vals.sort()
+        out[name] = {
+            "n": len(vals),
+            "p50_ms": _percentile(vals, 0.5) / 1e6,
+            "p99_ms": _percentile(vals, 0.99) / 1e6,
+            "total_ms": sum(vals) / 1e6,
+        }
+    return out
+
+
+def main(argv: list) -> int:
+    if not argv or argv[0] != "report":
+        print("Uso: python core/tracing.py report [ruta]")
+        return 2
+    path = Path(argv[1]) if len(argv) > 1 else TRACE_PATH
+    if not path.exists():
+        print(f"⚠️ No existe {path} — ejecuta el orquestador con --trace o NEURABOARD_TRACE=1.")
+        return 1
+    rows = sorted(report(path).items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+    width = max(len(n) for n, _ in rows) if rows else 10
+    print(f"{'fase':<{width}} {'n':>7} {'p50 ms':>10} {'p99 ms':>10} {'total ms':>12}")
+    for name, r in rows:
+        print(f"{name:<{width}} {r['n']:>7} {r['p50_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['total_ms']:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
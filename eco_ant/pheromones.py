@@ -11,10 +11,14 @@ Simulación de aprendizaje por refuerzo basada en colonia de hormigas (Ant Colon
 - Persistencia en memory.json del entorno NeuraBoardEco
 """
 
-import json, math, random
+import json, math, random, time
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+from core import telemetry
+from core.memlock import MEMORY_LOCK
+from core.tracing import traced
+
 
 # ==== CONFIGURACIÓN GLOBAL ====
 NEURABOARD_HOME = Path.home() / "NeuraBoardEco"
@@ -34,7 +38,9 @@ def _load_global_memory() -> dict:
 def _save_global_memory(data: dict) -> None:
     """Guarda datos globales de feromonas."""
     MEM_PATH.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
     MEM_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    telemetry.MEMORY_WRITE.observe(time.perf_counter() - t0, writer="pheromones")
 
 
 # ==== CLASE PRINCIPAL ====
@@ -53,6 +59,7 @@ class PheromoneTable:
         min_tau: float = 1e-6,
         max_tau: float = 10.0,
         persist_in_memory: bool = True,
+        autosave: bool = True,
     ):
         self.tau0 = tau0
         self.rho = rho
@@ -62,6 +69,8 @@ class PheromoneTable:
         self.min_tau = min_tau
         self.max_tau = max_tau
         self.persist_in_memory = persist_in_memory
+        # autosave=False difiere la escritura de memory.json hasta flush() (modo lote)
+        self.autosave = autosave
 
         self.table: Dict[str, Dict[str, float]] = {}
         if self.persist_in_memory:
@@ -74,13 +83,19 @@ class PheromoneTable:
         self.table = ant.get("pheromones", {}) or {}
 
     def _save_to_memory(self):
+        telemetry.PHEROMONE_ENTRIES.set(sum(len(a) for a in self.table.values()))
         if not self.persist_in_memory:
             return
-        data = _load_global_memory()
-        if "ant_rl" not in data:
-            data["ant_rl"] = {}
-        data["ant_rl"]["pheromones"] = self.table
-        _save_global_memory(data)
+        with MEMORY_LOCK:
+            data = _load_global_memory()
+            if "ant_rl" not in data:
+                data["ant_rl"] = {}
+            data["ant_rl"]["pheromones"] = self.table
+            _save_global_memory(data)
+
+    def flush(self):
+        """Persiste la tabla en memory.json (usado al cerrar un lote)."""
+        self._save_to_memory()
 
     # ---------- Funciones base ----------
     def get_tau(self, state: str, action: str) -> float:
@@ -99,8 +114,28 @@ class PheromoneTable:
         for s, actions in self.table.items():
             for a in list(actions.keys()):
                 self.table[s][a] = max(self.min_tau, (1.0 - self.rho) * actions[a])
-        self._save_to_memory()
+        if self.autosave:
+            self._save_to_memory()
 
+    def prune(self, tol: float = 1e-9) -> int:
+        """
+        Elimina las entradas con τ(s,a) == tau0 (equivalen a no tenerlas:
+        get_tau devuelve tau0 para lo ausente) y los estados que quedan vacíos.
+        Las entradas evaporadas hasta min_tau se conservan: borrarlas las
+        devolvería a tau0 y perdería la evitación aprendida.
+        Devuelve cuántas entradas se quitaron.
+        """
+        removed = 0
+        for s in list(self.table):
+            actions = self.table[s]
+            for a in [a for a, v in actions.items() if abs(v - self.tau0) <= tol]:
+                del actions[a]
+                removed += 1
+            if not actions:
+                del self.table[s]
+        return removed
+
+    @traced("deposit")
     def deposit(self, trajectory: List[Tuple[str, str]], reward: float, scale: float = 1.0):
         """Deposita feromonas a lo largo de una trayectoria con refuerzo."""
         reward_norm = math.tanh(reward / 10.0)
@@ -108,8 +143,29 @@ class PheromoneTable:
         for s, a in trajectory:
             tau = self.get_tau(s, a)
             self.set_tau(s, a, tau + delta)
-        self._save_to_memory()
+        if self.autosave:
+            self._save_to_memory()
+
+    def action_probabilities(self, state: str, actions: List[str],
+                             heuristic: Optional[Dict[str, float]] = None) -> List[float]:
+        """
+        Distribución exacta de choose_action(): ε/k uniforme + (1-ε)·(τ^α·η^β)/Σ.
+        Permite sortear muchas decisiones del mismo estado en bloque.
+        """
+        if not actions:
+            raise ValueError("No hay acciones disponibles.")
+        scores = []
+        for a in actions:
+            tau = max(self.min_tau, self.get_tau(state, a))
+            eta = 1.0
+            if heuristic and a in heuristic:
+                eta = max(1e-6, float(heuristic[a]))
+            scores.append(max(1e-12, (tau ** self.alpha) * (eta ** self.beta)))
+        total = sum(scores)
+        explore = self.epsilon / len(actions)
+        return [explore + (1.0 - self.epsilon) * sc / total for sc in scores]
 
+    @traced("choose_action")
     def choose_action(self, state: str, actions: List[str],
                       heuristic: Optional[Dict[str, float]] = None) -> str:
         """
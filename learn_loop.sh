@@ -1,11 +1,13 @@
 #!/data/data/com.termux/files/usr/bin/bash
 # NeuraBoardEco - Loop de autoaprendizaje
+# El orquestador corre en modo daemon (un solo proceso, ciclos cada 30s);
+# el bucle solo lo relanza si el proceso termina o falla.
 
 export PYTHONPATH=$HOME/NeuraBoardEco
 
 while true; do
-    echo "[LOOP] Ejecutando ciclo NeuraBoardEco..."
-    python3 $HOME/NeuraBoardEco/core/orchestrator.py >> $HOME/NeuraBoardEco/logs/learn_loop.log 2>&1
-    echo "[LOOP] Ciclo completado — reiniciando en 30s..."
+    echo "[LOOP] Iniciando daemon NeuraBoardEco..."
+    python3 $HOME/NeuraBoardEco/core/orchestrator.py --daemon --interval 30 >> $HOME/NeuraBoardEco/logs/learn_loop.log 2>&1
+    echo "[LOOP] Daemon finalizado — reiniciando en 30s..."
     sleep 30
 done
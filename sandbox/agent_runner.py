@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+sandbox/agent_runner.py
+Agente Ant-RL (PheromoneTable) contra el sandbox con API reset()/step().
+Autor: vlugoc
+Versión: 1.0
+Descripción:
+  Evalúa parámetros de feromonas fuera de línea: choose_action → step →
+  deposit en cada paso y evaporación al final de cada episodio. Reporta
+  throughput (pasos/s) y velocidad de convergencia hacia la mejor acción.
+Uso:
+  python sandbox/agent_runner.py --episodes 200 --cycles 20 --rho 0.05 --epsilon 0.1
+  python sandbox/agent_runner.py --reward drift:0.05   → entorno no estacionario
+"""
+
+import argparse
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from rich import print
+
+from eco_ant.pheromones import PheromoneTable
+from sandbox.rewards import make_model
+from sandbox.virtual_env import VirtualEnv
+
+CONVERGENCE_WINDOW = 100
+CONVERGENCE_TARGET = 0.9
+
+
+def run_agent(env: VirtualEnv, ant: PheromoneTable, episodes: int = 100,
+              actions: Optional[List[str]] = None, heuristic: Optional[Dict[str, float]] = None,
+              best_action: Optional[str] = None, window: int = CONVERGENCE_WINDOW,
+              target: float = CONVERGENCE_TARGET, seed: Optional[int] = None,
+              record=None) -> dict:
+    """
+    Entrena `ant` durante `episodes` episodios del entorno y devuelve:
+    - steps_per_s: pasos de aprendizaje por segundo
+    - converged_at: primer paso en que la mejor acción se eligió en ≥ target
+      de los últimos `window` pasos (None si no ocurre)
+    - greedy_at: paso desde el que argmax τ es la mejor acción hasta el final
+    - optimal_rate / mean_reward: sobre la última ventana y el total
+    - counts: veces que se eligió cada acción
+    record: contenedor opcional (p. ej. array('f')) al que se agrega cada recompensa
+    """
+    actions = actions or env.actions
+    if best_action is None:
+        best_action = max(actions, key=env.expected)
+    recent = deque(maxlen=window)
+    counts = dict.fromkeys(actions, 0)
+    steps = 0
+    reward_sum = 0.0
+    converged_at = None
+    greedy_at = None
+    started = time.perf_counter()
+
+    for ep in range(episodes):
+        obs = env.reset(seed if ep == 0 else None)
+        done = False
+        while not done:
+            choice = ant.choose_action(obs, actions, heuristic)
+            next_obs, reward, done, _ = env.step(choice)
+            ant.deposit([(obs, choice)], reward)
+            obs = next_obs
+            steps += 1
+            reward_sum += reward
+            counts[choice] += 1
+            if record is not None:
+                record.append(reward)
+            recent.append(choice == best_action)
+            if converged_at is None and len(recent) == window and sum(recent) >= target * window:
+                converged_at = steps
+            greedy = max(actions, key=lambda a: ant.get_tau(obs, a))
+            if greedy != best_action:
+                greedy_at = None
+            elif greedy_at is None:
+                greedy_at = steps
+        ant.evaporate()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "episodes": episodes,
+        "steps": steps,
+        "seconds": elapsed,
+        "steps_per_s": steps / elapsed if elapsed > 0 else None,
+        "best_action": best_action,
+        "converged_at": converged_at,
+        "greedy_at": greedy_at,
+        "optimal_rate": sum(recent) / len(recent) if recent else 0.0,
+        "mean_reward": reward_sum / steps if steps else 0.0,
+        "counts": counts,
+        "tau": {a: ant.get_tau(env.state, a) for a in actions},
+    }
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Agente Ant-RL contra el sandbox (evaluación offline)")
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--cycles", type=int, default=20, help="pasos por episodio")
+    parser.add_argument("--tau0", type=float, default=0.1)
+    parser.add_argument("--rho", type=float, default=0.05)
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--beta", type=float, default=1.0)
+    parser.add_argument("--epsilon", type=float, default=0.1)
+    parser.add_argument("--reward", default="per-action",
+                        help="modelo de recompensa: uniform | per-action | normal | drift[:σ] | "
+                             "delayed:<pasos> | history[:archivo.ep]")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        import random
+        random.seed(args.seed)
+    env = VirtualEnv(cycles=args.cycles, seed=args.seed, reward_model=make_model(args.reward, args.seed))
+    # Tabla aislada: la evaluación no toca memory.json
+    ant = PheromoneTable(tau0=args.tau0, rho=args.rho, alpha=args.alpha, beta=args.beta,
+                         epsilon=args.epsilon, persist_in_memory=False, autosave=False)
+    r = run_agent(env, ant, args.episodes, seed=args.seed)
+
+    print(f"[Agent] {r['steps']} pasos en {r['seconds']:.3f}s → {r['steps_per_s']:.0f} pasos/s")
+    conv = f"paso {r['converged_at']}" if r["converged_at"] else "no alcanzada"
+    greedy = f"paso {r['greedy_at']}" if r["greedy_at"] else "no estable"
+    print(f"[Agent] Mejor acción: {r['best_action']} | convergencia ({CONVERGENCE_TARGET:.0%} en "
+          f"{CONVERGENCE_WINDOW} pasos): {conv} | argmax τ estable desde: {greedy}")
+    print(f"[Agent] Tasa óptima final: {r['optimal_rate']:.2%} | recompensa media: {r['mean_reward']:.2f}")
+    print("[Agent] τ: " + ", ".join(f"{a}={t:.3f}" for a, t in r["tau"].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
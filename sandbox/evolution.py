@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+sandbox/evolution.py
+Capa de evolución de políticas: población de colonias que mutan y se cruzan.
+Autor: vlugoc
+Versión: 1.0
+Descripción:
+  Cada colonia (genoma) = parámetros de PheromoneTable (τ0, ρ, α, β, ε) +
+  su matriz τ (estados × acciones). Toda la población vive en un único
+  array('f') contiguo de N × (5 + S·A) floats de 4 B, en lugar de N tablas
+  de dicts anidados, así que cientos de colonias ocupan unos KB.
+  Por generación:
+    1. fitness en paralelo: cada genoma entrena en el sandbox (granja de
+       procesos de sandbox/farm.py) partiendo de su τ heredado
+    2. el τ aprendido (media de las semillas evaluadas) se escribe de
+       vuelta en el genoma (herencia lamarckiana)
+    3. élites intactas + hijos por torneo, cruce (parámetros uniforme, τ
+       mezcla por estado) y mutación log-normal
+  --apply solo escribe parámetros (el orquestador arranca con su propio τ),
+  así que antes se reevalúan los mejores candidatos desde τ0 con semillas
+  nuevas y se aplica el mejor en esas condiciones.
+Uso:
+  python sandbox/evolution.py --population 200 --generations 10 --episodes 20
+  python sandbox/evolution.py --reward drift:0.05 --save poblacion.pop
+  python sandbox/evolution.py --load poblacion.pop --generations 5 --apply
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from rich import print
+
+from sandbox.farm import PARAM_KEYS, merge_tables, run_farm
+from sandbox.rewards import make_model
+from sandbox.search import SPACE, apply_best, sample_config
+from sandbox.virtual_env import VirtualEnv
+
+N_PARAMS = len(PARAM_KEYS)
+MIN_TAU = 1e-6
+MAX_TAU = 10.0
+
+
+class Population:
+    """N genomas en filas de un array('f'): [τ0, ρ, α, β, ε, τ(s0,a0), τ(s0,a1), ...]."""
+
+    def __init__(self, states: List[str], actions: List[str], size: int = 0, data: Optional[array] = None):
+        self.states = list(states)
+        self.actions = list(actions)
+        self.width = N_PARAMS + len(self.states) * len(self.actions)
+        self.data = data if data is not None else array("f", bytes(4 * self.width * size))
+        self.size = len(self.data) // self.width
+
+    @classmethod
+    def random(cls, size: int, states: List[str], actions: List[str], rng: random.Random) -> "Population":
+        pop = cls(states, actions, size)
+        for i in range(size):
+            params = sample_config(rng)
+            pop.set(i, params, None)
+        return pop
+
+    def row(self, i: int) -> array:
+        return self.data[i * self.width:(i + 1) * self.width]
+
+    def params(self, i: int) -> Dict[str, float]:
+        base = i * self.width
+        return {k: float(self.data[base + j]) for j, k in enumerate(PARAM_KEYS)}
+
+    def table(self, i: int) -> Dict[str, Dict[str, float]]:
+        base = i * self.width + N_PARAMS
+        k = len(self.actions)
+        return {s: {a: float(self.data[base + si * k + ai]) for ai, a in enumerate(self.actions)}
+                for si, s in enumerate(self.states)}
+
+    def set(self, i: int, params: Dict[str, float], table: Optional[Dict[str, Dict[str, float]]]):
+        """Escribe un genoma; sin tabla, τ = τ0 en todas las entradas."""
+        base = i * self.width
+        for j, key in enumerate(PARAM_KEYS):
+            self.data[base + j] = params[key]
+        k = len(self.actions)
+        for si, s in enumerate(self.states):
+            row = (table or {}).get(s, {})
+            for ai, a in enumerate(self.actions):
+                self.data[base + N_PARAMS + si * k + ai] = row.get(a, params["tau0"])
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.itemsize * len(self.data)
+
+    def save(self, path: Path):
+        """Floats crudos + sidecar <archivo>.json con la disposición."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            self.data.tofile(f)
+        path.with_name(path.name + ".json").write_text(
+            json.dumps({"states": self.states, "actions": self.actions, "params": list(PARAM_KEYS)}),
+            encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "Population":
+        path = Path(path)
+        layout = json.loads(path.with_name(path.name + ".json").read_text(encoding="utf-8"))
+        data = array("f")
+        data.frombytes(path.read_bytes())
+        return cls(layout["states"], layout["actions"], data=data)
+
+
+def mutate(genome: array, rng: random.Random, sigma: float = 0.2, tau_sigma: float = 0.3, rate: float = 0.5):
+    """Perturbación log-normal in situ: cada gen cambia con probabilidad `rate`."""
+    for j in range(len(genome)):
+        if rng.random() < rate:
+            genome[j] *= math.exp(rng.gauss(0.0, sigma if j < N_PARAMS else tau_sigma))
+    for j, key in enumerate(PARAM_KEYS):
+        lo, hi, _ = SPACE[key]
+        genome[j] = min(hi, max(lo, genome[j]))
+    for j in range(N_PARAMS, len(genome)):
+        genome[j] = min(MAX_TAU, max(MIN_TAU, genome[j]))
+
+
+def crossover(a: array, b: array, n_actions: int, rng: random.Random) -> array:
+    """Parámetros: cruce uniforme. τ: por estado, mezcla w·τa + (1-w)·τb con w ~ U(0,1)."""
+    child = array("f", a)
+    for j in range(N_PARAMS):
+        if rng.random() < 0.5:
+            child[j] = b[j]
+    for start in range(N_PARAMS, len(a), n_actions):
+        w = rng.random()
+        for j in range(start, start + n_actions):
+            child[j] = w * a[j] + (1.0 - w) * b[j]
+    return child
+
+
+def evaluate(pop: Population, episodes: int, seeds: List[int], cycles: int = 20, reward: str = "per-action",
+             workers: Optional[int] = None) -> List[float]:
+    """Fitness = recompensa media en `seeds`; el τ final medio de esas semillas vuelve al genoma."""
+    jobs = [{"seed": s, "cycles": cycles, "episodes": episodes, "reward": reward,
+             **pop.params(i), "table": pop.table(i)}
+            for i in range(pop.size) for s in seeds]
+    results = run_farm(jobs, workers)
+    fitness = []
+    n = len(seeds)
+    for i in range(pop.size):
+        runs = results[i * n:(i + 1) * n]
+        fitness.append(sum(r["mean_reward"] for r in runs) / n)
+        pop.set(i, pop.params(i), merge_tables(runs).table)
+    return fitness
+
+
+def fresh_fitness(candidates: List[Dict[str, float]], episodes: int, seeds: List[int], cycles: int = 20,
+                  reward: str = "per-action", workers: Optional[int] = None) -> List[float]:
+    """Recompensa media de cada juego de parámetros partiendo de τ0, como lo usará el orquestador."""
+    jobs = [{"seed": s, "cycles": cycles, "episodes": episodes, "reward": reward, **params}
+            for params in candidates for s in seeds]
+    results = run_farm(jobs, workers)
+    n = len(seeds)
+    return [sum(r["mean_reward"] for r in results[i * n:(i + 1) * n]) / n for i in range(len(candidates))]
+
+
+def next_generation(pop: Population, fitness: List[float], rng: random.Random, elite: int = 2,
+                    tournament: int = 3, crossover_rate: float = 0.7, **mutation) -> Population:
+    order = sorted(range(pop.size), key=fitness.__getitem__, reverse=True)
+    new = Population(pop.states, pop.actions)
+    data = array("f")
+    for i in order[:elite]:
+        data.extend(pop.row(i))
+
+    def pick() -> array:
+        best = max(rng.sample(range(pop.size), tournament), key=fitness.__getitem__)
+        return pop.row(best)
+
+    k = len(pop.actions)
+    for _ in range(pop.size - elite):
+        child = crossover(pick(), pick(), k, rng) if rng.random() < crossover_rate else array("f", pick())
+        mutate(child, rng, **mutation)
+        data.extend(child)
+    new.data = data
+    new.size = pop.size
+    return new
+
+
+def dict_table_bytes(table: Dict[str, Dict[str, float]]) -> int:
+    """Tamaño aproximado de la misma tabla como dicts anidados (comparativa de memoria)."""
+    total = sys.getsizeof(table)
+    for s, actions in table.items():
+        total += sys.getsizeof(s) + sys.getsizeof(actions)
+        total += sum(sys.getsizeof(a) + sys.getsizeof(t) for a, t in actions.items())
+    return total
+
+
+def evolve(pop: Population, generations: int = 10, episodes: int = 20, n_seeds: int = 2, cycles: int = 20,
+           reward: str = "per-action", workers: Optional[int] = None, seed: Optional[int] = None,
+           elite: int = 2) -> dict:
+    rng = random.Random(seed)
+    history = []
+    best = None
+    fitness: List[float] = []
+    for gen in range(generations):
+        started = time.perf_counter()
+        # Semillas nuevas por generación: la élite debe revalidarse y no sobreajustar a una traza
+        seeds = [(seed or 0) + gen * n_seeds + s for s in range(n_seeds)]
+        fitness = evaluate(pop, episodes, seeds, cycles, reward, workers)
+        top = max(range(pop.size), key=fitness.__getitem__)
+        if best is None or fitness[top] >= best["fitness"]:
+            best = {"generation": gen, "fitness": fitness[top], "params": pop.params(top), "table": pop.table(top)}
+        mean = sum(fitness) / len(fitness)
+        history.append({"generation": gen, "best": fitness[top], "mean": mean,
+                        "seconds": time.perf_counter() - started})
+        print(f"[Evolution] Gen {gen}: mejor {fitness[top]:.3f} | media {mean:.3f} | "
+              f"{history[-1]['seconds']:.2f}s")
+        if gen < generations - 1:
+            pop = next_generation(pop, fitness, rng, elite=min(elite, pop.size))
+    return {"population": pop, "best": best, "history": history, "fitness": fitness}
+
+
+def select_for_apply(result: dict, top: int = 5, episodes: int = 20, n_seeds: int = 4, cycles: int = 20,
+                     reward: str = "per-action", workers: Optional[int] = None, seed: Optional[int] = None) -> dict:
+    """
+    El mejor histórico y los `top` mejores de la última generación,
+    reevaluados desde τ0 con semillas que la evolución no usó.
+    """
+    pop, fitness = result["population"], result["fitness"]
+    order = sorted(range(pop.size), key=fitness.__getitem__, reverse=True)[:top]
+    candidates = [result["best"]["params"]] + [pop.params(i) for i in order]
+    base = (seed or 0) + 1_000_000
+    scores = fresh_fitness(candidates, episodes, [base + s for s in range(n_seeds)], cycles, reward, workers)
+    i = max(range(len(candidates)), key=scores.__getitem__)
+    return {"params": candidates[i], "fitness": scores[i]}
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Evolución de colonias de feromonas en el sandbox")
+    parser.add_argument("--population", type=int, default=100)
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--episodes", type=int, default=20, help="episodios por evaluación de fitness")
+    parser.add_argument("--seeds", type=int, default=2, help="semillas por evaluación")
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--elite", type=int, default=2)
+    parser.add_argument("--reward", default="per-action", help="modelo de recompensa (ver sandbox/rewards.py)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--load", type=Path, help="continuar desde una población guardada")
+    parser.add_argument("--save", type=Path, help="guardar la población final")
+    parser.add_argument("--apply", action="store_true", help="escribir los parámetros del mejor en orchestrator.json")
+    args = parser.parse_args(argv)
+
+    if args.load:
+        pop = Population.load(args.load)
+    else:
+        env = VirtualEnv(cycles=args.cycles, reward_model=make_model(args.reward, args.seed))
+        pop = Population.random(args.population, [env.state], env.actions, random.Random(args.seed))
+    per_genome = pop.nbytes // max(1, pop.size)
+    print(f"[Evolution] {pop.size} colonias × {pop.width} genes = {pop.nbytes} B "
+          f"({per_genome} B/colonia; como dicts ≈ {dict_table_bytes(pop.table(0))} B solo la tabla τ)")
+
+    r = evolve(pop, args.generations, args.episodes, args.seeds, args.cycles, args.reward, args.workers,
+               args.seed, args.elite)
+    best = r["best"]
+    print(f"[Evolution] 🏆 Mejor (gen {best['generation']}): fitness {best['fitness']:.3f} | "
+          + ", ".join(f"{k}={v:.4g}" for k, v in best["params"].items()))
+    for s, actions in best["table"].items():
+        print(f"[Evolution] τ ({s}): " + ", ".join(f"{a}={t:.3f}" for a, t in actions.items()))
+    if args.save:
+        r["population"].save(args.save)
+        print(f"[Evolution] Población guardada en {args.save}")
+    if args.apply:
+        chosen = select_for_apply(r, episodes=args.episodes, n_seeds=max(args.seeds, 4), cycles=args.cycles,
+                                  reward=args.reward, workers=args.workers, seed=args.seed)
+        print(f"[Evolution] Reevaluado desde τ0: fitness {chosen['fitness']:.3f} "
+              f"(con τ heredado {best['fitness']:.3f})")
+        apply_best({k: round(v, 4) for k, v in chosen["params"].items()}, actions=pop.actions)
+        print("[Evolution] ✅ Parámetros escritos en config/orchestrator.json (clave 'ant')")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
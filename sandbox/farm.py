@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+sandbox/farm.py
+Granja de sandboxes en paralelo sobre todos los núcleos.
+Autor: vlugoc
+Versión: 1.0
+Descripción:
+  Reparte trabajos (semilla × ciclos × ε/ρ/α/β) en un ProcessPoolExecutor.
+  Cada worker ejecuta run_agent() con tabla aislada y sin E/S y devuelve
+  arrays compactos (recompensas float32 + resumen); el proceso padre fusiona
+  las métricas (una sola escritura de memory.json) y, opcionalmente, las
+  tablas de feromonas (media de τ por estado/acción).
+Uso:
+  python sandbox/farm.py --seeds 16 --rho 0.05,0.2 --epsilon 0.05,0.1 --episodes 200
+  python sandbox/farm.py --seeds 32 --bench       → speedup 1 worker vs N
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from rich import print
+
+from core.metrics import LearningMetrics
+from eco_ant.pheromones import PheromoneTable
+from sandbox.agent_runner import run_agent
+from sandbox.rewards import make_model
+from sandbox.virtual_env import VirtualEnv
+
+PARAM_KEYS = ("tau0", "rho", "alpha", "beta", "epsilon")
+DEFAULT_PARAMS = {"tau0": 0.1, "rho": 0.05, "alpha": 1.0, "beta": 1.0, "epsilon": 0.1}
+
+
+def make_jobs(seeds: int = 8, cycles: int = 20, episodes: int = 100, grid: Optional[Dict[str, list]] = None,
+              base_seed: int = 0, reward: str = "per-action") -> List[dict]:
+    """Producto cartesiano de la rejilla de parámetros por `seeds` semillas."""
+    grid = {k: list(v) for k, v in (grid or {}).items() if v}
+    keys = sorted(grid)
+    jobs = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        params = {**DEFAULT_PARAMS, **dict(zip(keys, values))}
+        for i in range(seeds):
+            jobs.append({"seed": base_seed + i, "cycles": cycles, "episodes": episodes, "reward": reward,
+                         **params})
+    return jobs
+
+
+def run_job(job: dict) -> dict:
+    """Ejecuta un trabajo sin tocar memory.json ni sandbox.log."""
+    random.seed(job["seed"])
+    metrics = LearningMetrics(source="farm", emit_events=False, autosave=False)
+    model = make_model(job.get("reward", "per-action"), job["seed"])
+    env = VirtualEnv(cycles=job["cycles"], seed=job["seed"], metrics=metrics, reward_model=model)
+    ant = PheromoneTable(**{k: job[k] for k in PARAM_KEYS}, persist_in_memory=False, autosave=False)
+    # τ inicial opcional {estado: {acción: τ}} (p. ej. heredado en sandbox/evolution.py)
+    for s, actions in (job.get("table") or {}).items():
+        for a, tau in actions.items():
+            ant.set_tau(s, a, tau)
+    rewards = array("f")
+    res = run_agent(env, ant, job["episodes"], seed=job["seed"], record=rewards)
+    res["rewards"] = rewards
+    res["table"] = ant.table
+    res["job"] = job
+    return res
+
+
+def _run_shard(jobs: List[dict]) -> List[dict]:
+    return [run_job(j) for j in jobs]
+
+
+def run_farm(jobs: List[dict], workers: Optional[int] = None) -> List[dict]:
+    """Reparte los trabajos en shards (~4 por worker) y devuelve los resultados en orden."""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        return _run_shard(jobs)
+    n_shards = min(len(jobs), workers * 4)
+    shards = [jobs[i::n_shards] for i in range(n_shards)]
+    results: List[Optional[dict]] = [None] * len(jobs)
+    with ProcessPoolExecutor(workers) as pool:
+        for i, out in enumerate(pool.map(_run_shard, shards)):
+            for j, res in enumerate(out):
+                results[i + j * n_shards] = res
+    return results
+
+
+def merge_metrics(results: List[dict], metrics: Optional[LearningMetrics] = None) -> LearningMetrics:
+    """Fusiona las recompensas de todos los trabajos en un LearningMetrics (sin escribir)."""
+    metrics = metrics or LearningMetrics(source="farm", autosave=False)
+    for res in results:
+        metrics.register_batch(res["rewards"])
+    return metrics
+
+
+def merge_tables(results: List[dict], target: Optional[PheromoneTable] = None) -> PheromoneTable:
+    """τ medio por (estado, acción) ponderado por pasos de cada trabajo."""
+    sums: Dict[str, Dict[str, float]] = {}
+    weights: Dict[str, Dict[str, float]] = {}
+    for res in results:
+        w = float(res["steps"])
+        for s, actions in res["table"].items():
+            for a, tau in actions.items():
+                sums.setdefault(s, {})[a] = sums.get(s, {}).get(a, 0.0) + w * tau
+                weights.setdefault(s, {})[a] = weights.get(s, {}).get(a, 0.0) + w
+    target = target or PheromoneTable(persist_in_memory=False, autosave=False)
+    for s, actions in sums.items():
+        for a, total in actions.items():
+            target.set_tau(s, a, total / weights[s][a])
+    return target
+
+
+def summarize(results: List[dict]) -> List[dict]:
+    """Una fila por combinación de parámetros (agregando semillas)."""
+    groups: Dict[tuple, List[dict]] = {}
+    for res in results:
+        groups.setdefault(tuple(res["job"][k] for k in PARAM_KEYS), []).append(res)
+    rows = []
+    for key, items in groups.items():
+        conv = sorted(r["converged_at"] for r in items if r["converged_at"] is not None)
+        rows.append({
+            **dict(zip(PARAM_KEYS, key)),
+            "runs": len(items),
+            "mean_reward": sum(r["mean_reward"] for r in items) / len(items),
+            "optimal_rate": sum(r["optimal_rate"] for r in items) / len(items),
+            "converged": len(conv),
+            "median_converged_at": conv[len(conv) // 2] if conv else None,
+        })
+    rows.sort(key=lambda r: r["mean_reward"], reverse=True)
+    return rows
+
+
+def _floats(text: Optional[str]) -> list:
+    return [float(x) for x in text.split(",")] if text else []
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Granja de sandboxes en paralelo")
+    parser.add_argument("--seeds", type=int, default=8, help="semillas por combinación")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--reward", default="per-action", help="modelo de recompensa (ver sandbox/rewards.py)")
+    for key in PARAM_KEYS:
+        parser.add_argument(f"--{key}", help="lista separada por comas")
+    parser.add_argument("--merge-pheromones", action="store_true",
+                        help="fusionar τ medio en la tabla global de memory.json")
+    parser.add_argument("--persist", action="store_true", help="guardar métricas fusionadas en memory.json")
+    parser.add_argument("--bench", action="store_true", help="comparar 1 worker contra N")
+    args = parser.parse_args(argv)
+
+    grid = {k: _floats(getattr(args, k)) for k in PARAM_KEYS}
+    jobs = make_jobs(args.seeds, args.cycles, args.episodes, grid, reward=args.reward)
+    workers = args.workers or os.cpu_count() or 1
+
+    if args.bench:
+        t0 = time.perf_counter()
+        run_farm(jobs, 1)
+        serial = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        run_farm(jobs, workers)
+        parallel = time.perf_counter() - t0
+        print(f"[Farm] {len(jobs)} trabajos | 1 worker: {serial:.2f}s | {workers} workers: {parallel:.2f}s "
+              f"→ speedup {serial / parallel:.2f}x (eficiencia {serial / parallel / workers:.0%})")
+        return 0
+
+    t0 = time.perf_counter()
+    results = run_farm(jobs, workers)
+    elapsed = time.perf_counter() - t0
+    steps = sum(r["steps"] for r in results)
+    print(f"[Farm] {len(jobs)} trabajos, {steps} pasos en {elapsed:.2f}s con {workers} workers "
+          f"→ {steps / elapsed:.0f} pasos/s")
+
+    print(f"{'tau0':>6} {'rho':>6} {'alpha':>6} {'beta':>6} {'eps':>6} {'runs':>5} "
+          f"{'r̄':>7} {'óptima':>7} {'conv':>5} {'mediana':>8}")
+    for r in summarize(results):
+        med = r["median_converged_at"] if r["median_converged_at"] is not None else "-"
+        print(f"{r['tau0']:>6g} {r['rho']:>6g} {r['alpha']:>6g} {r['beta']:>6g} {r['epsilon']:>6g} "
+              f"{r['runs']:>5} {r['mean_reward']:>7.3f} {r['optimal_rate']:>7.1%} {r['converged']:>5} {med:>8}")
+
+    metrics = merge_metrics(results)
+    print(metrics.summary())
+    if args.persist:
+        metrics.flush()
+    if args.merge_pheromones:
+        table = merge_tables(results, PheromoneTable(autosave=False))
+        table.flush()
+        print(f"[Farm] τ medio fusionado en memory.json ({len(table.table)} estados)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
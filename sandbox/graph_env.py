@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+sandbox/graph_env.py
+Entorno de grafo para búsqueda de caminos con colonia de hormigas.
+Autor: vlugoc
+Versión: 1.0
+Descripción:
+  Grafos dirigidos y ponderados en formato CSR (indptr/indices/weights en
+  array de la stdlib: ~20 B por arista), generados (geométricos k-vecinos,
+  10k+ nodos) o cargados de archivo (lista de aristas "u v w" o coordenadas
+  TSPLIB). Las hormigas construyen trayectorias origen→destino eligiendo
+  cada salto con PheromoneTable.choose_action (τ^α·η^β) y refuerzan el
+  camino con deposit(); la calidad se mide contra Dijkstra.
+Uso:
+  python sandbox/graph_env.py bench --nodes 10000 --ants 20 --iterations 30
+  python sandbox/graph_env.py bench --edges grafo.txt --source 0 --target 42
+  python sandbox/graph_env.py bench --tsp berlin52.tsp --k 8
+"""
+
+import argparse
+import heapq
+import math
+import random
+import sys
+import time
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+from rich import print
+
+from eco_ant.pheromones import PheromoneTable
+
+
+class CSRGraph:
+    """Grafo dirigido ponderado en CSR: vecinos de u = indices[indptr[u]:indptr[u+1]]."""
+
+    def __init__(self, n: int, indptr: array, indices: array, weights: array, coords=None):
+        self.n = n
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.coords = coords  # array('d') [x0, y0, x1, y1, ...] o None
+
+    @property
+    def m(self) -> int:
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(cls, n: int, edges: Iterable[Tuple[int, int, float]], coords=None) -> "CSRGraph":
+        """Construye el CSR por conteo (O(n + m)); las aristas repetidas se conservan."""
+        src, dst, w = array("l"), array("l"), array("d")
+        for u, v, wt in edges:
+            src.append(u)
+            dst.append(v)
+            w.append(wt)
+        counts = [0] * (n + 1)
+        for u in src:
+            counts[u + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        indptr = array("q", counts)
+        pos = counts[:-1]
+        indices = array("l", bytes(len(dst) * array("l").itemsize))
+        weights = array("d", bytes(len(w) * 8))
+        for u, v, wt in zip(src, dst, w):
+            p = pos[u]
+            indices[p] = v
+            weights[p] = wt
+            pos[u] = p + 1
+        return cls(n, indptr, indices, weights, coords)
+
+    def neighbors(self, u: int) -> Tuple[int, int]:
+        """Rango [inicio, fin) de las aristas salientes de u."""
+        return self.indptr[u], self.indptr[u + 1]
+
+    def distance(self, u: int, v: int) -> float:
+        c = self.coords
+        return math.hypot(c[2 * u] - c[2 * v], c[2 * u + 1] - c[2 * v + 1])
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.indptr, self.indices, self.weights))
+
+    def dijkstra(self, source: int, target: Optional[int] = None) -> Tuple[float, List[int]]:
+        """Camino mínimo (longitud, nodos); inf y [] si no hay camino."""
+        dist = {source: 0.0}
+        prev = {}
+        heap = [(0.0, source)]
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u == target:
+                break
+            if d > dist[u]:
+                continue
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                nd = d + weights[e]
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd, v))
+        if target is None or target not in dist:
+            return math.inf, []
+        path = [target]
+        while path[-1] != source:
+            path.append(prev[path[-1]])
+        return dist[target], path[::-1]
+
+
+# ---------- Generación y carga ----------
+def _knn_edges(coords: array, n: int, k: int) -> List[Tuple[int, int, float]]:
+    """k vecinos más cercanos por rejilla espacial; aristas en ambos sentidos."""
+    xs, ys = coords[0::2], coords[1::2]
+    x0, y0 = min(xs), min(ys)
+    span = max(max(xs) - x0, max(ys) - y0) or 1.0
+    side = max(1, int(math.sqrt(n / max(1, k))))
+    cell = span / side + 1e-12
+    grid = {}
+    for i in range(n):
+        grid.setdefault((int((xs[i] - x0) / cell), int((ys[i] - y0) / cell)), []).append(i)
+    pairs = set()
+    for i in range(n):
+        cx, cy = int((xs[i] - x0) / cell), int((ys[i] - y0) / cell)
+        ring = 1
+        while True:
+            cand = [j for dx in range(-ring, ring + 1) for dy in range(-ring, ring + 1)
+                    for j in grid.get((cx + dx, cy + dy), ()) if j != i]
+            if len(cand) >= k or ring > side:
+                break
+            ring += 1
+        xi, yi = xs[i], ys[i]
+        for _, j in heapq.nsmallest(k, ((math.hypot(xs[j] - xi, ys[j] - yi), j) for j in cand)):
+            pairs.add((i, j))
+            pairs.add((j, i))
+    return [(u, v, math.hypot(xs[u] - xs[v], ys[u] - ys[v])) for u, v in sorted(pairs)]
+
+
+def generate_geometric(n: int = 10000, k: int = 8, seed: Optional[int] = None) -> CSRGraph:
+    """Puntos uniformes en el cuadrado unidad unidos a sus k vecinos (pesos euclídeos)."""
+    rng = random.Random(seed)
+    coords = array("d", (rng.random() for _ in range(2 * n)))
+    return CSRGraph.from_edges(n, _knn_edges(coords, n, k), coords)
+
+
+def load_edges(path: str) -> CSRGraph:
+    """Lista de aristas dirigidas: una por línea 'u v [w]' (w=1 por defecto; # comenta)."""
+    edges = []
+    n = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split("#", 1)[0].split()
+            if len(parts) < 2:
+                continue
+            u, v = int(parts[0]), int(parts[1])
+            edges.append((u, v, float(parts[2]) if len(parts) > 2 else 1.0))
+            n = max(n, u + 1, v + 1)
+    return CSRGraph.from_edges(n, edges)
+
+
+def load_tsp(path: str, k: int = 8) -> CSRGraph:
+    """Instancia TSPLIB (NODE_COORD_SECTION) convertida en grafo de k vecinos."""
+    coords = array("d")
+    reading = False
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("NODE_COORD_SECTION"):
+                reading = True
+                continue
+            if not reading or not line or line == "EOF":
+                continue
+            _, x, y = line.split()[:3]
+            coords.extend((float(x), float(y)))
+    n = len(coords) // 2
+    return CSRGraph.from_edges(n, _knn_edges(coords, n, min(k, n - 1)), coords)
+
+
+# ---------- Entorno ----------
+class GraphEnv:
+    """
+    Camino mínimo source→target con API reset()/step():
+    la observación es el nodo actual, la recompensa −peso de la arista y
+    done al llegar al destino o quedarse sin vecinos.
+    """
+
+    def __init__(self, graph: CSRGraph, source: int = 0, target: Optional[int] = None):
+        self.graph = graph
+        self.source = source
+        self.target = graph.n - 1 if target is None else target
+        self.node = source
+
+    def reset(self, source: Optional[int] = None, target: Optional[int] = None) -> int:
+        if source is not None:
+            self.source = source
+        if target is not None:
+            self.target = target
+        self.node = self.source
+        return self.node
+
+    def step(self, nxt: int):
+        start, end = self.graph.neighbors(self.node)
+        for e in range(start, end):
+            if self.graph.indices[e] == nxt:
+                self.node = nxt
+                done = nxt == self.target or self.graph.indptr[nxt] == self.graph.indptr[nxt + 1]
+                return nxt, -self.graph.weights[e], done, {"reached": nxt == self.target}
+        raise ValueError(f"{nxt} no es vecino de {self.node}")
+
+
+class GraphColony:
+    """
+    Colonia de hormigas sobre GraphEnv puntuada por PheromoneTable:
+    estado = nodo actual, acción = vecino. Con coordenadas, η usa el coste
+    reducido de A* (peso + h(v) − h(u), h = distancia euclídea al destino):
+    ≈0 para saltos que avanzan en línea recta. Sin coordenadas, η = 1/peso.
+    """
+
+    def __init__(self, env: GraphEnv, ant: Optional[PheromoneTable] = None, max_steps: Optional[int] = None):
+        self.env = env
+        self.ant = ant or PheromoneTable(tau0=1.0, rho=0.1, alpha=1.0, beta=3.0, epsilon=0.0,
+                                         persist_in_memory=False, autosave=False)
+        self.max_steps = max_steps or env.graph.n
+        g = env.graph
+        self._names = [str(i) for i in range(g.n)]
+        self._eta = {}
+        self._eta_floor = 0.1 * sum(g.weights) / max(1, g.m)
+        self.best_length = math.inf
+        self.best_path: List[int] = []
+
+    def _heuristic(self, u: int) -> dict:
+        """η por vecino de u, cacheado por (nodo, destino): reset(target=...) no reutiliza η viejos."""
+        t = self.env.target
+        eta = self._eta.get((u, t))
+        if eta is None:
+            g = self.env.graph
+            start, end = g.neighbors(u)
+            hu = g.distance(u, t) if g.coords is not None else 0.0
+            eta = {}
+            for e in range(start, end):
+                v = g.indices[e]
+                hv = g.distance(v, t) if g.coords is not None else 0.0
+                eta[self._names[v]] = 1.0 / (max(0.0, g.weights[e] + hv - hu) + self._eta_floor)
+            self._eta[(u, t)] = eta
+        return eta
+
+    def construct(self) -> Tuple[float, List[int]]:
+        """Una hormiga: trayectoria sin repetir nodos; (inf, camino) si no llega."""
+        env, g, names = self.env, self.env.graph, self._names
+        node = env.reset()
+        path, length, visited = [node], 0.0, {node}
+        for _ in range(self.max_steps):
+            start, end = g.neighbors(node)
+            options = [names[g.indices[e]] for e in range(start, end) if g.indices[e] not in visited]
+            if not options:
+                return math.inf, path
+            nxt = int(self.ant.choose_action(names[node], options, self._heuristic(node)))
+            node, reward, done, info = env.step(nxt)
+            length -= reward
+            path.append(node)
+            visited.add(node)
+            if info["reached"]:
+                return length, path
+            if done:
+                return math.inf, path
+        return math.inf, path
+
+    def _deposit(self, path: List[int], length: float):
+        # Recompensa en (0, 10]: 10 para el mejor camino conocido
+        reward = 10.0 * self.best_length / length
+        names = self._names
+        self.ant.deposit([(names[u], names[v]) for u, v in zip(path, path[1:])], reward)
+
+    def iterate(self, n_ants: int = 20) -> dict:
+        """n_ants construyen caminos; refuerzan los que llegan y el mejor global; evapora."""
+        found = []
+        for _ in range(n_ants):
+            length, path = self.construct()
+            if length < math.inf:
+                found.append((length, path))
+                if length < self.best_length:
+                    self.best_length, self.best_path = length, path
+        for length, path in found:
+            self._deposit(path, length)
+        if self.best_path:
+            self._deposit(self.best_path, self.best_length)
+        self.ant.evaporate()
+        return {"arrived": len(found), "iteration_best": min((l for l, _ in found), default=math.inf),
+                "best": self.best_length}
+
+
+def benchmark(graph: CSRGraph, source: int = 0, target: Optional[int] = None, n_ants: int = 20,
+              iterations: int = 30, ant: Optional[PheromoneTable] = None) -> dict:
+    """Hormigas/s y calidad (mejor/óptimo) por iteración."""
+    env = GraphEnv(graph, source, target)
+    t0 = time.perf_counter()
+    optimum, opt_path = graph.dijkstra(env.source, env.target)
+    dijkstra_s = time.perf_counter() - t0
+    colony = GraphColony(env, ant)
+    history = []
+    started = time.perf_counter()
+    for it in range(1, iterations + 1):
+        res = colony.iterate(n_ants)
+        elapsed = time.perf_counter() - started
+        history.append({"iteration": it, "seconds": elapsed, "ants_per_s": it * n_ants / elapsed,
+                        "arrived": res["arrived"], "best": res["best"],
+                        "quality": optimum / res["best"] if res["best"] < math.inf else 0.0})
+    return {"nodes": graph.n, "edges": graph.m, "csr_bytes": graph.nbytes(), "optimum": optimum,
+            "optimal_hops": len(opt_path) - 1, "dijkstra_s": dijkstra_s, "history": history,
+            "best_path": colony.best_path}
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Entorno de grafo para colonia de hormigas")
+    parser.add_argument("cmd", choices=["bench"])
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--k", type=int, default=8, help="vecinos por nodo (grafos generados / TSP)")
+    parser.add_argument("--edges", help="archivo de aristas 'u v w'")
+    parser.add_argument("--tsp", help="archivo TSPLIB con NODE_COORD_SECTION")
+    parser.add_argument("--source", type=int, default=0)
+    parser.add_argument("--target", type=int)
+    parser.add_argument("--ants", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--beta", type=float, default=3.0)
+    parser.add_argument("--rho", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    t0 = time.perf_counter()
+    if args.edges:
+        graph = load_edges(args.edges)
+    elif args.tsp:
+        graph = load_tsp(args.tsp, args.k)
+    else:
+        graph = generate_geometric(args.nodes, args.k, args.seed)
+    build_s = time.perf_counter() - t0
+    ant = PheromoneTable(tau0=1.0, rho=args.rho, alpha=args.alpha, beta=args.beta, epsilon=0.0,
+                         persist_in_memory=False, autosave=False)
+    r = benchmark(graph, args.source, args.target, args.ants, args.iterations, ant)
+
+    print(f"[Graph] {r['nodes']} nodos, {r['edges']} aristas, CSR {r['csr_bytes'] / 1024:.0f} KB "
+          f"(construido en {build_s:.2f}s) | óptimo {r['optimum']:.4f} en {r['optimal_hops']} saltos "
+          f"(Dijkstra {r['dijkstra_s'] * 1000:.1f} ms)")
+    print(f"{'iter':>5} {'s':>8} {'hormigas/s':>11} {'llegan':>7} {'mejor':>10} {'calidad':>8}")
+    for h in r["history"]:
+        print(f"{h['iteration']:>5} {h['seconds']:>8.2f} {h['ants_per_s']:>11.1f} {h['arrived']:>7} "
+              f"{h['best']:>10.4f} {h['quality']:>8.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
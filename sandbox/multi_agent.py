@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+"""
+sandbox/multi_agent.py
+Sandbox multi-agente: muchas hormigas con nombre sobre recursos y τ compartidos.
+Autor: vlugoc
+Versión: 1.0
+Descripción:
+  - AgentRegistry: estado por agente en arrays paralelos (pasos, suma y
+    última recompensa, última acción): 25 B por agente más nombre e índice
+  - SharedResources: capacidad por recurso (cpu/disk/net); la recompensa
+    baja con la congestión, así que los agentes compiten y deben repartirse
+  - Hilos: una PheromoneTable compartida con lock, depositando en cada paso
+    ("lock") o en lotes por agente ("batched")
+  - Procesos: τ compartido en multiprocessing.Array (un double por acción)
+  - Benchmarks: contención del lock, throughput según nº de agentes y
+    memoria por agente (tracemalloc)
+Uso:
+  python sandbox/multi_agent.py run --agents 16 --steps 2000 --mode batched
+  python sandbox/multi_agent.py bench --max-agents 64
+"""
+
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from rich import print
+
+from core.memlock import MEMORY_LOCK
+from eco_ant.pheromones import PheromoneTable
+from sandbox.virtual_env import ACTION_REWARD_MEANS, POSSIBLE_ACTIONS, REWARD_NOISE, REWARD_RANGE
+
+MEM_PATH = Path.home() / "NeuraBoardEco" / "memory.json"
+
+STATE = "shared_sandbox"
+# Recurso que ocupa cada acción y penalización por congestión (carga/capacidad)
+ACTION_RESOURCES = {"analyze_data": "cpu", "optimize_energy": "cpu", "repair_node": "disk",
+                    "backup_memory": "net"}
+DEFAULT_CAPACITY = {"cpu": 4, "disk": 2, "net": 2}
+CONGESTION_PENALTY = 3.0
+
+
+class AgentRegistry:
+    """Estado compacto por agente: un índice entero y arrays paralelos."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.steps = array("q")
+        self.reward_sum = array("d")
+        self.last_reward = array("d")
+        self.last_action = array("b")
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def register(self, name: str) -> int:
+        with self._lock:
+            if name in self.index:
+                return self.index[name]
+            i = len(self.names)
+            self.names.append(name)
+            self.index[name] = i
+            self.steps.append(0)
+            self.reward_sum.append(0.0)
+            self.last_reward.append(0.0)
+            self.last_action.append(-1)
+            return i
+
+    def record(self, agent: int, action: int, reward: float):
+        # Cada agente solo escribe su propia posición: sin lock
+        self.steps[agent] += 1
+        self.reward_sum[agent] += reward
+        self.last_reward[agent] = reward
+        self.last_action[agent] = action
+
+    def merge_arrays(self, first: int, steps, reward_sum, last_reward, last_action):
+        """Incorpora los arrays devueltos por un proceso worker para agentes [first, first+len)."""
+        for j in range(len(steps)):
+            i = first + j
+            self.steps[i] += steps[j]
+            self.reward_sum[i] += reward_sum[j]
+            self.last_reward[i] = last_reward[j]
+            self.last_action[i] = last_action[j]
+
+    def to_dict(self) -> dict:
+        return {name: {"steps": self.steps[i],
+                       "avg_reward": self.reward_sum[i] / self.steps[i] if self.steps[i] else 0.0,
+                       "last_action": POSSIBLE_ACTIONS[self.last_action[i]] if self.last_action[i] >= 0 else None}
+                for i, name in enumerate(self.names)}
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.steps, self.reward_sum, self.last_reward, self.last_action))
+
+    def save_to_memory(self):
+        """Publica el resumen por agente en memory.json['agents']."""
+        with MEMORY_LOCK:
+            try:
+                data = json.loads(MEM_PATH.read_text(encoding="utf-8"))
+            except Exception:
+                data = {}
+            data["agents"] = self.to_dict()
+            MEM_PATH.parent.mkdir(parents=True, exist_ok=True)
+            MEM_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+class SharedResources:
+    """Ocupación en curso por recurso; la recompensa cae con carga/capacidad."""
+
+    def __init__(self, capacity: Optional[Dict[str, int]] = None, counts=None):
+        self.capacity = dict(capacity or DEFAULT_CAPACITY)
+        self.names = sorted(self.capacity)
+        # counts puede ser un multiprocessing.Array compartido entre procesos
+        self.counts = counts if counts is not None else array("l", [0] * len(self.names))
+        self._lock = counts.get_lock() if hasattr(counts, "get_lock") else threading.Lock()
+
+    def acquire(self, resource: str) -> float:
+        i = self.names.index(resource)
+        with self._lock:
+            self.counts[i] += 1
+            return self.counts[i] / self.capacity[resource]
+
+    def release(self, resource: str):
+        i = self.names.index(resource)
+        with self._lock:
+            self.counts[i] -= 1
+
+
+def act(resources: SharedResources, action: str, rng: random.Random, work: int = 0) -> float:
+    """Ejecuta una acción ocupando su recurso; recompensa = media + ruido − congestión."""
+    res = ACTION_RESOURCES[action]
+    load = resources.acquire(res)
+    try:
+        for _ in range(work):   # trabajo de CPU simulado mientras el recurso está ocupado
+            pass
+        lo, hi = REWARD_RANGE
+        penalty = CONGESTION_PENALTY * max(0.0, load - 1.0)
+        return min(hi, max(lo, ACTION_REWARD_MEANS[action] + rng.uniform(-REWARD_NOISE, REWARD_NOISE) - penalty))
+    finally:
+        resources.release(res)
+
+
+# ---------- Hilos ----------
+class ContendedLock:
+    """Lock que cuenta adquisiciones, esperas y tiempo bloqueado."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_s = 0.0
+
+    def __enter__(self):
+        if not self._lock.acquire(blocking=False):
+            t0 = time.perf_counter()
+            self._lock.acquire()
+            self.wait_s += time.perf_counter() - t0
+            self.contended += 1
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+        return False
+
+
+def _thread_agent(agent: int, steps: int, ant: PheromoneTable, lock: ContendedLock, resources: SharedResources,
+                  registry: AgentRegistry, mode: str, batch: int, seed: int, work: int):
+    rng = random.Random(seed)
+    action_ids = {a: i for i, a in enumerate(POSSIBLE_ACTIONS)}
+    pending = []
+    for _ in range(steps):
+        if mode == "lock":
+            with lock:
+                choice = ant.choose_action(STATE, POSSIBLE_ACTIONS)
+        else:
+            choice = ant.choose_action(STATE, POSSIBLE_ACTIONS)  # lectura sin lock
+        reward = act(resources, choice, rng, work)
+        registry.record(agent, action_ids[choice], reward)
+        if mode == "lock":
+            with lock:
+                ant.deposit([(STATE, choice)], reward)
+        else:
+            pending.append((choice, reward))
+            if len(pending) >= batch:
+                with lock:
+                    for c, r in pending:
+                        ant.deposit([(STATE, c)], r)
+                pending.clear()
+    if pending:
+        with lock:
+            for c, r in pending:
+                ant.deposit([(STATE, c)], r)
+
+
+def run_threads(n_agents: int, steps: int, mode: str = "batched", batch: int = 32,
+                ant: Optional[PheromoneTable] = None, registry: Optional[AgentRegistry] = None,
+                seed: int = 0, work: int = 0) -> dict:
+    """n_agents hilos sobre una PheromoneTable compartida."""
+    ant = ant or PheromoneTable(epsilon=0.05, persist_in_memory=False, autosave=False)
+    registry = registry or AgentRegistry()
+    resources = SharedResources()
+    lock = ContendedLock()
+    ids = [registry.register(f"ant-{i:04d}") for i in range(n_agents)]
+    threads = [threading.Thread(target=_thread_agent, name=f"agent-{i}",
+                                args=(ids[i], steps, ant, lock, resources, registry, mode, batch, seed + i, work))
+               for i in range(n_agents)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    total = n_agents * steps
+    return {"mode": f"threads/{mode}", "agents": n_agents, "steps": total, "seconds": elapsed,
+            "steps_per_s": total / elapsed if elapsed > 0 else None,
+            "lock_acquisitions": lock.acquisitions, "lock_contended": lock.contended,
+            "lock_wait_s": lock.wait_s, "tau": {a: ant.get_tau(STATE, a) for a in POSSIBLE_ACTIONS},
+            "registry": registry}
+
+
+# ---------- Procesos ----------
+def _process_agents(first: int, n: int, steps: int, shared_tau, counts, params: dict, batch: int,
+                    seed: int, work: int, results) -> None:
+    """Worker: n agentes en serie sobre τ compartido; envía arrays compactos de sus agentes."""
+    random.seed(seed)
+    rng = random.Random(seed)
+    ant = PheromoneTable(**params, persist_in_memory=False, autosave=False)
+    resources = SharedResources(counts=counts)
+    k = len(POSSIBLE_ACTIONS)
+    out_steps, out_sum = array("q", [0] * n), array("d", [0.0] * n)
+    out_last, out_action = array("d", [0.0] * n), array("b", [-1] * n)
+    for s in range(0, steps, batch):
+        for j in range(n):
+            with shared_tau.get_lock():
+                snapshot = shared_tau[:]
+            ant.table = {STATE: dict(zip(POSSIBLE_ACTIONS, snapshot))}
+            for _ in range(min(batch, steps - s)):
+                choice = ant.choose_action(STATE, POSSIBLE_ACTIONS)
+                reward = act(resources, choice, rng, work)
+                ant.deposit([(STATE, choice)], reward)
+                a = POSSIBLE_ACTIONS.index(choice)
+                out_steps[j] += 1
+                out_sum[j] += reward
+                out_last[j], out_action[j] = reward, a
+            # Publica el delta local sobre el τ compartido (otros procesos pudieron moverlo)
+            with shared_tau.get_lock():
+                for i in range(k):
+                    delta = ant.table[STATE][POSSIBLE_ACTIONS[i]] - snapshot[i]
+                    shared_tau[i] = min(ant.max_tau, max(ant.min_tau, shared_tau[i] + delta))
+    results.put((first, out_steps, out_sum, out_last, out_action))
+
+
+def run_processes(n_agents: int, steps: int, workers: Optional[int] = None, batch: int = 32,
+                  params: Optional[dict] = None, registry: Optional[AgentRegistry] = None,
+                  seed: int = 0, work: int = 0) -> dict:
+    """Agentes repartidos en procesos; τ y ocupación de recursos en memoria compartida."""
+    params = params or {"epsilon": 0.05}
+    workers = max(1, min(n_agents, workers or os.cpu_count() or 1))
+    registry = registry or AgentRegistry()
+    ids = [registry.register(f"ant-{i:04d}") for i in range(n_agents)]
+    tau0 = params.get("tau0", 0.1)
+    shared_tau = mp.Array("d", [tau0] * len(POSSIBLE_ACTIONS))
+    counts = mp.Array("l", [0] * len(DEFAULT_CAPACITY))
+    per = math.ceil(n_agents / workers)
+    chunks = [(ids[i], min(per, n_agents - i)) for i in range(0, n_agents, per)]
+    # Los objetos compartidos se heredan al crear el proceso (no se pueden enviar a un Pool)
+    results = mp.SimpleQueue()
+    procs = [mp.Process(target=_process_agents,
+                        args=(first, n, steps, shared_tau, counts, params, batch, seed + first, work, results))
+             for first, n in chunks]
+    started = time.perf_counter()
+    for p in procs:
+        p.start()
+    for _ in procs:
+        registry.merge_arrays(*results.get())
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - started
+    total = n_agents * steps
+    return {"mode": "processes", "agents": n_agents, "steps": total, "seconds": elapsed,
+            "steps_per_s": total / elapsed if elapsed > 0 else None, "workers": len(chunks),
+            "tau": dict(zip(POSSIBLE_ACTIONS, shared_tau[:])), "registry": registry}
+
+
+# ---------- Benchmarks ----------
+def memory_per_agent(n: int = 10000) -> dict:
+    """Bytes por agente del registro (tracemalloc) frente a un dict por agente."""
+    tracemalloc.start()
+    base = tracemalloc.take_snapshot()
+    reg = AgentRegistry()
+    for i in range(n):
+        reg.register(f"ant-{i:06d}")
+    compact = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(base, "filename"))
+    base = tracemalloc.take_snapshot()
+    dicts = {f"ant-{i:06d}": {"steps": 0, "reward_sum": 0.0, "last_reward": 0.0, "last_action": None}
+             for i in range(n)}
+    naive = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(base, "filename"))
+    tracemalloc.stop()
+    del reg, dicts
+    return {"agents": n, "registry_bytes_per_agent": compact / n, "dict_bytes_per_agent": naive / n}
+
+
+def benchmark(max_agents: int = 64, steps: int = 500, batch: int = 32, work: int = 200) -> List[dict]:
+    rows = []
+    n = 1
+    while n <= max_agents:
+        for mode in ("lock", "batched"):
+            r = run_threads(n, steps, mode, batch, work=work)
+            r.pop("registry")
+            rows.append(r)
+        r = run_processes(n, steps, batch=batch, work=work)
+        r.pop("registry")
+        rows.append(r)
+        n *= 2
+    return rows
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Sandbox multi-agente compartido")
+    parser.add_argument("cmd", choices=["run", "bench"])
+    parser.add_argument("--agents", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=1000, help="pasos por agente")
+    parser.add_argument("--mode", choices=["lock", "batched", "processes"], default="batched")
+    parser.add_argument("--batch", type=int, default=32, help="pasos entre depósitos (batched/processes)")
+    parser.add_argument("--work", type=int, default=200, help="iteraciones de CPU simulada por acción")
+    parser.add_argument("--max-agents", type=int, default=64)
+    parser.add_argument("--save", action="store_true", help="publicar el registro en memory.json['agents']")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "bench":
+        m = memory_per_agent()
+        print(f"[Agents] Memoria: {m['registry_bytes_per_agent']:.0f} B/agente en registro compacto "
+              f"vs {m['dict_bytes_per_agent']:.0f} B/agente con dicts ({m['agents']} agentes)")
+        print(f"{'modo':<18} {'agentes':>7} {'pasos/s':>10} {'locks':>8} {'esperas':>8} {'espera s':>9}")
+        for r in benchmark(args.max_agents, args.steps, args.batch, args.work):
+            print(f"{r['mode']:<18} {r['agents']:>7} {r['steps_per_s']:>10.0f} "
+                  f"{r.get('lock_acquisitions', '-'):>8} {r.get('lock_contended', '-'):>8} "
+                  f"{r.get('lock_wait_s', 0.0):>9.4f}")
+        return 0
+
+    if args.mode == "processes":
+        r = run_processes(args.agents, args.steps, batch=args.batch, work=args.work)
+    else:
+        r = run_threads(args.agents, args.steps, args.mode, args.batch, work=args.work)
+    reg = r["registry"]
+    print(f"[Agents] {r['mode']}: {r['agents']} agentes, {r['steps']} pasos en {r['seconds']:.2f}s "
+          f"→ {r['steps_per_s']:.0f} pasos/s")
+    if "lock_acquisitions" in r:
+        print(f"[Agents] Lock: {r['lock_acquisitions']} adquisiciones, {r['lock_contended']} con espera "
+              f"({r['lock_wait_s'] * 1000:.1f} ms)")
+    print("[Agents] τ: " + ", ".join(f"{a}={t:.3f}" for a, t in r["tau"].items()))
+    best = max(range(len(reg)), key=lambda i: reg.reward_sum[i] / max(1, reg.steps[i]))
+    print(f"[Agents] Registro: {len(reg)} agentes, {reg.nbytes()} B en arrays | mejor: {reg.names[best]} "
+          f"(r̄={reg.reward_sum[best] / max(1, reg.steps[best]):.2f})")
+    if args.save:
+        reg.save_to_memory()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
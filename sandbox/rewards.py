@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+sandbox/rewards.py
+Modelos de recompensa enchufables para VirtualEnv y VectorVirtualEnv.
+Autor: vlugoc
+Versión: 1.0
+Descripción:
+  - UniformReward: el comportamiento histórico, U(-2, 5) sin importar la acción
+  - PerActionReward: media por acción + ruido uniforme o normal (por defecto)
+  - DriftingReward: medias que derivan (paseo aleatorio) → entorno no estacionario
+  - DelayedReward: entrega la recompensa `delay` pasos después de la acción
+  - EmpiricalReward: bootstrap de recompensas reales del orquestador
+    (stream metrics.log) o de un archivo de episodios binario
+  Todos consumen ruido de un NoiseBuffer que se rellena en bloques (NumPy si
+  está disponible), así que el modelo no limita las simulaciones masivas.
+Uso:
+  python sandbox/rewards.py bench [--n 1000000]
+  python sandbox/rewards.py fit [--episodes archivo.ep] [--source orchestrator]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from rich import print
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: los búferes se rellenan en Python puro
+    np = None
+
+POSSIBLE_ACTIONS = ["analyze_data", "optimize_energy", "repair_node", "backup_memory"]
+REWARD_RANGE = (-2.0, 5.0)  # entre castigo y recompensa
+# Recompensa esperada por acción en step(): hay una acción mejor que aprender
+ACTION_REWARD_MEANS = {"analyze_data": 1.0, "optimize_energy": 2.5, "repair_node": 0.0, "backup_memory": 1.5}
+REWARD_NOISE = 2.0
+BLOCK = 4096
+
+
+class NoiseBuffer:
+    """Ruido pre-generado en bloques: U[0,1) ("uniform") o N(0,1) ("normal")."""
+
+    def __init__(self, kind: str = "uniform", seed=None, block: int = BLOCK, use_numpy=None):
+        if kind not in ("uniform", "normal"):
+            raise ValueError(f"Tipo de ruido desconocido: {kind}")
+        self.kind = kind
+        self.block = int(block)
+        self.use_numpy = np is not None and (use_numpy is None or use_numpy)
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        self._rng = np.random.default_rng(seed) if self.use_numpy else random.Random(seed)
+        self._buf: List[float] = []
+        self._i = 0
+
+    def _fill(self, n: int) -> List[float]:
+        if self.use_numpy:
+            z = self._rng.random(n) if self.kind == "uniform" else self._rng.standard_normal(n)
+            return z.tolist()
+        if self.kind == "uniform":
+            rnd = self._rng.random
+            return [rnd() for _ in range(n)]
+        gauss = self._rng.gauss
+        return [gauss(0.0, 1.0) for _ in range(n)]
+
+    def next(self) -> float:
+        i = self._i
+        if i >= len(self._buf):
+            self._buf = self._fill(self.block)
+            i = 0
+        self._i = i + 1
+        return self._buf[i]
+
+    def take(self, n: int) -> List[float]:
+        """n valores seguidos (lo que queda del bloque actual + relleno nuevo)."""
+        out = self._buf[self._i:self._i + n]
+        self._i += len(out)
+        if len(out) < n:
+            out += self._fill(n - len(out))
+        return out
+
+
+class RewardModel:
+    """
+    Interfaz común. `actions` = acciones que el modelo sabe puntuar
+    (None → POSSIBLE_ACTIONS). drain() devuelve lo pendiente al cerrar un
+    episodio (solo lo usa DelayedReward).
+    """
+
+    actions: Optional[List[str]] = None
+
+    def reset(self, seed=None):
+        pass
+
+    def expected(self, action: str) -> float:
+        raise NotImplementedError
+
+    def sample(self, action: str) -> float:
+        raise NotImplementedError
+
+    def sample_many(self, actions: Sequence[str]) -> List[float]:
+        sample = self.sample
+        return [sample(a) for a in actions]
+
+    def drain(self) -> float:
+        return 0.0
+
+
+class UniformReward(RewardModel):
+    """U(lo, hi) para cualquier acción (modelo histórico del sandbox)."""
+
+    def __init__(self, reward_range=REWARD_RANGE, seed=None, use_numpy=None):
+        self.lo, self.hi = reward_range
+        self._noise = NoiseBuffer("uniform", seed, use_numpy=use_numpy)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self._noise.seed(seed)
+
+    def expected(self, action: str) -> float:
+        return (self.lo + self.hi) / 2
+
+    def sample(self, action: str) -> float:
+        return self.lo + (self.hi - self.lo) * self._noise.next()
+
+    def sample_many(self, actions: Sequence[str]) -> List[float]:
+        lo, span = self.lo, self.hi - self.lo
+        return [lo + span * u for u in self._noise.take(len(actions))]
+
+
+class PerActionReward(RewardModel):
+    """
+    media[acción] + noise·z, acotada a `clip`. z ~ U(-1, 1) con dist="uniform"
+    (equivale al step() original) o N(0, 1) con dist="normal".
+    """
+
+    def __init__(self, means: Optional[Dict[str, float]] = None, noise: float = REWARD_NOISE,
+                 dist: str = "uniform", clip=REWARD_RANGE, seed=None, use_numpy=None):
+        self.means = dict(means or ACTION_REWARD_MEANS)
+        self.actions = list(self.means)
+        self.noise = float(noise)
+        self.dist = dist
+        self.lo, self.hi = clip
+        self._noise = NoiseBuffer(dist, seed, use_numpy=use_numpy)
+        # U[0,1) → U(-1,1): z = 2u - 1, resuelto en (scale, shift) una sola vez
+        self._scale = 2 * self.noise if dist == "uniform" else self.noise
+        self._shift = -self.noise if dist == "uniform" else 0.0
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self._noise.seed(seed)
+
+    def expected(self, action: str) -> float:
+        return self.means[action]
+
+    def sample(self, action: str) -> float:
+        r = self.means[action] + self._shift + self._scale * self._noise.next()
+        return self.lo if r < self.lo else self.hi if r > self.hi else r
+
+    def sample_many(self, actions: Sequence[str]) -> List[float]:
+        means, lo, hi = self.means, self.lo, self.hi
+        z = self._noise.take(len(actions))
+        if np is not None and self._noise.use_numpy:
+            mu = np.fromiter((means[a] for a in actions), float, len(actions))
+            return np.clip(mu + self._shift + self._scale * np.asarray(z), lo, hi).tolist()
+        scale, shift = self._scale, self._shift
+        out = [means[a] + shift + scale * u for a, u in zip(actions, z)]
+        return [lo if r < lo else hi if r > hi else r for r in out]
+
+
+class DriftingReward(PerActionReward):
+    """
+    PerActionReward cuyas medias hacen un paseo aleatorio N(0, sigma) cada
+    `every` muestras, con reversión opcional hacia la media inicial. Sin
+    semilla, reset() no restaura las medias: la deriva continúa entre episodios.
+    """
+
+    def __init__(self, means: Optional[Dict[str, float]] = None, sigma: float = 0.02, every: int = 1,
+                 reversion: float = 0.0, seed=None, **kwargs):
+        super().__init__(means, seed=seed, **kwargs)
+        self.base = dict(self.means)
+        self.sigma = float(sigma)
+        self.every = max(1, int(every))
+        self.reversion = float(reversion)
+        self._drift_noise = NoiseBuffer("normal", None if seed is None else seed + 1)
+        self._n = 0
+
+    def reset(self, seed=None):
+        if seed is not None:
+            super().reset(seed)
+            self._drift_noise.seed(seed + 1)
+            self.means = dict(self.base)
+            self._n = 0
+
+    def _drift(self):
+        lo, hi = self.lo, self.hi
+        for a, m in self.means.items():
+            m += self.sigma * self._drift_noise.next() + self.reversion * (self.base[a] - m)
+            self.means[a] = lo if m < lo else hi if m > hi else m
+
+    def sample(self, action: str) -> float:
+        self._n += 1
+        if self._n % self.every == 0:
+            self._drift()
+        return super().sample(action)
+
+    def sample_many(self, actions: Sequence[str]) -> List[float]:
+        # La deriva depende del orden: se aplica muestra a muestra
+        sample = self.sample
+        return [sample(a) for a in actions]
+
+
+class DelayedReward(RewardModel):
+    """Envuelve otro modelo y entrega cada recompensa `delay` pasos más tarde (0.0 mientras tanto)."""
+
+    def __init__(self, inner: RewardModel, delay: int = 1):
+        self.inner = inner
+        self.actions = inner.actions
+        self.delay = max(0, int(delay))
+        self._pending: deque = deque()
+
+    def reset(self, seed=None):
+        self.inner.reset(seed)
+        self._pending.clear()
+
+    def expected(self, action: str) -> float:
+        return self.inner.expected(action)
+
+    def sample(self, action: str) -> float:
+        self._pending.append(self.inner.sample(action))
+        return self._pending.popleft() if len(self._pending) > self.delay else 0.0
+
+    def sample_many(self, actions: Sequence[str]) -> List[float]:
+        pending = self._pending
+        pending.extend(self.inner.sample_many(actions))
+        out = [0.0] * len(actions)
+        ready = len(pending) - self.delay
+        start = len(actions) - max(0, ready)
+        for i in range(start, len(actions)):
+            out[i] = pending.popleft()
+        return out
+
+    def drain(self) -> float:
+        """Suma de lo no entregado (al terminar el episodio nada se pierde)."""
+        total = sum(self._pending)
+        self._pending.clear()
+        return total
+
+
+class EmpiricalReward(RewardModel):
+    """Bootstrap por acción sobre recompensas observadas (índices sorteados en bloque)."""
+
+    def __init__(self, samples: Dict[str, List[float]], seed=None, use_numpy=None):
+        self.samples = {a: list(v) for a, v in samples.items() if v}
+        if not self.samples:
+            raise ValueError("EmpiricalReward necesita al menos una recompensa observada")
+        self.actions = list(self.samples)
+        self._means = {a: sum(v) / len(v) for a, v in self.samples.items()}
+        self._noise = NoiseBuffer("uniform", seed, use_numpy=use_numpy)
+
+    @classmethod
+    def fit(cls, pairs, **kwargs) -> "EmpiricalReward":
+        """pairs: iterable de (acción, recompensa)."""
+        samples: Dict[str, List[float]] = {}
+        for action, reward in pairs:
+            samples.setdefault(action, []).append(float(reward))
+        return cls(samples, **kwargs)
+
+    @classmethod
+    def from_stream(cls, source: Optional[str] = "orchestrator", stream: Optional[Path] = None, **kwargs):
+        from sandbox.episodes import stream_cycles
+        return cls.fit(((a, r) for a, r, _ in stream_cycles(source, stream)), **kwargs)
+
+    @classmethod
+    def from_episodes(cls, path: Path, **kwargs):
+        from sandbox.episodes import read_actions, read_records
+        names = read_actions(path)
+        return cls.fit(((names[i], r) for _, r, i, _ in read_records(path)), **kwargs)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self._noise.seed(seed)
+
+    def expected(self, action: str) -> float:
+        return self._means[action]
+
+    def sample(self, action: str) -> float:
+        values = self.samples[action]
+        return values[int(self._noise.next() * len(values))]
+
+    def sample_many(self, actions: Sequence[str]) -> List[float]:
+        samples = self.samples
+        out = []
+        for a, u in zip(actions, self._noise.take(len(actions))):
+            values = samples[a]
+            out.append(values[int(u * len(values))])
+        return out
+
+    def describe(self) -> Dict[str, dict]:
+        return {a: {"n": len(v), "mean": self._means[a], "min": min(v), "max": max(v)}
+                for a, v in self.samples.items()}
+
+
+def make_model(spec: str = "per-action", seed=None) -> RewardModel:
+    """
+    Construye un modelo desde texto (CLI):
+      uniform | per-action | normal | drift[:sigma] | delayed:<pasos>[:<modelo>]
+      | history[:<archivo.ep>]  (sin archivo: stream del orquestador)
+    """
+    name, _, arg = spec.partition(":")
+    if name == "uniform":
+        return UniformReward(seed=seed)
+    if name == "per-action":
+        return PerActionReward(seed=seed)
+    if name == "normal":
+        return PerActionReward(dist="normal", seed=seed)
+    if name == "drift":
+        return DriftingReward(sigma=float(arg) if arg else 0.02, seed=seed)
+    if name == "delayed":
+        steps, _, inner = arg.partition(":")
+        return DelayedReward(make_model(inner or "per-action", seed), int(steps or 1))
+    if name == "history":
+        if arg:
+            return EmpiricalReward.from_episodes(Path(arg), seed=seed)
+        return EmpiricalReward.from_stream(seed=seed)
+    raise ValueError(f"Modelo de recompensa desconocido: {spec}")
+
+
+def benchmark(n: int = 1_000_000, seed: int = 0) -> List[dict]:
+    """Muestras/s de cada modelo (una a una y en bloque) frente a random.uniform por llamada."""
+    rng = random.Random(seed)
+    actions = [POSSIBLE_ACTIONS[i % len(POSSIBLE_ACTIONS)] for i in range(n)]
+    rows = []
+    t0 = time.perf_counter()
+    uniform = rng.uniform
+    for a in actions:
+        ACTION_REWARD_MEANS[a] + uniform(-REWARD_NOISE, REWARD_NOISE)
+    rows.append({"model": "random.uniform (base)", "mode": "sample", "per_s": n / (time.perf_counter() - t0)})
+    models = {
+        "uniform": UniformReward(seed=seed),
+        "per-action": PerActionReward(seed=seed),
+        "normal": PerActionReward(dist="normal", seed=seed),
+        "drift": DriftingReward(seed=seed, every=16),
+        "delayed:5": DelayedReward(PerActionReward(seed=seed), 5),
+    }
+    for name, model in models.items():
+        sample = model.sample
+        t0 = time.perf_counter()
+        for a in actions:
+            sample(a)
+        rows.append({"model": name, "mode": "sample", "per_s": n / (time.perf_counter() - t0)})
+        t0 = time.perf_counter()
+        model.sample_many(actions)
+        rows.append({"model": name, "mode": "sample_many", "per_s": n / (time.perf_counter() - t0)})
+    return rows
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Modelos de recompensa del sandbox")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("bench")
+    p.add_argument("--n", type=int, default=1_000_000)
+    p = sub.add_parser("fit")
+    p.add_argument("--episodes", type=Path, help="archivo de episodios (por defecto: stream)")
+    p.add_argument("--source", default="orchestrator", help="fuente en el stream ('' = todas)")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "bench":
+        print(f"[Rewards] {args.n} muestras por modelo (NumPy: {'sí' if np is not None else 'no'})")
+        for r in benchmark(args.n):
+            print(f"  {r['model']:<22} {r['mode']:<12} {r['per_s']:>12,.0f}/s")
+        return 0
+
+    if args.episodes:
+        model = EmpiricalReward.from_episodes(args.episodes)
+    else:
+        model = EmpiricalReward.from_stream(args.source or None)
+    for action, d in model.describe().items():
+        print(f"[Rewards] {action:<16} n={d['n']:<6} media={d['mean']:.3f} "
+              f"[{d['min']:.2f}, {d['max']:.2f}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
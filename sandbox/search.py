@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+sandbox/search.py
+Búsqueda de hiperparámetros de la colonia (τ0, ρ, α, β, ε) en el sandbox.
+Autor: vlugoc
+Versión: 1.0
+Descripción:
+  - random: N configuraciones al azar, todas con el presupuesto completo
+  - halving: successive halving; cada ronda evalúa a los supervivientes con
+    η× más episodios y descarta el (1 - 1/η) peor → las malas se cortan pronto
+  Cada configuración se evalúa con las mismas semillas (números aleatorios
+  comunes) en la granja de procesos de sandbox/farm.py. Los resultados se
+  agregan a logs/hpsearch.csv; con --apply la mejor configuración se escribe
+  (de forma atómica) en la clave "ant" de config/orchestrator.json, que el
+  orquestador ya carga al arrancar. Se avisa si las acciones del sandbox no
+  coinciden con las "actions" del orquestador.
+Uso:
+  python sandbox/search.py random --trials 64 --episodes 100 --seeds 4
+  python sandbox/search.py halving --trials 81 --min-episodes 10 --eta 3
+  python sandbox/search.py halving --reward history --apply
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from rich import print
+
+from sandbox.farm import PARAM_KEYS, run_farm
+from sandbox.rewards import POSSIBLE_ACTIONS, make_model
+
+ROOT = Path.home() / "NeuraBoardEco"
+RESULTS_PATH = ROOT / "logs" / "hpsearch.csv"
+CONFIG_PATH = ROOT / "config" / "orchestrator.json"
+
+# (mínimo, máximo, escala logarítmica)
+SPACE = {
+    "tau0": (0.01, 1.0, True),
+    "rho": (0.01, 0.5, True),
+    "alpha": (0.5, 3.0, False),
+    "beta": (0.5, 3.0, False),
+    "epsilon": (0.01, 0.3, True),
+}
+METRICS = ("mean_reward", "optimal_rate")
+COLUMNS = ["run", "method", "rung", "episodes", "trial", *PARAM_KEYS, "score", "mean_reward",
+           "optimal_rate", "converged", "seconds"]
+
+
+def sample_config(rng: random.Random, space: Dict[str, tuple] = SPACE) -> Dict[str, float]:
+    cfg = {}
+    for key, (lo, hi, log) in space.items():
+        x = math.exp(rng.uniform(math.log(lo), math.log(hi))) if log else rng.uniform(lo, hi)
+        cfg[key] = round(x, 4)
+    return cfg
+
+
+def evaluate(configs: List[Dict[str, float]], episodes: int, seeds: int = 4, cycles: int = 20,
+             reward: str = "per-action", metric: str = "mean_reward", workers: Optional[int] = None) -> List[dict]:
+    """Evalúa cada configuración con `seeds` semillas en paralelo; devuelve una fila por configuración."""
+    jobs = [{"seed": s, "cycles": cycles, "episodes": episodes, "reward": reward, **cfg, "trial": t}
+            for t, cfg in enumerate(configs) for s in range(seeds)]
+    started = time.perf_counter()
+    results = run_farm(jobs, workers)
+    elapsed = time.perf_counter() - started
+    rows = []
+    for t, cfg in enumerate(configs):
+        runs = results[t * seeds:(t + 1) * seeds]
+        row = {
+            "trial": t,
+            **cfg,
+            "episodes": episodes,
+            "mean_reward": sum(r["mean_reward"] for r in runs) / seeds,
+            "optimal_rate": sum(r["optimal_rate"] for r in runs) / seeds,
+            "converged": sum(r["converged_at"] is not None for r in runs),
+            "seconds": elapsed / len(configs),
+        }
+        row["score"] = row[metric]
+        rows.append(row)
+    return rows
+
+
+def random_search(trials: int = 32, episodes: int = 100, seed: Optional[int] = None, **kw) -> List[dict]:
+    rng = random.Random(seed)
+    rows = evaluate([sample_config(rng) for _ in range(trials)], episodes, **kw)
+    for r in rows:
+        r["rung"] = 0
+    return rows
+
+
+def successive_halving(trials: int = 27, min_episodes: int = 10, eta: int = 3, max_episodes: int = 270,
+                       seed: Optional[int] = None, **kw) -> List[dict]:
+    """
+    Ronda k: los supervivientes se evalúan con min_episodes·η^k episodios
+    (desde cero, con las mismas semillas) y pasa el mejor 1/η. Devuelve todas
+    las filas; las de la última ronda son las decisivas.
+    """
+    rng = random.Random(seed)
+    configs = [sample_config(rng) for _ in range(trials)]
+    ids = list(range(trials))
+    episodes = min_episodes
+    rows: List[dict] = []
+    rung = 0
+    while True:
+        out = evaluate([configs[i] for i in ids], episodes, **kw)
+        for i, r in zip(ids, out):
+            r["trial"], r["rung"] = i, rung
+        rows += out
+        print(f"[Search] Ronda {rung}: {len(ids)} configuraciones × {episodes} episodios | "
+              f"mejor {max(r['score'] for r in out):.3f}")
+        if len(ids) <= 1 or episodes >= max_episodes:
+            return rows
+        keep = max(1, len(ids) // eta)
+        ids = [r["trial"] for r in sorted(out, key=lambda r: r["score"], reverse=True)[:keep]]
+        episodes = min(max_episodes, episodes * eta)
+        rung += 1
+
+
+def best_of(rows: List[dict]) -> dict:
+    """Mejor fila de la ronda más alta (la que tuvo más presupuesto)."""
+    top = max(r["rung"] for r in rows)
+    return max((r for r in rows if r["rung"] == top), key=lambda r: r["score"])
+
+
+def save_results(rows: List[dict], method: str, path: Path = RESULTS_PATH) -> str:
+    """Agrega las filas a la tabla CSV; devuelve el id de la ejecución."""
+    run = time.strftime("%Y%m%d-%H%M%S")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    new = not path.exists()
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        if new:
+            writer.writeheader()
+        for r in rows:
+            writer.writerow({**{k: round(v, 4) if isinstance(v, float) else v for k, v in r.items()},
+                             "run": run, "method": method})
+    return run
+
+
+def sandbox_actions(reward: str = "per-action") -> List[str]:
+    """Acciones que ve el sandbox con ese modelo de recompensa (las que se buscan)."""
+    return list(make_model(reward).actions or POSSIBLE_ACTIONS)
+
+
+def action_mismatch(actions: List[str], path: Path = CONFIG_PATH) -> Optional[str]:
+    """Describe la diferencia entre `actions` y las "actions" efectivas del orquestador, o None."""
+    from core.orchestrator import load_config
+
+    target = load_config(path)["actions"]
+    if set(actions) == set(target):
+        return None
+    return (f"acciones buscadas {sorted(actions)} ≠ acciones del orquestador {sorted(target)}: "
+            "los parámetros se ajustaron a otro problema")
+
+
+def apply_best(best: dict, path: Path = CONFIG_PATH, actions: Optional[List[str]] = None) -> dict:
+    """
+    Fusiona los parámetros ganadores en la clave "ant" de la config del
+    orquestador (tmp + os.replace). Con `actions`, avisa si no son las del orquestador.
+    """
+    if actions is not None:
+        warning = action_mismatch(actions, path)
+        if warning:
+            print(f"[Search] ⚠️ {warning}")
+    cfg = {}
+    if path.exists():
+        cfg = json.loads(path.read_text(encoding="utf-8"))
+    cfg.setdefault("ant", {}).update({k: best[k] for k in PARAM_KEYS})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        tmp.write_text(json.dumps(cfg, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return cfg["ant"]
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros de la colonia en el sandbox")
+    parser.add_argument("method", choices=("random", "halving"))
+    parser.add_argument("--trials", type=int, default=27)
+    parser.add_argument("--episodes", type=int, default=100, help="episodios por prueba (random)")
+    parser.add_argument("--min-episodes", type=int, default=10, help="presupuesto de la primera ronda (halving)")
+    parser.add_argument("--max-episodes", type=int, default=270)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--seeds", type=int, default=4, help="semillas por configuración")
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--reward", default="per-action", help="modelo de recompensa (ver sandbox/rewards.py)")
+    parser.add_argument("--metric", choices=METRICS, default="mean_reward")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--apply", action="store_true", help="escribir la mejor config en orchestrator.json")
+    args = parser.parse_args(argv)
+
+    kw = {"seeds": args.seeds, "cycles": args.cycles, "reward": args.reward, "metric": args.metric,
+          "workers": args.workers}
+    started = time.perf_counter()
+    if args.method == "random":
+        rows = random_search(args.trials, args.episodes, args.seed, **kw)
+    else:
+        rows = successive_halving(args.trials, args.min_episodes, args.eta, args.max_episodes, args.seed, **kw)
+    elapsed = time.perf_counter() - started
+    episodes = sum(r["episodes"] for r in rows) * args.seeds
+    print(f"[Search] {len(rows)} evaluaciones ({episodes} episodios) en {elapsed:.2f}s")
+
+    top = max(r["rung"] for r in rows)
+    print(f"{'trial':>5} {'tau0':>7} {'rho':>7} {'alpha':>6} {'beta':>6} {'eps':>7} {'r̄':>7} {'óptima':>7} {'conv':>5}")
+    for r in sorted((r for r in rows if r["rung"] == top), key=lambda r: r["score"], reverse=True)[:10]:
+        print(f"{r['trial']:>5} {r['tau0']:>7g} {r['rho']:>7g} {r['alpha']:>6g} {r['beta']:>6g} "
+              f"{r['epsilon']:>7g} {r['mean_reward']:>7.3f} {r['optimal_rate']:>7.1%} {r['converged']:>5}")
+
+    run = save_results(rows, args.method)
+    best = best_of(rows)
+    print(f"[Search] Resultados → {RESULTS_PATH} (run {run})")
+    print("[Search] 🏆 Mejor: " + ", ".join(f"{k}={best[k]:g}" for k in PARAM_KEYS)
+          + f" | {args.metric}={best['score']:.3f}")
+    if args.apply:
+        apply_best(best, actions=sandbox_actions(args.reward))
+        print(f"[Search] ✅ Config escrita en {CONFIG_PATH} (clave 'ant')")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -6,11 +6,39 @@ Autor: vlugoc
 Versión: 1.0
 """
 
+import fcntl
 import random
 import time
 from rich import print
 from pathlib import Path
 from core.metrics import LearningMetrics
+from core.clock import get_clock
+from core.tracing import traced
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: VectorVirtualEnv tiene ruta en Python puro
+    np = None
+
+from sandbox.rewards import (  # noqa: F401 (re-exportados)
+    ACTION_REWARD_MEANS,
+    POSSIBLE_ACTIONS,
+    REWARD_NOISE,
+    REWARD_RANGE,
+    PerActionReward,
+    RewardModel,
+    UniformReward,
+)
+
+
+def open_log(path):
+    """
+    Abre un log en modo append con flock compartido: maintenance.trim_log_file
+    no recorta un archivo mientras alguien lo tenga así abierto.
+    """
+    fh = open(path, "a")
+    fcntl.flock(fh, fcntl.LOCK_SH)
+    return fh
 
 
 class VirtualEnv:
@@ -19,38 +47,229 @@ class VirtualEnv:
     Inspirado en colonias de hormigas, cada 'agente' explora, actúa y deja rastros.
     """
 
-    def __init__(self, name="Sandbox-AntColony", cycles=5):
+    state = "sandbox_cycle"
+
+    def __init__(self, name="Sandbox-AntColony", cycles=5, clock=None, step_delay=0.5, seed=None,
+                 metrics=None, recorder=None, reward_model: RewardModel = None):
         self.name = name
         self.cycles = cycles
-        self.metrics = LearningMetrics()
+        # Modelo de recompensa enchufable (sandbox/rewards.py). Sin modelo explícito
+        # se conservan los históricos: step() media por acción + ruido, run() U(-2, 5)
+        self.reward_model = reward_model or PerActionReward(seed=seed)
+        self.run_model = reward_model or UniformReward(seed=seed)
+        self.actions = list(self.reward_model.actions or POSSIBLE_ACTIONS)
+        self._known = set(self.actions)
+        self._t = 0
+        # Reloj inyectable: con SimulatedClock las esperas entre ciclos son instantáneas
+        self.clock = clock or get_clock()
+        self.step_delay = step_delay
+        self.metrics = metrics or LearningMetrics(source="sandbox")
         self.log_path = Path.home() / "NeuraBoardEco" / "logs" / "sandbox.log"
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log_fh = None
+        # EpisodeRecorder opcional (sandbox/episodes.py): registros binarios por paso
+        self.recorder = recorder
 
     def _simulate_task(self, step: int):
         """
         Simula una tarea aleatoria dentro del entorno.
         Retorna una 'recompensa' en función del resultado.
         """
-        possible_actions = ["analyze_data", "optimize_energy", "repair_node", "backup_memory"]
-        action = random.choice(possible_actions)
-        reward = random.uniform(-2, 5)  # entre castigo y recompensa
+        action = random.choice(self.actions)
+        reward = self.run_model.sample(action)
         stability = "🟢" if reward > 2 else "🟡" if reward > 0 else "🔴"
 
         print(f"[Sandbox] Ciclo {step}: acción '{action}' → recompensa {reward:.2f} {stability}")
         self._log_event(action, reward)
+        if self.recorder is not None:
+            self.recorder.record(action, reward, ts=self.clock.time())
 
         # guardar recompensa en métricas globales
-        self.metrics.register_cycle(reward)
+        self.metrics.register_cycle(reward, action=action)
+
+    # ---------- API estilo Gym ----------
+    def reset(self, seed=None):
+        """Inicia un episodio de `cycles` pasos y devuelve la observación (estado)."""
+        self.reward_model.reset(seed)
+        self._t = 0
+        return self.state
+
+    def expected(self, action) -> float:
+        """Recompensa esperada actual de `action` según el modelo."""
+        return self.reward_model.expected(action)
+
+    def step(self, action):
+        """
+        Aplica una acción sin E/S ni esperas: devuelve (obs, reward, done, info).
+        La recompensa la sortea el modelo; al cerrar el episodio se suma lo que
+        quede pendiente (recompensas diferidas).
+        """
+        if action not in self._known:
+            raise ValueError(f"Acción desconocida en el sandbox: {action}")
+        reward = self.reward_model.sample(action)
+        self._t += 1
+        done = self._t >= self.cycles
+        if done:
+            reward += self.reward_model.drain()
+        return self.state, reward, done, {"step": self._t, "expected": self.reward_model.expected(action)}
 
     def _log_event(self, action, reward):
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.log_path, "a") as f:
-            f.write(f"[{timestamp}] acción={action}, recompensa={reward:.2f}\n")
+        timestamp = self.clock.strftime("%Y-%m-%d %H:%M:%S")
+        line = f"[{timestamp}] acción={action}, recompensa={reward:.2f}\n"
+        if self._log_fh is not None:
+            self._log_fh.write(line)
+            return
+        with open_log(self.log_path) as f:
+            f.write(line)
 
+    @traced("VirtualEnv.run")
     def run(self):
         print(f"[Sandbox] 🚀 Iniciando entorno virtual: {self.name}")
-        for i in range(1, self.cycles + 1):
-            self._simulate_task(i)
-            time.sleep(0.5)
+        # Un solo open() por ejecución en lugar de uno por evento
+        with open_log(self.log_path) as self._log_fh:
+            for i in range(1, self.cycles + 1):
+                self._simulate_task(i)
+                self.clock.sleep(self.step_delay)
+        self._log_fh = None
+        if self.recorder is not None:
+            self.recorder.flush()
         print("[Sandbox] ✅ Simulación completada.")
         print(self.metrics.summary())
+
+
+class VectorVirtualEnv:
+    """
+    N instancias del sandbox avanzadas en una sola llamada.
+    Las acciones salen de un vector por paso, de una política (callable) o de
+    una PheromoneTable (distribución de choose_action sorteada en bloque); sin
+    política, uniformes. Las recompensas se sortean en bloque con el mismo
+    modelo que VirtualEnv (PerActionReward por defecto) y métricas, consola y
+    sandbox.log se actualizan una vez por lote, así que evaluar políticas a
+    gran escala queda limitado por CPU y no por E/S.
+    """
+
+    def __init__(self, n_envs=1024, name="Sandbox-Vector", seed=None, metrics=None, use_numpy=None,
+                 reward_model: RewardModel = None):
+        self.n_envs = int(n_envs)
+        self.name = name
+        self.use_numpy = np is not None and (use_numpy is None or use_numpy)
+        self.reward_model = reward_model or PerActionReward(seed=seed, use_numpy=self.use_numpy)
+        self.actions = list(self.reward_model.actions or POSSIBLE_ACTIONS)
+        self._index = {a: i for i, a in enumerate(self.actions)}
+        # Flujo aleatorio propio para las acciones: con la misma semilla que el ruido
+        # del modelo, la acción sorteada quedaría correlacionada con su recompensa
+        action_seed = None if seed is None else seed + 1
+        self._rng = np.random.default_rng(action_seed) if self.use_numpy else random.Random(action_seed)
+        # Sin autosave: una escritura de memory.json por lote, no por paso
+        self.metrics = metrics or LearningMetrics(source="sandbox", autosave=False)
+        self.log_path = Path.home() / "NeuraBoardEco" / "logs" / "sandbox.log"
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.steps = 0
+
+    def _draw(self, n, probs=None) -> list:
+        """n índices de acción: uniformes o según `probs`."""
+        k = len(self.actions)
+        if self.use_numpy:
+            return (self._rng.integers(0, k, n) if probs is None else self._rng.choice(k, n, p=probs)).tolist()
+        if probs is None:
+            rnd = self._rng.random
+            return [int(rnd() * k) for _ in range(n)]
+        return self._rng.choices(range(k), weights=probs, k=n)
+
+    def _to_indices(self, vector) -> list:
+        if len(vector) != self.n_envs:
+            raise ValueError(f"Se esperaban {self.n_envs} acciones por paso, llegaron {len(vector)}")
+        index, k = self._index, len(self.actions)
+        try:
+            idx = [a if isinstance(a, int) else index[a] for a in vector]
+        except KeyError as e:
+            raise ValueError(f"Acción desconocida en el sandbox: {e.args[0]}") from None
+        bad = next((i for i in idx if not 0 <= i < k), None)
+        if bad is not None:
+            raise ValueError(f"Índice de acción fuera de rango [0, {k}): {bad}")
+        return idx
+
+    def policy_actions(self, steps=1, actions=None, ant=None, state=None, heuristic=None) -> list:
+        """
+        Índices de acción para steps × n_envs transiciones:
+        - actions: vector fijo de n_envs acciones (nombres o índices) o
+          callable(paso) → vector; se evalúa una vez por paso
+        - ant: PheromoneTable; su distribución en `state` se sortea en bloque
+          (evaluación: la tabla no se modifica)
+        """
+        n = self.n_envs * int(steps)
+        if callable(actions):
+            idx = []
+            for t in range(int(steps)):
+                idx += self._to_indices(actions(self.steps + t))
+            return idx
+        if actions is not None:
+            return self._to_indices(actions) * int(steps)
+        if ant is not None:
+            probs = ant.action_probabilities(state or VirtualEnv.state, self.actions, heuristic)
+            return self._draw(n, probs)
+        return self._draw(n)
+
+    def sample(self, n, idx=None):
+        """Recompensas en bloque para n transiciones (acciones uniformes si no se dan)."""
+        idx = self._draw(n) if idx is None else idx
+        actions = self.actions
+        rewards = self.reward_model.sample_many([actions[i] for i in idx])
+        if self.use_numpy:
+            return np.asarray(idx), np.asarray(rewards)
+        return idx, rewards
+
+    def _aggregate(self, idx, rewards) -> list:
+        """[(n, suma)] por acción."""
+        k = len(self.actions)
+        if self.use_numpy:
+            counts = np.bincount(idx, minlength=k)
+            sums = np.bincount(idx, weights=rewards, minlength=k)
+            return list(zip(counts.tolist(), sums.tolist()))
+        acc = [[0, 0.0] for _ in range(k)]
+        for i, r in zip(idx, rewards):
+            a = acc[i]
+            a[0] += 1
+            a[1] += r
+        return [tuple(a) for a in acc]
+
+    @traced("VectorVirtualEnv.run")
+    def run(self, steps=1, persist=True, actions=None, ant=None, state=None, heuristic=None) -> dict:
+        """
+        Avanza `steps` pasos de las N instancias con la política dada (ver
+        policy_actions) y devuelve el resumen del lote.
+        """
+        started = time.perf_counter()
+        n = self.n_envs * int(steps)
+        if n <= 0:
+            # Nada que avanzar: sin transiciones no hay min/max ni escrituras
+            return {"n_envs": self.n_envs, "steps": max(0, int(steps)), "transitions": 0, "mean": None,
+                    "min": None, "max": None, "by_action": {a: {"n": 0, "mean": 0.0} for a in self.actions},
+                    "seconds": 0.0, "transitions_per_s": None}
+        idx, rewards = self.sample(n, self.policy_actions(steps, actions, ant, state, heuristic))
+        per_action = self._aggregate(idx, rewards)
+        if self.use_numpy:
+            lo, hi, mean = float(rewards.min()), float(rewards.max()), float(rewards.mean())
+            labels = np.asarray(self.actions)[idx].tolist()
+            rewards = rewards.tolist()
+        else:
+            lo, hi, mean = min(rewards), max(rewards), sum(rewards) / n
+            labels = [self.actions[i] for i in idx]
+        self.steps += int(steps)
+        self.metrics.register_batch(rewards, actions=labels)
+        if persist:
+            self.metrics.flush()
+        elapsed = time.perf_counter() - started
+
+        by_action = {a: {"n": c, "mean": (t / c if c else 0.0)} for a, (c, t) in zip(self.actions, per_action)}
+        summary = {"n_envs": self.n_envs, "steps": int(steps), "transitions": n, "mean": mean,
+                   "min": lo, "max": hi, "by_action": by_action, "seconds": elapsed,
+                   "transitions_per_s": n / elapsed if elapsed > 0 else None}
+        detail = ", ".join(f"{a}={v['mean']:.2f}({v['n']})" for a, v in by_action.items())
+        timestamp = get_clock().strftime("%Y-%m-%d %H:%M:%S")
+        with open_log(self.log_path) as f:
+            f.write(f"[{timestamp}] lote {self.n_envs}x{steps}: media={mean:.2f}, "
+                    f"min={lo:.2f}, max={hi:.2f} | {detail}\n")
+        print(f"[Sandbox] ⚡ {self.name}: {n} transiciones en {elapsed:.3f}s "
+              f"({summary['transitions_per_s'] or 0:.0f}/s) | media {mean:.2f} [{lo:.2f}, {hi:.2f}]")
+        return summary
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+tests/conftest.py
+Aislamiento de las pruebas: HOME temporal y raíz del repo en sys.path.
+Autor: vlugoc
+Versión: 1.0
+Descripción:
+  Los módulos fijan sus rutas (~/NeuraBoardEco/...) al importarse, así que
+  HOME se redirige aquí, antes de que ninguna prueba importe core/ o sandbox/.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="neuraboard-tests-")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Ida y vuelta backup → restore del almacén CDC, prune y limpieza de .tmp."""
+
+import os
+
+import pytest
+
+from core.backup_store import BackupStore, chunk_boundaries
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    (root / "sub").mkdir(parents=True)
+    (root / "memory.json").write_bytes(os.urandom(300_000))
+    (root / "sub" / "notes.txt").write_text("hola\n" * 1000, encoding="utf-8")
+    (root / "logs").mkdir()
+    (root / "logs" / "skip.log").write_text("no se respalda", encoding="utf-8")
+    return root
+
+
+def snapshot(root):
+    return {p.relative_to(root).as_posix(): p.read_bytes()
+            for p in root.rglob("*") if p.is_file() and "logs" not in p.parts}
+
+
+def test_chunks_cover_input():
+    data = os.urandom(200_000)
+    cuts = list(chunk_boundaries(data))
+    assert cuts[0][0] == 0 and cuts[-1][1] == len(data)
+    assert all(a == prev_b for (a, _), (_, prev_b) in zip(cuts[1:], cuts))
+
+
+def test_backup_restore_roundtrip(tree, tmp_path):
+    store = BackupStore(tree, tmp_path / "backups")
+    manifest = store.backup()
+    assert manifest["stats"]["files"] == 2
+    out = tmp_path / "out"
+    assert store.restore(manifest["id"], out) == 2
+    assert snapshot(out) == snapshot(tree)
+    assert store.verify() == []
+
+
+def test_incremental_reuses_unchanged_files(tree, tmp_path):
+    store = BackupStore(tree, tmp_path / "backups")
+    store.backup()
+    assert store.pending_bytes() == 0
+    (tree / "sub" / "notes.txt").write_text("cambio\n", encoding="utf-8")
+    second = store.backup()
+    assert second["stats"]["reused_files"] == 1
+    out = tmp_path / "out"
+    store.restore(second["id"], out)
+    assert snapshot(out) == snapshot(tree)
+
+
+def test_prune_keeps_live_chunks_and_removes_tmp(tree, tmp_path):
+    store = BackupStore(tree, tmp_path / "backups")
+    store.backup()
+    (tree / "memory.json").write_bytes(os.urandom(50_000))
+    last = store.backup()
+    stale = store.chunks_dir / "00" / "abandonado.tmp"
+    stale.parent.mkdir(parents=True, exist_ok=True)
+    stale.write_bytes(b"x")
+    removed, freed = store.prune(keep=1)
+    assert removed == 1 and freed > 0
+    assert not stale.exists()
+    assert store.verify(last["id"]) == []
+
+
+def test_busy_store_does_not_block(tree, tmp_path):
+    store = BackupStore(tree, tmp_path / "backups")
+    with store._locked():
+        with pytest.raises(BlockingIOError):
+            store.backup(blocking=False)
+
+
+def test_many_backups_in_one_second_stay_ordered(tree, tmp_path, monkeypatch):
+    from core import backup_store
+
+    store = BackupStore(tree, tmp_path / "backups")
+    monkeypatch.setattr(backup_store.time, "strftime", lambda fmt, *a: "20250101_000000")
+    ids = []
+    for i in range(12):
+        (tree / "sub" / "notes.txt").write_text(f"versión {i}\n", encoding="utf-8")
+        ids.append(store.backup()["id"])
+    monkeypatch.undo()
+    assert ids[1] == "20250101_000000_2" and ids[-1] == "20250101_000000_12"
+    assert store.list_manifests() == ids
+    store.prune(keep=3)
+    assert store.list_manifests() == ids[-3:]
+    out = tmp_path / "out"
+    store.restore(ids[-1], out)
+    assert (out / "sub" / "notes.txt").read_text(encoding="utf-8") == "versión 11\n"
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Ida y vuelta de la grabación binaria de episodios."""
+
+import pytest
+
+from sandbox.episodes import RECORD, EpisodeRecorder, read_actions, read_records
+
+
+def test_record_read_roundtrip(tmp_path):
+    path = tmp_path / "ep.bin"
+    rows = [("backup", 1.5, 0, 10.0), ("analyze", -0.25, 1, 11.0), ("backup", 3.0, 2, 12.5)]
+    with EpisodeRecorder(path, actions=["analyze"]) as rec:
+        for action, reward, agent, ts in rows:
+            rec.record(action, reward, agent=agent, ts=ts)
+    actions = read_actions(path)
+    assert actions == ["analyze", "backup"]
+    got = [(actions[a], r, agent, ts) for ts, r, a, agent in read_records(path)]
+    assert got == [(a, pytest.approx(r), agent, ts) for a, r, agent, ts in rows]
+
+
+def test_append_keeps_action_ids_and_ignores_truncated_tail(tmp_path):
+    path = tmp_path / "ep.bin"
+    with EpisodeRecorder(path) as rec:
+        rec.record("a", 1.0, ts=1.0)
+    with EpisodeRecorder(path) as rec:
+        rec.record("b", 2.0, ts=2.0)
+        rec.record("a", 3.0, ts=3.0)
+    with open(path, "ab") as f:
+        f.write(b"\x00" * (RECORD.size - 1))
+    records = list(read_records(path))
+    assert [(ts, a) for ts, _, a, _ in records] == [(1.0, 0), (2.0, 1), (3.0, 0)]
+    assert read_actions(path) == ["a", "b"]
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "otro.bin"
+    path.write_bytes(b"no es un episodio")
+    with pytest.raises(ValueError):
+        read_records(path)
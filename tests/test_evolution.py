@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""Guardado y carga de Population (array('f') + sidecar)."""
+
+import random
+
+import pytest
+
+from sandbox.evolution import Population, crossover, mutate
+from sandbox.farm import PARAM_KEYS
+from sandbox.search import SPACE
+
+STATES = ["s0", "s1"]
+ACTIONS = ["a", "b", "c"]
+
+
+def test_save_load_roundtrip(tmp_path):
+    pop = Population.random(5, STATES, ACTIONS, random.Random(1))
+    pop.set(2, pop.params(2), {"s1": {"b": 0.75}})
+    path = tmp_path / "pop.bin"
+    pop.save(path)
+    loaded = Population.load(path)
+    assert (loaded.states, loaded.actions, loaded.size) == (STATES, ACTIONS, 5)
+    assert loaded.data == pop.data
+    assert loaded.params(2) == pop.params(2)
+    assert loaded.table(2)["s1"]["b"] == pytest.approx(0.75)
+    assert loaded.table(2)["s0"]["a"] == pytest.approx(pop.params(2)["tau0"])
+
+
+def test_mutation_and_crossover_stay_in_bounds():
+    rng = random.Random(5)
+    pop = Population.random(2, STATES, ACTIONS, rng)
+    child = crossover(pop.row(0), pop.row(1), len(ACTIONS), rng)
+    for _ in range(50):
+        mutate(child, rng, sigma=1.0, tau_sigma=1.0, rate=1.0)
+    for j, key in enumerate(PARAM_KEYS):
+        lo, hi, _ = SPACE[key]
+        assert lo - 1e-6 <= child[j] <= hi + 1e-6
+    assert len(child) == pop.width
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Normalización de recompensas de mantenimiento contra la línea base móvil."""
+
+import pytest
+
+from core.maintenance import MAX_REWARD, NEUTRAL_REWARD, RewardBaseline
+
+
+def test_steady_state_stays_neutral():
+    base = RewardBaseline()
+    assert [base.normalize(0.0) for _ in range(50)] == [NEUTRAL_REWARD] * 50
+
+
+def test_improvement_above_baseline_pays_more():
+    base = RewardBaseline()
+    assert base.normalize(4.0) == pytest.approx(5 * NEUTRAL_REWARD)
+    assert base.normalize(0.0) < NEUTRAL_REWARD
+    for _ in range(200):
+        base.normalize(0.0)
+    assert base.normalize(0.0) == pytest.approx(NEUTRAL_REWARD, abs=1e-3)
+
+
+def test_reward_is_capped():
+    assert RewardBaseline().normalize(1e6) == MAX_REWARD
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Rotación de MetricEventStream y lectura incremental con StreamFollower."""
+
+from core.metric_stream import MetricEventStream, StreamFollower
+
+
+def test_rotation_keeps_backup_count(tmp_path):
+    path = tmp_path / "metrics.log"
+    stream = MetricEventStream(path, max_bytes=500, backup_count=2)
+    for i in range(200):
+        stream.emit({"type": "cycle", "i": i})
+    stream.close()
+    assert path.with_name("metrics.log.1").exists()
+    assert path.with_name("metrics.log.2").exists()
+    assert not path.with_name("metrics.log.3").exists()
+
+
+def test_follower_survives_rotation(tmp_path):
+    path = tmp_path / "metrics.log"
+    stream = MetricEventStream(path, max_bytes=400, backup_count=3)
+    follower = StreamFollower(path, from_start=True)
+    seen = []
+    for i in range(60):
+        stream.emit({"type": "cycle", "i": i})
+        if i % 5 == 4:
+            seen += follower.poll()
+    stream.close()
+    seen += follower.poll()
+    assert [ev["i"] for ev in seen] == list(range(60))
+
+
+def test_follower_starts_at_end(tmp_path):
+    path = tmp_path / "metrics.log"
+    stream = MetricEventStream(path)
+    stream.emit({"type": "cycle", "i": 0})
+    follower = StreamFollower(path)
+    stream.emit({"type": "cycle", "i": 1})
+    stream.close()
+    assert [ev["i"] for ev in follower.poll()] == [1]
+
+
+def test_writer_reopens_after_foreign_rotation(tmp_path):
+    path = tmp_path / "metrics.log"
+    a = MetricEventStream(path, max_bytes=200, backup_count=5)
+    b = MetricEventStream(path, max_bytes=200, backup_count=5)
+    b.emit({"type": "cycle", "w": "b", "i": 0})
+    while not path.with_name("metrics.log.1").exists():
+        a.emit({"type": "cycle", "w": "a"})
+    b.emit({"type": "cycle", "w": "b", "i": 1})
+    a.close()
+    b.close()
+    # El escritor b detecta el inodo nuevo y no escribe en el archivo ya rotado
+    assert b'"w":"b","i":1' in path.read_bytes()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Precisión de cuantiles y fusión de RewardSketch."""
+
+import math
+import random
+
+import pytest
+
+from core.metrics import RewardSketch
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+@pytest.mark.parametrize("dist", ["uniform", "lognormal", "signed"])
+def test_quantiles_within_relative_accuracy(dist):
+    rng = random.Random(7)
+    gen = {
+        "uniform": lambda: rng.uniform(0.1, 10.0),
+        "lognormal": lambda: rng.lognormvariate(0.0, 1.5),
+        "signed": lambda: rng.uniform(-5.0, 5.0),
+    }[dist]
+    values = [gen() for _ in range(20_000)]
+    sk = RewardSketch(relative_accuracy=0.01)
+    for v in values:
+        sk.add(v)
+    assert sk.count == len(values)
+    for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+        expected = exact_quantile(values, q)
+        got = sk.quantile(q)
+        assert abs(got - expected) <= 0.011 * abs(expected) + 1e-6, (q, got, expected)
+
+
+def test_merge_equals_sketch_of_union():
+    rng = random.Random(3)
+    a_vals = [rng.gauss(2.0, 1.0) for _ in range(5_000)]
+    b_vals = [rng.gauss(-1.0, 3.0) for _ in range(5_000)]
+    a, b, union = RewardSketch(), RewardSketch(), RewardSketch()
+    for v in a_vals:
+        a.add(v)
+        union.add(v)
+    for v in b_vals:
+        b.add(v)
+        union.add(v)
+    a.merge(b)
+    assert a.count == union.count
+    assert a.min == union.min and a.max == union.max
+    assert a.total == pytest.approx(union.total)
+    for q in (0.05, 0.5, 0.95):
+        assert a.quantile(q) == pytest.approx(union.quantile(q))
+
+
+def test_roundtrip_dict():
+    sk = RewardSketch()
+    for v in (0.0, 1.5, -2.0, 3.25):
+        sk.add(v)
+    clone = RewardSketch.from_dict(sk.to_dict())
+    assert clone.count == sk.count
+    assert clone.quantile(0.5) == pytest.approx(sk.quantile(0.5))
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""Argumentos de línea de comandos del monitor."""
+
+import pytest
+
+from core import metrics_visual
+
+
+@pytest.mark.parametrize("argv", [["--refresh"], ["--refresh", "x"], ["--refresh", "0"],
+                                  ["--rollup", "x"], ["--replay", "--rollup"]])
+def test_invalid_arguments_exit_with_usage(argv):
+    with pytest.raises(SystemExit) as exc:
+        metrics_visual.main(argv)
+    assert exc.value.code == 2
+
+
+def test_modes_dispatch(monkeypatch):
+    calls = []
+    monkeypatch.setattr(metrics_visual, "visualize_learning", lambda r: calls.append(("live", r)))
+    monkeypatch.setattr(metrics_visual, "show_rollup", lambda h: calls.append(("rollup", h)))
+    monkeypatch.setattr(metrics_visual, "replay", lambda p, b: calls.append(("replay", p, b)))
+    metrics_visual.main(["--refresh", "0.1"])
+    metrics_visual.main(["--rollup"])
+    metrics_visual.main(["--replay", "--buckets", "8"])
+    assert calls == [("live", 0.1), ("rollup", 24.0), ("replay", None, 8)]
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Overrides de CLI en el daemon y corte de lotes por señal."""
+
+import argparse
+import threading
+
+from core import orchestrator
+
+
+class _Stub:
+    autosave = True
+
+    def flush(self):
+        pass
+
+    def summary(self):
+        return ""
+
+    def run(self):
+        pass
+
+
+def test_cli_overrides_survive_reload(tmp_path):
+    args = argparse.Namespace(
+        interval=2.5, cycles=7, duration=0.0, batch_size=3)
+    overrides = orchestrator.cli_overrides(args)
+    assert overrides == {"interval": 2.5, "batch_cycles": 7, "batch_size": 3}
+    path = tmp_path / "orchestrator.json"
+    path.write_text('{"interval": 99, "batch_size": 500}', encoding="utf-8")
+    cfg = orchestrator.load_config(path)
+    cfg.update(overrides)
+    assert cfg["interval"] == 2.5 and cfg["batch_cycles"] == 7 and cfg["batch_size"] == 3
+
+
+def test_run_batch_stops_mid_batch(monkeypatch):
+    stop = threading.Event()
+    calls = []
+
+    def fake_step(ant, metrics, cfg):
+        calls.append(1)
+        if len(calls) == 3:
+            stop.set()
+
+    monkeypatch.setattr(orchestrator, "step", fake_step)
+    stub = _Stub()
+    done = orchestrator.run_batch(stub, stub, stub, {}, cycles=100, batch_size=50, stop=stop)
+    assert done == 3
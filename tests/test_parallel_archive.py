@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""El .tgz del archivador paralelo es gzip/tar estándar."""
+
+import gzip
+import io
+import json
+import os
+import tarfile
+
+import pytest
+
+from core.parallel_archive import ParallelGzipWriter, create_archive
+
+
+def test_members_concatenate_to_valid_gzip(tmp_path):
+    data = os.urandom(100_000) + b"texto repetido " * 50_000
+    path = tmp_path / "out.gz"
+    with open(path, "wb") as raw:
+        writer = ParallelGzipWriter(raw, level=6, workers=3, block_size=64 * 1024)
+        writer.write(data)
+        writer.close()
+    with gzip.open(path, "rb") as f:
+        assert f.read() == data
+    assert writer.bytes_in == len(data)
+    assert writer.bytes_out == path.stat().st_size
+
+
+def test_archive_contents(tmp_path):
+    root = tmp_path / "root"
+    (root / "sub").mkdir(parents=True)
+    (root / "memory.json").write_text(json.dumps({"logs": [1, 2, 3]}), encoding="utf-8")
+    (root / "sub" / "a.txt").write_text("a" * 10_000, encoding="utf-8")
+    (root / "backups").mkdir()
+    res = create_archive(root / "backups" / "b.tgz", root, workers=2)
+    assert not (root / "backups" / "b.tgz.tmp").exists()
+    with tarfile.open(res["path"], "r:gz") as tar:
+        names = set(tar.getnames())
+        assert {"./memory.json", "./sub/a.txt"} <= names
+        assert not any(n.startswith("./backups/") for n in names)
+        assert json.load(tar.extractfile("./memory.json")) == {"logs": [1, 2, 3]}
+    with gzip.open(res["path"], "rb") as f:
+        tarfile.open(fileobj=io.BytesIO(f.read())).close()
+
+
+def test_failed_archive_removes_tmp(tmp_path):
+    dest = tmp_path / "b.tgz"
+    with pytest.raises(OSError):
+        create_archive(dest, tmp_path / "no-existe", workers=1)
+    assert not dest.exists()
+    assert not dest.with_name("b.tgz.tmp").exists()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Semántica de PheromoneTable.prune."""
+
+import pytest
+
+from eco_ant.pheromones import PheromoneTable
+
+
+def make_table(**kw):
+    return PheromoneTable(persist_in_memory=False, autosave=False, **kw)
+
+
+def test_prune_drops_only_tau0_entries():
+    ant = make_table(tau0=0.1)
+    ant.set_tau("s", "neutral", 0.1)
+    ant.set_tau("s", "learned", 0.7)
+    ant.set_tau("empty", "neutral", 0.1)
+    assert ant.prune() == 2
+    assert ant.table == {"s": {"learned": 0.7}}
+
+
+def test_prune_keeps_evaporated_entries():
+    ant = make_table(tau0=0.1, rho=0.5, min_tau=1e-6)
+    ant.set_tau("s", "bad", 0.1)
+    for _ in range(60):
+        ant.evaporate()
+    assert ant.get_tau("s", "bad") == pytest.approx(1e-6)
+    assert ant.prune() == 0
+    assert ant.get_tau("s", "bad") == pytest.approx(1e-6)
+
+
+def test_prune_preserves_action_probabilities():
+    ant = make_table(tau0=0.1, epsilon=0.1)
+    actions = ["a", "b", "c"]
+    ant.set_tau("s", "a", 0.1)
+    ant.set_tau("s", "b", 0.4)
+    ant.set_tau("s", "c", 1e-6)
+    before = ant.action_probabilities("s", actions)
+    ant.prune()
+    assert ant.action_probabilities("s", actions) == pytest.approx(before)
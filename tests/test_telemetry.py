@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Exposición en formato de texto Prometheus 0.0.4."""
+
+import pytest
+
+from core import telemetry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(telemetry, "REGISTRY", [])
+    return telemetry.REGISTRY
+
+
+def test_counter_type_matches_samples(registry):
+    c = telemetry.Counter("t_requests_total", "Peticiones.", ("source",))
+    c.inc(source="wikipedia")
+    c.inc(2, source="wikipedia")
+    lines = telemetry.render_metrics().splitlines()
+    assert "# TYPE t_requests_total counter" in lines
+    assert 't_requests_total{source="wikipedia"} 3' in lines
+
+
+def test_non_finite_values_render(registry):
+    g = telemetry.Gauge("t_gauge", "Valor.", ("k",))
+    g.set(float("inf"), k="a")
+    g.set(float("-inf"), k="b")
+    g.set(float("nan"), k="c")
+    g.set(0.25, k="d")
+    lines = telemetry.render_metrics().splitlines()
+    assert lines[2:] == ['t_gauge{k="a"} +Inf', 't_gauge{k="b"} -Inf', 't_gauge{k="c"} NaN', 't_gauge{k="d"} 0.25']
+
+
+def test_metric_base_is_abstract():
+    with pytest.raises(TypeError):
+        telemetry._Metric("t_x", "x")
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Anidamiento de spans entre hilos y volcado concurrente del buffer."""
+
+import contextvars
+import json
+import threading
+
+from core import tracing
+
+
+def _child():
+    with tracing.span("io"):
+        pass
+
+
+def _records(path):
+    tracing.flush()
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_worker_thread_keeps_parent(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_path", tracing._path)
+    tracing.enable(tmp_path / "trace.jsonl")
+    try:
+        with tracing.span("cycle") as parent:
+            ctx = contextvars.copy_context()
+            t = threading.Thread(target=ctx.run, args=(_child,))
+            t.start()
+            t.join()
+        recs = {r["name"]: r for r in _records(tmp_path / "trace.jsonl")}
+    finally:
+        tracing.disable()
+    assert recs["io"]["parent"] == parent.id
+    assert recs["io"]["root"] == parent.id
+    assert recs["cycle"]["parent"] is None
+
+
+def test_concurrent_spans_are_not_lost(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_path", tracing._path)
+    monkeypatch.setattr(tracing, "FLUSH_EVERY", 7)
+    tracing.enable(tmp_path / "trace.jsonl")
+
+    def work():
+        for _ in range(500):
+            with tracing.span("w"):
+                pass
+
+    try:
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        recs = _records(tmp_path / "trace.jsonl")
+    finally:
+        tracing.disable()
+    assert len(recs) == 8 * 500
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Modelos de recompensa por defecto del sandbox y validación del lote vectorial."""
+
+import pytest
+
+from sandbox.rewards import REWARD_RANGE, PerActionReward, UniformReward
+from sandbox.virtual_env import VectorVirtualEnv, VirtualEnv
+
+
+def test_default_models_keep_historical_behaviour():
+    env = VirtualEnv(cycles=1, seed=3)
+    assert isinstance(env.run_model, UniformReward)
+    assert (env.run_model.lo, env.run_model.hi) == REWARD_RANGE
+    assert isinstance(env.reward_model, PerActionReward)
+
+
+def test_explicit_model_drives_run_and_step():
+    model = PerActionReward(seed=3)
+    env = VirtualEnv(cycles=1, reward_model=model)
+    assert env.run_model is model and env.reward_model is model
+
+
+def test_vector_run_without_steps_is_empty():
+    env = VectorVirtualEnv(n_envs=4, seed=1, use_numpy=False)
+    summary = env.run(steps=0, persist=False)
+    assert summary["transitions"] == 0 and summary["mean"] is None
+    assert env.steps == 0
+
+
+def test_vector_rejects_out_of_range_indices():
+    env = VectorVirtualEnv(n_envs=2, seed=1, use_numpy=False)
+    k = len(env.actions)
+    for vector in ([0, k], [-1, 0]):
+        with pytest.raises(ValueError):
+            env.run(steps=1, persist=False, actions=vector)
+    assert env.run(steps=1, persist=False, actions=[0, k - 1])["transitions"] == 2
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+tools/benchmarks.py
+Suite de benchmarks del núcleo de aprendizaje con línea base de regresiones.
+Autor: vlugoc
+Versión: 1.0
+Descripción:
+  Micro y macro benchmarks con timeit (solo stdlib, sin red):
+  choose_action, deposit, evaporate, LearningMetrics.register_cycle,
+  carga/guardado de memory.json a varios tamaños, VirtualEnv.step y un ciclo
+  completo del orquestador. Por defecto todo corre contra un HOME temporal
+  para no tocar ~/NeuraBoardEco/memory.json real.
+  Resultados en JSON (logs/benchmarks/); `compare` marca como regresión
+  cualquier caso más lento que la línea base por encima del umbral y sale
+  con código 1 (apto para tools/test_suite.sh o CI).
+Uso:
+  python tools/benchmarks.py run [--only choose_action,deposit] [--save-baseline]
+  python tools/benchmarks.py compare [resultado.json] [--threshold 0.15]
+  python tools/benchmarks.py list
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from rich import print
+
+REPEAT = 5
+THRESHOLD = 0.15                     # +15% sobre la línea base = regresión
+MEMORY_SIZES = {"small": 100, "medium": 1_000, "large": 10_000}
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Registra una fábrica: prepara el estado y devuelve la función a medir."""
+    def wrap(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return wrap
+
+
+def _table(states: int = 1, actions: int = 3):
+    from eco_ant.pheromones import PheromoneTable
+    ant = PheromoneTable(persist_in_memory=False, autosave=False)
+    for s in range(states):
+        for a in range(actions):
+            ant.set_tau(f"s{s}", f"a{a}", 0.1 + 0.01 * a)
+    return ant
+
+
+@benchmark("choose_action")
+def _choose_action():
+    ant = _table(1, 3)
+    actions = ["a0", "a1", "a2"]
+    heuristic = {"a0": 1.1, "a1": 1.0, "a2": 0.9}
+    return lambda: ant.choose_action("s0", actions, heuristic)
+
+
+@benchmark("choose_action_16")
+def _choose_action_16():
+    ant = _table(1, 16)
+    actions = [f"a{i}" for i in range(16)]
+    return lambda: ant.choose_action("s0", actions)
+
+
+@benchmark("deposit")
+def _deposit():
+    ant = _table(1, 3)
+    trajectory = [("s0", "a1")]
+    return lambda: ant.deposit(trajectory, 1.5)
+
+
+@benchmark("evaporate_1k")
+def _evaporate():
+    ant = _table(100, 10)
+    return ant.evaporate
+
+
+@benchmark("register_cycle")
+def _register_cycle():
+    from core.metrics import LearningMetrics
+    metrics = LearningMetrics(source="bench", emit_events=False, autosave=False)
+    rewards = [(-2.0 + 0.7 * (i % 11), f"a{i % 3}") for i in range(1024)]
+    state = {"i": 0}
+
+    def run():
+        reward, action = rewards[state["i"] & 1023]
+        state["i"] += 1
+        metrics.register_cycle(reward, action=action)
+    return run
+
+
+@benchmark("register_cycle_persist")
+def _register_cycle_persist():
+    # Configuración por defecto: evento en el stream + escritura de memory.json por ciclo
+    from core.metrics import LearningMetrics
+    metrics = LearningMetrics(source="bench")
+    return lambda: metrics.register_cycle(1.25, action="a0")
+
+
+def _memory_payload(n_logs: int) -> dict:
+    return {
+        "logs": [{"timestamp": "2025-10-25 12:00:00", "event": f"evento de prueba {i}"} for i in range(n_logs)],
+        "ant_rl": {"pheromones": {f"s{s}": {f"a{a}": 0.5 for a in range(8)} for s in range(n_logs // 100 + 1)}},
+        "metrics": {"cycles": n_logs, "rewards": [1.0] * min(n_logs, 1000)},
+    }
+
+
+def _memory_load(n_logs: int):
+    from eco_ant import pheromones
+    pheromones._save_global_memory(_memory_payload(n_logs))
+    return pheromones._load_global_memory
+
+
+def _memory_save(n_logs: int):
+    from eco_ant import pheromones
+    data = _memory_payload(n_logs)
+    return lambda: pheromones._save_global_memory(data)
+
+
+for _size, _n in MEMORY_SIZES.items():
+    BENCHMARKS[f"memory_load_{_size}"] = (lambda n: lambda: _memory_load(n))(_n)
+    BENCHMARKS[f"memory_save_{_size}"] = (lambda n: lambda: _memory_save(n))(_n)
+
+
+@benchmark("virtual_env_step")
+def _virtual_env_step():
+    from core.metrics import LearningMetrics
+    from sandbox.virtual_env import VirtualEnv
+    env = VirtualEnv(cycles=20, seed=0, metrics=LearningMetrics(source="bench", emit_events=False, autosave=False))
+    env.reset()
+    actions = env.actions
+
+    def run():
+        _, _, done, _ = env.step(actions[env._t % len(actions)])
+        if done:
+            env.reset()
+    return run
+
+
+@benchmark("orchestrator_cycle")
+def _orchestrator_cycle():
+    from core import clock
+    from core import orchestrator
+    from core.metrics import LearningMetrics
+    from eco_ant.pheromones import PheromoneTable
+    clock.set_clock(clock.SimulatedClock())
+    orchestrator.init_memory()
+    cfg = orchestrator.load_config()
+    ant = PheromoneTable(**cfg["ant"])
+    metrics = LearningMetrics()
+    return lambda: orchestrator.step(ant, metrics, cfg)
+
+
+def measure(name: str, repeat: int = REPEAT) -> dict:
+    """Calibra `number` con autorange y devuelve tiempos por llamada (µs)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn = BENCHMARKS[name]()
+        timer = timeit.Timer(fn)
+        number, _ = timer.autorange()       # ≥ 0.2 s por repetición
+        times = [t / number * 1e6 for t in timer.repeat(repeat, number)]
+    best = min(times)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "best_us": best,
+        "median_us": statistics.median(times),
+        "ops_per_s": 1e6 / best if best > 0 else None,
+    }
+
+
+def run_suite(names: Optional[List[str]] = None, repeat: int = REPEAT) -> dict:
+    results = {}
+    for name in names or list(BENCHMARKS):
+        results[name] = measure(name, repeat)
+        r = results[name]
+        print(f"[Bench] {name:<24} {r['best_us']:>12.2f} µs  (mediana {r['median_us']:.2f}, n={r['number']})")
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = THRESHOLD, stat: str = "best_us") -> List[dict]:
+    """Una fila por benchmark común: ratio actual/base y si supera el umbral."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            continue
+        ratio = cur[stat] / base[stat] if base[stat] else float("inf")
+        rows.append({"name": name, "baseline": base[stat], "current": cur[stat], "ratio": ratio,
+                     "regression": ratio > 1 + threshold, "improvement": ratio < 1 - threshold})
+    return rows
+
+
+def _bench_dir() -> Path:
+    # Se resuelve con el HOME real (antes de aislar) para que los resultados persistan
+    return Path.home() / "NeuraBoardEco" / "logs" / "benchmarks"
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del núcleo de aprendizaje")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    for cmd in ("run", "compare"):
+        p = sub.add_parser(cmd)
+        p.add_argument("--only", help="lista separada por comas")
+        p.add_argument("--repeat", type=int, default=REPEAT)
+        p.add_argument("--no-isolate", action="store_true", help="usar el HOME real (memory.json real)")
+        if cmd == "run":
+            p.add_argument("--out", type=Path, help="archivo JSON de salida")
+            p.add_argument("--save-baseline", action="store_true", help="guardar también como línea base")
+        else:
+            p.add_argument("current", nargs="?", type=Path, help="resultado JSON (por defecto: ejecutar ahora)")
+            p.add_argument("--baseline", type=Path)
+            p.add_argument("--threshold", type=float, default=THRESHOLD)
+            p.add_argument("--stat", choices=("best_us", "median_us"), default="best_us")
+    sub.add_parser("list")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "list":
+        for name in BENCHMARKS:
+            print(name)
+        return 0
+
+    bench_dir = _bench_dir()
+    baseline_path = bench_dir / "baseline.json"
+    names = args.only.split(",") if args.only else None
+    unknown = [n for n in names or () if n not in BENCHMARKS]
+    if unknown:
+        print(f"[Bench] ❌ Benchmarks desconocidos: {', '.join(unknown)}")
+        return 2
+
+    current = None
+    if args.cmd == "compare" and args.current:
+        current = json.loads(args.current.read_text(encoding="utf-8"))
+    if current is None:
+        if not args.no_isolate:
+            # Las rutas de los módulos se fijan al importarlos: aislar HOME antes del primer import
+            os.environ["HOME"] = tempfile.mkdtemp(prefix="neuraboard-bench-")
+        current = run_suite(names, args.repeat)
+        bench_dir.mkdir(parents=True, exist_ok=True)
+        out = getattr(args, "out", None) or bench_dir / f"bench_{time.strftime('%Y%m%d-%H%M%S')}.json"
+        out.write_text(json.dumps(current, indent=2), encoding="utf-8")
+        print(f"[Bench] Resultados → {out}")
+
+    if args.cmd == "run":
+        if args.save_baseline:
+            baseline_path.write_text(json.dumps(current, indent=2), encoding="utf-8")
+            print(f"[Bench] ✅ Línea base → {baseline_path}")
+        return 0
+
+    baseline_path = args.baseline or baseline_path
+    if not baseline_path.exists():
+        print(f"[Bench] ⚠️ No hay línea base ({baseline_path}); usa: run --save-baseline")
+        return 2
+    rows = compare(current, json.loads(baseline_path.read_text(encoding="utf-8")), args.threshold, args.stat)
+    for r in rows:
+        mark = "🔴 REGRESIÓN" if r["regression"] else "🟢 mejora" if r["improvement"] else "  ="
+        print(f"[Bench] {r['name']:<24} {r['baseline']:>10.2f} → {r['current']:>10.2f} µs "
+              f"({r['ratio']:.2f}x) {mark}")
+    regressions = [r["name"] for r in rows if r["regression"]]
+    if regressions:
+        print(f"[Bench] ❌ {len(regressions)} regresiones (> +{args.threshold:.0%}): {', '.join(regressions)}")
+        return 1
+    print(f"[Bench] ✅ Sin regresiones (umbral +{args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
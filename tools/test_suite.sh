@@ -27,7 +27,17 @@ else
   echo "[OK] Sintaxis compilada sin errores" | tee -a "$REPORT"
 fi
 
-banner "2) Conteo previo de logs en memory.json"
+banner "2) Pruebas unitarias (pytest, HOME aislado en tests/conftest.py)"
+if ! python3 -m pytest --version >/dev/null 2>&1; then
+  echo "[SKIP] pytest no está instalado (pip install pytest)" | tee -a "$REPORT"
+elif python3 -m pytest -q "$ROOT/tests" >>"$REPORT" 2>&1; then
+  echo "[OK] Pruebas unitarias superadas" | tee -a "$REPORT"
+else
+  echo "[FAIL] Fallaron pruebas unitarias (detalle en el reporte)" | tee -a "$REPORT"
+  status=1
+fi
+
+banner "3) Conteo previo de logs en memory.json"
 BEFORE=$(python3 - <<'PY' 2>/dev/null
 import json, os, sys
 p=os.path.expanduser('~/NeuraBoardEco/memory.json')
@@ -41,7 +51,7 @@ PY
 )
 echo "logs antes: $BEFORE" | tee -a "$REPORT"
 
-banner "3) Ejecución del orchestrator (timeout 25s)"
+banner "4) Ejecución del orchestrator (timeout 25s)"
 if timeout 25s python3 "$ROOT/core/orchestrator.py" >>"$REPORT" 2>&1; then
   echo "[OK] Orchestrator terminó correctamente" | tee -a "$REPORT"
 else
@@ -49,7 +59,7 @@ else
   status=1
 fi
 
-banner "4) Validación de memory.json (estructura y crecimiento de logs)"
+banner "5) Validación de memory.json (estructura y crecimiento de logs)"
 AFTER=$(python3 - <<'PY' 2>/dev/null
 import json, os, sys
 p=os.path.expanduser('~/NeuraBoardEco/memory.json')
@@ -69,7 +79,7 @@ else
   status=1
 fi
 
-banner "5) Resumen"
+banner "6) Resumen"
 if [ "$status" -eq 0 ]; then
   echo "✅ TESTS OK" | tee -a "$REPORT"
   if command -v termux-notification >/dev/null 2>&1; then